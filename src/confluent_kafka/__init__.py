@@ -18,6 +18,7 @@
 import nest_asyncio
 
 from ._model import (
+    ColumnBatch,
     ConsumerGroupState,
     ConsumerGroupTopicPartitions,
     IsolationLevel,
@@ -57,7 +58,7 @@ __all__ = ['admin', 'Consumer',
            'SerializingProducer', 'TIMESTAMP_CREATE_TIME', 'TIMESTAMP_LOG_APPEND_TIME',
            'TIMESTAMP_NOT_AVAILABLE', 'TopicPartition', 'Node',
            'ConsumerGroupTopicPartitions', 'ConsumerGroupState', 'Uuid',
-           'IsolationLevel']
+           'IsolationLevel', 'ColumnBatch']
 
 __version__ = version()[0]
 
@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from array import array
 from enum import Enum
 from .. import cimpl
 
@@ -134,6 +135,126 @@ class TopicPartitionInfo:
         self.isr = isr
 
 
+class ColumnBatch:
+    """
+    Represents a batch of messages in columnar form.
+    Returned by :meth:`Consumer.consume_columns`.
+
+    The i-th message of the batch is at position i of every column.
+    Keys and values use the Apache Arrow binary layout: the data of all
+    messages is concatenated into a single buffer, and the data of the i-th
+    message is ``values[value_offsets[i]:value_offsets[i + 1]]``.
+    A None key or value has an empty slice and a 0 in its validity column.
+
+    This class is typically not user instantiated.
+
+    Parameters
+    ----------
+    topics: list(str)
+        Topic of each message.
+    partitions: array('q')
+        Partition of each message.
+    offsets: array('q')
+        Offset of each message.
+    timestamps: array('q')
+        Timestamp of each message, in milliseconds since the epoch.
+    timestamp_types: array('b')
+        Timestamp type of each message, one of TIMESTAMP_NOT_AVAILABLE,
+        TIMESTAMP_CREATE_TIME or TIMESTAMP_LOG_APPEND_TIME.
+    keys: bytes
+        Keys of all messages.
+    key_offsets: array('q')
+        Start of each key in keys, followed by the end of the last key.
+    key_validity: bytes
+        1 for each message with a key, 0 if the key is None.
+    values: bytes
+        Values of all messages.
+    value_offsets: array('q')
+        Start of each value in values, followed by the end of the last value.
+    value_validity: bytes
+        1 for each message with a value, 0 if the value is None.
+    errors: list(Message)
+        Events and errors consumed along with the batch, such as
+        _PARTITION_EOF. These are not part of the columns.
+    """
+
+    def __init__(self, topics, partitions, offsets, timestamps, timestamp_types,
+                 keys, key_offsets, key_validity, values, value_offsets, value_validity,
+                 errors=None):
+        self.topics = topics
+        self.partitions = partitions
+        self.offsets = offsets
+        self.timestamps = timestamps
+        self.timestamp_types = timestamp_types
+        self.keys = keys
+        self.key_offsets = key_offsets
+        self.key_validity = key_validity
+        self.values = values
+        self.value_offsets = value_offsets
+        self.value_validity = value_validity
+        self.errors = errors if errors is not None else []
+
+    @classmethod
+    def from_messages(cls, messages):
+        """
+        Builds a ColumnBatch from a list of :py:class:`Message`, as returned by
+        :meth:`Consumer.consume`. Messages with an error go to ``errors``.
+        """
+        topics = []
+        partitions = array('q')
+        offsets = array('q')
+        timestamps = array('q')
+        timestamp_types = array('b')
+        columns = {'key': (bytearray(), array('q', [0]), bytearray()),
+                   'value': (bytearray(), array('q', [0]), bytearray())}
+        errors = []
+
+        for msg in messages:
+            if msg.error() is not None:
+                errors.append(msg)
+                continue
+            topics.append(msg.topic())
+            partitions.append(msg.partition())
+            offsets.append(msg.offset())
+            timestamp_type, timestamp = msg.timestamp()
+            timestamp_types.append(timestamp_type)
+            timestamps.append(timestamp)
+            for field, data in (('key', msg.key()), ('value', msg.value())):
+                buf, buf_offsets, validity = columns[field]
+                if isinstance(data, str):
+                    data = data.encode('utf-8')
+                if data is not None:
+                    buf += data
+                buf_offsets.append(len(buf))
+                validity.append(data is not None)
+
+        keys, key_offsets, key_validity = columns['key']
+        values, value_offsets, value_validity = columns['value']
+        return cls(topics, partitions, offsets, timestamps, timestamp_types,
+                   bytes(keys), key_offsets, bytes(key_validity),
+                   bytes(values), value_offsets, bytes(value_validity),
+                   errors)
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def key(self, i):
+        """
+        Returns the key of the i-th message as a memoryview of keys, or None.
+        """
+        if not self.key_validity[i]:
+            return None
+        return memoryview(self.keys)[self.key_offsets[i]:self.key_offsets[i + 1]]
+
+    def value(self, i):
+        """
+        Returns the value of the i-th message as a memoryview of values, or None.
+        """
+        if not self.value_validity[i]:
+            return None
+        return memoryview(self.values)[self.value_offsets[i]:self.value_offsets[i + 1]]
+
+
 class IsolationLevel(Enum):
     """
     Enum for Kafka isolation levels.
@@ -15,14 +15,13 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
+from ._framing import _MAGIC_BYTE  # noqa: F401
 from .schema_registry_client import (RegisteredSchema,
                                      Schema,
                                      SchemaRegistryClient,
                                      SchemaRegistryError,
                                      SchemaReference)
 
-_MAGIC_BYTE = 0
-
 __all__ = ["RegisteredSchema",
            "Schema",
            "SchemaRegistryClient",
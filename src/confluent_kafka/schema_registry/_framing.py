@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2024 Confluent Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Confluent Schema Registry wire format.
+
+    | magic byte | schema id (int32, big endian) | [Protobuf message index array] | payload |
+
+Headers are packed into a bytearray sized up front. Framed data is parsed in
+place with offsets, the payload is returned as a memoryview rather than a copy.
+"""
+
+import struct
+
+from confluent_kafka.serialization import SerializationError
+
+_MAGIC_BYTE = 0
+
+_HEADER = struct.Struct('>bI')
+
+HEADER_SIZE = _HEADER.size
+
+# Upper bound of a message index array length, guards against corrupt data.
+_MAX_MSG_INDEX_SIZE = 100000
+
+
+def _varint_size(value):
+    size = 1
+    while value & ~0x7f:
+        value >>= 7
+        size += 1
+    return size
+
+
+def _zigzag(value, zigzag):
+    return (value << 1) ^ (value >> 63) if zigzag else value
+
+
+def header(schema_id, msg_index=None, zigzag=True):
+    """
+    Returns the framing written ahead of a payload.
+
+    Args:
+        schema_id (int): Schema id
+
+        msg_index (list(int), optional): Protobuf message index array, omitted if None.
+
+        zigzag (bool): Whether the message index array is zigzag encoded.
+
+    Returns:
+        bytes: The framing header
+    """
+
+    if msg_index is None:
+        return _HEADER.pack(_MAGIC_BYTE, schema_id)
+
+    # The root element at the 0 position does not need a length prefix.
+    if msg_index == [0]:
+        values = [0]
+    else:
+        values = [_zigzag(value, zigzag) for value in [len(msg_index)] + list(msg_index)]
+
+    buf = bytearray(HEADER_SIZE + sum(_varint_size(value) for value in values))
+    _HEADER.pack_into(buf, 0, _MAGIC_BYTE, schema_id)
+    offset = HEADER_SIZE
+    for value in values:
+        while value & ~0x7f:
+            buf[offset] = (value & 0x7f) | 0x80
+            value >>= 7
+            offset += 1
+        buf[offset] = value
+        offset += 1
+    return bytes(buf)
+
+
+def read_schema_id(data, min_size=HEADER_SIZE + 1):
+    """
+    Reads the schema id from the framing of data.
+
+    Args:
+        data (bytes): Framed data, or any object supporting the buffer protocol.
+
+        min_size (int): Minimum size of framed data.
+
+    Raises:
+        SerializationError: if data is not framed.
+
+    Returns:
+        int: The schema id
+    """
+
+    if len(data) < min_size:
+        raise SerializationError("Expecting data framing of length 6 bytes or "
+                                 "more but total data size is {} bytes. This "
+                                 "message was not produced with a Confluent "
+                                 "Schema Registry serializer".format(len(data)))
+
+    magic, schema_id = _HEADER.unpack_from(data)
+    if magic != _MAGIC_BYTE:
+        raise SerializationError("Unexpected magic byte {}. This message "
+                                 "was not produced with a Confluent "
+                                 "Schema Registry serializer".format(magic))
+    return schema_id
+
+
+def _read_varint(data, offset, zigzag):
+    value = 0
+    shift = 0
+    try:
+        while True:
+            i = data[offset]
+            offset += 1
+            value |= (i & 0x7f) << shift
+            shift += 7
+            if not (i & 0x80):
+                break
+    except IndexError:
+        raise EOFError("Unexpected EOF while reading index")
+
+    if zigzag:
+        value = (value >> 1) ^ -(value & 1)
+    return value, offset
+
+
+def read_msg_index(data, offset=HEADER_SIZE, zigzag=True):
+    """
+    Reads the Protobuf message index array following the schema id.
+
+    Args:
+        data (bytes): Framed data, or any object supporting the buffer protocol.
+
+        offset (int): Position of the message index array in data.
+
+        zigzag (bool): Whether the message index array is zigzag encoded.
+
+    Raises:
+        SerializationError: if the message index array length is invalid.
+
+        EOFError: if data ends within the message index array.
+
+    Returns:
+        tuple(list(int), int): The message index array and the payload offset
+    """
+
+    if not isinstance(data, (bytes, bytearray)):
+        data = memoryview(data).cast('B')
+
+    size, offset = _read_varint(data, offset, zigzag)
+    if size < 0 or size > _MAX_MSG_INDEX_SIZE:
+        raise SerializationError("Invalid Protobuf msgidx array length")
+
+    if size == 0:
+        return [0], offset
+
+    msg_index = []
+    for _ in range(size):
+        value, offset = _read_varint(data, offset, zigzag)
+        msg_index.append(value)
+    return msg_index, offset
+
+
+def payload(data, offset=HEADER_SIZE):
+    """
+    Returns the payload following the framing of data without copying it.
+
+    Args:
+        data (bytes): Framed data, or any object supporting the buffer protocol.
+
+        offset (int): Size of the framing.
+
+    Returns:
+        memoryview: The payload
+    """
+
+    return memoryview(data)[offset:]
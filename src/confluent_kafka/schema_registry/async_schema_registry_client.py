@@ -0,0 +1,527 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2020 Confluent Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import asyncio
+import ssl
+
+import httpx
+
+from .error import SchemaRegistryError
+from .schema_registry_client import (_BaseRestClient,
+                                     _NotFound,
+                                     _PersistentSchemaStore,
+                                     _SchemaCache,
+                                     _is_fixed_version,
+                                     _is_number,
+                                     _pop_cache_conf,
+                                     _registered_schema,
+                                     _urlencode,
+                                     Schema,
+                                     SchemaReference)
+
+__all__ = ['AsyncSchemaRegistryClient']
+
+
+class _AsyncRestClient(_BaseRestClient):
+    """
+    Asyncio HTTP client for Confluent Schema Registry, backed by a pool of
+    keep-alive connections.
+
+    See AsyncSchemaRegistryClient for configuration details.
+
+    Args:
+        conf (dict): Dictionary containing _AsyncRestClient configuration
+    """
+
+    def __init__(self, conf):
+        # copy dict to avoid mutating the original
+        conf_copy = conf.copy()
+
+        max_connections = conf_copy.pop('pool.max.connections', 100)
+        if not isinstance(max_connections, int) or isinstance(max_connections, bool):
+            raise TypeError("pool.max.connections must be an instance of int, not "
+                            + str(type(max_connections)))
+
+        max_keepalive_connections = conf_copy.pop('pool.max.keepalive.connections', 20)
+        if not isinstance(max_keepalive_connections, int) or isinstance(max_keepalive_connections, bool):
+            raise TypeError("pool.max.keepalive.connections must be an instance of int, not "
+                            + str(type(max_keepalive_connections)))
+
+        keepalive_expiry = conf_copy.pop('pool.keepalive.expiry.sec', 5)
+        if not _is_number(keepalive_expiry):
+            raise TypeError("pool.keepalive.expiry.sec must be a number, not "
+                            + str(type(keepalive_expiry)))
+
+        super(_AsyncRestClient, self).__init__(conf_copy)
+
+        verify = True
+        if self.ca is not None or self.cert is not None:
+            verify = ssl.create_default_context(cafile=self.ca)
+            if isinstance(self.cert, tuple):
+                verify.load_cert_chain(*self.cert)
+            elif self.cert is not None:
+                verify.load_cert_chain(self.cert)
+
+        # requests does not time out by default, neither does this client
+        self.session = httpx.AsyncClient(
+            verify=verify,
+            auth=self.auth,
+            timeout=None,
+            limits=httpx.Limits(max_connections=max_connections,
+                                max_keepalive_connections=max_keepalive_connections,
+                                keepalive_expiry=keepalive_expiry))
+
+    async def _close(self):
+        await self.session.aclose()
+
+    async def get(self, url, query=None):
+        return await self.send_request(url, method='GET', query=query)
+
+    async def post(self, url, body, **kwargs):
+        return await self.send_request(url, method='POST', body=body)
+
+    async def delete(self, url):
+        return await self.send_request(url, method='DELETE')
+
+    async def put(self, url, body=None):
+        return await self.send_request(url, method='PUT', body=body)
+
+    async def send_request(self, url, method, body=None, query=None):
+        """
+        Sends HTTP request to the SchemaRegistry.
+
+        All unsuccessful attempts will raise a SchemaRegistryError with the
+        response contents. In most cases this will be accompanied with a
+        Schema Registry supplied error code.
+
+        In the event the response is malformed an error_code of -1 will be used.
+
+        Args:
+            url (str): Request path
+
+            method (str): HTTP method
+
+            body (str): Request content
+
+            query (dict): Query params to attach to the URL
+
+        Returns:
+            dict: Schema Registry response content.
+        """
+
+        headers, body = self._prepare_request(body)
+
+        response = await self.session.request(
+            method, url="/".join([self.base_url, url]),
+            headers=headers, content=body, params=query)
+
+        return self._handle_response(response)
+
+
+class _AsyncSchemaCache(_SchemaCache):
+    """
+    _SchemaCache whose misses are fetched by coroutines.
+
+    get_or_fetch and single_flight must be awaited, concurrent misses for the
+    same key share a single task. Cancelling a caller does not cancel the
+    shared task.
+    """
+
+    async def get_or_fetch(self, index, key, fetch, *args):
+        value = index.get(key)
+        if value is None:
+            value = await self.single_flight((id(index), key), self._fetch, index, key, fetch, args)
+
+        if isinstance(value, _NotFound):
+            value.raise_error()
+        return value
+
+    async def _fetch(self, index, key, fetch, args):
+        # the previous request for key may have completed since the caller's lookup
+        value = index.get(key)
+        if value is not None:
+            return value
+
+        try:
+            value = await fetch(*args)
+        except SchemaRegistryError as e:
+            if e.http_status_code != 404:
+                raise
+            value = _NotFound(e)
+            index.set(key, value, self.negative_ttl)
+            return value
+
+        index.set(key, value)
+        return value
+
+    async def single_flight(self, key, fetch, *args):
+        task = self.in_flight.get(key, None)
+        if task is None:
+            task = asyncio.ensure_future(fetch(*args))
+            self.in_flight[key] = task
+            task.add_done_callback(lambda _: self.in_flight.pop(key, None))
+
+        return await asyncio.shield(task)
+
+
+class AsyncSchemaRegistryClient(object):
+    """
+    A Confluent Schema Registry client for use with asyncio.
+
+    Provides the API of :py:class:`SchemaRegistryClient` as coroutines. Requests
+    are sent over a pool of keep-alive HTTP connections, responses are cached
+    the same way.
+
+    Configuration properties are those of :py:class:`SchemaRegistryClient` plus:
+
+    +------------------------------------+-------+-------------------------------------------+
+    | Property name                      | type  | Description                               |
+    +====================================+=======+===========================================+
+    | ``pool.max.connections``           | int   | Maximum number of concurrent connections. |
+    |                                    |       |                                           |
+    |                                    |       | Defaults to 100.                          |
+    +------------------------------------+-------+-------------------------------------------+
+    | ``pool.max.keepalive.connections`` | int   | Maximum number of idle connections kept   |
+    |                                    |       | open for reuse.                           |
+    |                                    |       |                                           |
+    |                                    |       | Defaults to 20.                           |
+    +------------------------------------+-------+-------------------------------------------+
+    | ``pool.keepalive.expiry.sec``      | float | Seconds an idle connection is kept open.  |
+    |                                    |       |                                           |
+    |                                    |       | Defaults to 5.                            |
+    +------------------------------------+-------+-------------------------------------------+
+
+    The client must be closed once no longer needed, either with
+    :py:meth:`close` or by using it as an async context manager.
+
+    Args:
+        conf (dict): Schema Registry client configuration.
+
+    See Also:
+        :py:class:`SchemaRegistryClient`
+    """
+
+    def __init__(self, conf):
+        # copy dict to avoid mutating the original
+        conf_copy = conf.copy()
+
+        capacity, latest_ttl, negative_ttl, persistent_path = _pop_cache_conf(conf_copy)
+        self._rest_client = _AsyncRestClient(conf_copy)
+        store = None
+        if persistent_path is not None:
+            store = _PersistentSchemaStore(persistent_path, self._rest_client.base_url)
+        self._cache = _AsyncSchemaCache(capacity, latest_ttl, negative_ttl, store)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    async def close(self):
+        """
+        Closes the pooled HTTP connections and the persistent cache.
+        """
+
+        if self._rest_client is not None:
+            await self._rest_client._close()
+        if self._cache.store is not None:
+            self._cache.store.close()
+
+    async def register_schema(self, subject_name, schema, normalize_schemas=False):
+        """
+        Registers a schema under ``subject_name``.
+
+        See :py:meth:`SchemaRegistryClient.register_schema`.
+        """
+
+        schema_id = self._cache.get_schema_id_by_subject(subject_name, schema)
+        if schema_id is not None:
+            return schema_id
+
+        # concurrent registrations of the same schema share one request
+        return await self._cache.single_flight(('register', subject_name, schema, normalize_schemas),
+                                               self._post_schema, subject_name, schema, normalize_schemas)
+
+    async def _post_schema(self, subject_name, schema, normalize_schemas):
+        # a concurrent registration may have completed since the caller's lookup
+        schema_id = self._cache.get_schema_id_by_subject(subject_name, schema)
+        if schema_id is not None:
+            return schema_id
+
+        request = {'schema': schema.schema_str}
+
+        # CP 5.5 adds new fields (for JSON and Protobuf).
+        if len(schema.references) > 0 or schema.schema_type != 'AVRO':
+            request['schemaType'] = schema.schema_type
+            request['references'] = [{'name': ref.name,
+                                      'subject': ref.subject,
+                                      'version': ref.version}
+                                     for ref in schema.references]
+
+        response = await self._rest_client.post(
+            'subjects/{}/versions?normalize={}'.format(_urlencode(subject_name), normalize_schemas),
+            body=request)
+
+        schema_id = response['id']
+        self._cache.set(schema_id, schema, subject_name)
+        self._cache.invalidate_registered(subject_name)
+
+        return schema_id
+
+    async def get_schema(self, schema_id, fmt=None):
+        """
+        Fetches the schema associated with ``schema_id`` from the
+        Schema Registry.
+
+        See :py:meth:`SchemaRegistryClient.get_schema`.
+        """
+
+        # schemas in another format are cached apart from the schema_id index entries
+        key = schema_id if fmt is None else (schema_id, fmt)
+        return await self._cache.get_or_fetch(self._cache.schema_id_index, key,
+                                              self._fetch_schema, schema_id, fmt)
+
+    async def _fetch_schema(self, schema_id, fmt=None):
+        store = self._cache.store if fmt is None else None
+        if store is not None:
+            schema = store.get_schema(schema_id)
+            if schema is not None:
+                return schema
+
+        query = None if fmt is None else {'format': fmt}
+        response = await self._rest_client.get('schemas/ids/{}'.format(schema_id), query)
+        schema = Schema(schema_str=response['schema'],
+                        schema_type=response.get('schemaType', 'AVRO'))
+
+        schema.references = [
+            SchemaReference(name=ref['name'], subject=ref['subject'], version=ref['version'])
+            for ref in response.get('references', [])
+        ]
+
+        if store is not None:
+            store.set_schema(schema_id, schema)
+        return schema
+
+    async def lookup_schema(self, subject_name, schema, normalize_schemas=False):
+        """
+        Returns ``schema`` registration information for ``subject``.
+
+        See :py:meth:`SchemaRegistryClient.lookup_schema`.
+        """
+
+        return await self._cache.get_or_fetch(self._cache.lookup_index, (subject_name, schema, normalize_schemas),
+                                              self._fetch_lookup_schema, subject_name, schema, normalize_schemas)
+
+    async def _fetch_lookup_schema(self, subject_name, schema, normalize_schemas):
+        request = {'schema': schema.schema_str}
+
+        # CP 5.5 adds new fields (for JSON and Protobuf).
+        if len(schema.references) > 0 or schema.schema_type != 'AVRO':
+            request['schemaType'] = schema.schema_type
+            request['references'] = [{'name': ref.name,
+                                      'subject': ref.subject,
+                                      'version': ref.version}
+                                     for ref in schema.references]
+
+        response = await self._rest_client.post('subjects/{}?normalize={}'
+                                                .format(_urlencode(subject_name), normalize_schemas),
+                                                body=request)
+
+        return _registered_schema(response)
+
+    async def get_subjects(self):
+        """
+        List all subjects registered with the Schema Registry
+
+        See :py:meth:`SchemaRegistryClient.get_subjects`.
+        """
+
+        return await self._rest_client.get('subjects')
+
+    async def delete_subject(self, subject_name, permanent=False):
+        """
+        Deletes the specified subject and its associated compatibility level if
+        registered.
+
+        See :py:meth:`SchemaRegistryClient.delete_subject`.
+        """
+
+        list = await self._rest_client.delete('subjects/{}'
+                                              .format(_urlencode(subject_name)))
+
+        if permanent:
+            await self._rest_client.delete('subjects/{}?permanent=true'
+                                           .format(_urlencode(subject_name)))
+
+        self._cache.invalidate_subject(subject_name)
+
+        return list
+
+    async def get_latest_version(self, subject_name):
+        """
+        Retrieves latest registered version for subject
+
+        See :py:meth:`SchemaRegistryClient.get_latest_version`.
+        """
+
+        return await self._cache.get_or_fetch(self._cache.latest_index, ('latest', subject_name),
+                                              self._fetch_version, subject_name, 'latest')
+
+    async def get_version(self, subject_name, version):
+        """
+        Retrieves a specific schema registered under ``subject_name``.
+
+        See :py:meth:`SchemaRegistryClient.get_version`.
+        """
+
+        if version == 'latest':
+            return await self._cache.get_or_fetch(self._cache.latest_index, ('latest', subject_name),
+                                                  self._fetch_version, subject_name, version)
+
+        if _is_fixed_version(version):
+            return await self._cache.get_or_fetch(self._cache.version_index, (subject_name, version),
+                                                  self._fetch_version, subject_name, version)
+
+        return await self._fetch_version(subject_name, version)
+
+    async def _fetch_version(self, subject_name, version):
+        # only fixed versions never change
+        store = self._cache.store if _is_fixed_version(version) else None
+        if store is not None:
+            registered_schema = store.get_version(subject_name, version)
+            if registered_schema is not None:
+                return registered_schema
+
+        response = await self._rest_client.get('subjects/{}/versions/{}'
+                                               .format(_urlencode(subject_name),
+                                                       version))
+
+        registered_schema = _registered_schema(response)
+        if store is not None:
+            store.set_version(registered_schema)
+        return registered_schema
+
+    async def warm_up(self, subjects=None, schema_ids=None):
+        """
+        Fetches the latest version of subjects and the schemas registered
+        with schema_ids into the cache, sending the requests concurrently.
+
+        See :py:meth:`SchemaRegistryClient.warm_up`.
+        """
+
+        subjects = list(subjects or [])
+        schema_ids = list(schema_ids or [])
+
+        results = await asyncio.gather(*([self.get_latest_version(subject) for subject in subjects]
+                                         + [self.get_schema(schema_id) for schema_id in schema_ids]))
+
+        latest = dict(zip(subjects, results[:len(subjects)]))
+        for registered_schema in latest.values():
+            # messages are likely written with the latest version
+            if self._cache.get_schema(registered_schema.schema_id) is None:
+                self._cache.schema_id_index.set(registered_schema.schema_id, registered_schema.schema)
+        return latest, dict(zip(schema_ids, results[len(subjects):]))
+
+    async def get_versions(self, subject_name):
+        """
+        Get a list of all versions registered with this subject.
+
+        See :py:meth:`SchemaRegistryClient.get_versions`.
+        """
+
+        # the cached list is shared, callers get their own copy
+        versions = await self._cache.get_or_fetch(self._cache.latest_index, ('versions', subject_name),
+                                                  self._rest_client.get,
+                                                  'subjects/{}/versions'.format(_urlencode(subject_name)))
+        return list(versions)
+
+    async def delete_version(self, subject_name, version):
+        """
+        Deletes a specific version registered to ``subject_name``.
+
+        See :py:meth:`SchemaRegistryClient.delete_version`.
+        """
+
+        response = await self._rest_client.delete('subjects/{}/versions/{}'.
+                                                  format(_urlencode(subject_name),
+                                                         version))
+
+        self._cache.invalidate_subject(subject_name, version if _is_fixed_version(version) else None)
+
+        return response
+
+    async def set_compatibility(self, subject_name=None, level=None):
+        """
+        Update global or subject level compatibility level.
+
+        See :py:meth:`SchemaRegistryClient.set_compatibility`.
+        """
+
+        if level is None:
+            raise ValueError("level must be set")
+
+        if subject_name is None:
+            result = await self._rest_client.put('config',
+                                                 body={'compatibility': level.upper()})
+        else:
+            result = await self._rest_client.put('config/{}'
+                                                 .format(_urlencode(subject_name)),
+                                                 body={'compatibility': level.upper()})
+
+        self._cache.invalidate_compatibility()
+
+        return result
+
+    async def get_compatibility(self, subject_name=None):
+        """
+        Get the current compatibility level.
+
+        See :py:meth:`SchemaRegistryClient.get_compatibility`.
+        """
+
+        if subject_name is not None:
+            url = 'config/{}'.format(_urlencode(subject_name))
+        else:
+            url = 'config'
+
+        result = await self._cache.get_or_fetch(self._cache.latest_index, ('compatibility', subject_name),
+                                                self._rest_client.get, url)
+        return result['compatibilityLevel']
+
+    async def test_compatibility(self, subject_name, schema, version="latest"):
+        """
+        Test the compatibility of a candidate schema for a given subject and version
+
+        See :py:meth:`SchemaRegistryClient.test_compatibility`.
+        """
+
+        request = {"schema": schema.schema_str}
+        if schema.schema_type != "AVRO":
+            request['schemaType'] = schema.schema_type
+
+        if schema.references:
+            request['references'] = [
+                {'name': ref.name, 'subject': ref.subject, 'version': ref.version}
+                for ref in schema.references
+            ]
+
+        response = await self._rest_client.post(
+            'compatibility/subjects/{}/versions/{}'.format(subject_name, version), body=request
+        )
+
+        return response['is_compatible']
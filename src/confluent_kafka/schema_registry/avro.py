@@ -15,19 +15,22 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
 from io import BytesIO
 from json import loads
-from struct import pack, unpack
+from threading import Lock
+from weakref import WeakKeyDictionary
 
 from fastavro import (parse_schema,
                       schemaless_reader,
                       schemaless_writer)
+from fastavro.schema import UnknownType
 
-from . import (_MAGIC_BYTE,
+from . import (_framing,
                Schema,
                topic_subject_name_strategy)
+from .schema_registry_client import _LRUCache, _map_concurrently
 from confluent_kafka.serialization import (Deserializer,
-                                           SerializationError,
                                            Serializer)
 
 
@@ -67,6 +70,32 @@ def _schema_loads(schema_str):
     return Schema(schema_str, schema_type='AVRO')
 
 
+# Schema Registry client -> _LRUCache of the named schemas each reference resolves to
+_reference_caches = WeakKeyDictionary()
+_reference_caches_lock = Lock()
+_REFERENCE_CACHE_CAPACITY = 1000
+
+
+def _reference_cache(schema_registry_client):
+    """
+    Returns the cache of resolved references shared by the serializers of
+    schema_registry_client.
+
+    Entries are keyed by (subject, version, schema string hash) and hold the
+    named schemas defined by the referenced schema and its own references.
+    They must not be modified.
+    """
+    with _reference_caches_lock:
+        cache = _reference_caches.get(schema_registry_client, None)
+        if cache is None:
+            cache = _reference_caches[schema_registry_client] = _LRUCache(_REFERENCE_CACHE_CAPACITY)
+        return cache
+
+
+def _reference_key(ref, referenced_schema):
+    return ref.subject, ref.version, hash(referenced_schema.schema.schema_str)
+
+
 def _resolve_named_schema(schema, schema_registry_client, named_schemas=None):
     """
     Resolves named schemas referenced by the provided schema recursively.
@@ -78,10 +107,53 @@ def _resolve_named_schema(schema, schema_registry_client, named_schemas=None):
     if named_schemas is None:
         named_schemas = {}
     if schema.references is not None:
+        cache = _reference_cache(schema_registry_client)
         for ref in schema.references:
             referenced_schema = schema_registry_client.get_version(ref.subject, ref.version)
-            _resolve_named_schema(referenced_schema.schema, schema_registry_client, named_schemas)
-            parse_schema(loads(referenced_schema.schema.schema_str), named_schemas=named_schemas)
+            key = _reference_key(ref, referenced_schema)
+            resolved = cache.get(key)
+            if resolved is None:
+                try:
+                    resolved = _resolve_named_schema(referenced_schema.schema, schema_registry_client)
+                    parse_schema(loads(referenced_schema.schema.schema_str), named_schemas=resolved)
+                except UnknownType:
+                    # the referenced schema relies on names defined by a preceding reference
+                    _resolve_named_schema(referenced_schema.schema, schema_registry_client, named_schemas)
+                    parse_schema(loads(referenced_schema.schema.schema_str), named_schemas=named_schemas)
+                    continue
+                cache.set(key, resolved)
+            named_schemas.update(resolved)
+    return named_schemas
+
+
+async def _async_resolve_named_schema(schema, schema_registry_client, named_schemas=None):
+    """
+    Resolves named schemas referenced by the provided schema recursively.
+    :param schema: Schema to resolve named schemas for.
+    :param schema_registry_client: AsyncSchemaRegistryClient to use for retrieval.
+    :param named_schemas: Dict of named schemas resolved recursively.
+    :return: named_schemas dict.
+    """
+    if named_schemas is None:
+        named_schemas = {}
+    if schema.references is not None:
+        cache = _reference_cache(schema_registry_client)
+        for ref in schema.references:
+            referenced_schema = await schema_registry_client.get_version(ref.subject, ref.version)
+            key = _reference_key(ref, referenced_schema)
+            resolved = cache.get(key)
+            if resolved is None:
+                try:
+                    resolved = await _async_resolve_named_schema(referenced_schema.schema, schema_registry_client)
+                    parse_schema(loads(referenced_schema.schema.schema_str), named_schemas=resolved)
+                except UnknownType:
+                    # the referenced schema relies on names defined by a preceding reference
+                    await _async_resolve_named_schema(referenced_schema.schema, schema_registry_client,
+                                                      named_schemas)
+                    parse_schema(loads(referenced_schema.schema.schema_str), named_schemas=named_schemas)
+                    continue
+                cache.set(key, resolved)
+            named_schemas.update(resolved)
     return named_schemas
 
 
@@ -184,6 +256,9 @@ class AvroSerializer(Serializer):
                      'use.latest.version': False,
                      'subject.name.strategy': topic_subject_name_strategy}
 
+    # subclasses resolving references asynchronously do so on first use
+    _defer_references = False
+
     def __init__(self, schema_registry_client, schema_str, to_dict=None, conf=None):
         if isinstance(schema_str, str):
             schema = _schema_loads(schema_str)
@@ -228,9 +303,23 @@ class AvroSerializer(Serializer):
             raise ValueError("Unrecognized properties: {}"
                              .format(", ".join(conf_copy.keys())))
 
-        schema_dict = loads(schema.schema_str)
-        self._named_schemas = _resolve_named_schema(schema, schema_registry_client)
-        parsed_schema = parse_schema(schema_dict, named_schemas=self._named_schemas)
+        self._schema = schema
+        self._named_schemas = None
+        self._schema_name = None
+        self._parsed_schema = None
+        if not (self._defer_references and schema.references):
+            self._parse_schema(_resolve_named_schema(schema, schema_registry_client))
+
+    def _parse_schema(self, named_schemas):
+        """
+        Parses the configured schema.
+
+        Args:
+            named_schemas (dict): Named schemas referenced by the schema.
+        """
+
+        schema_dict = loads(self._schema.schema_str)
+        parsed_schema = parse_schema(schema_dict, named_schemas=named_schemas)
 
         if isinstance(parsed_schema, list):
             # if parsed_schema is a list, we have an Avro union and there
@@ -246,10 +335,44 @@ class AvroSerializer(Serializer):
             # https://github.com/fastavro/fastavro/issues/415
             schema_name = parsed_schema.get("name", schema_dict["type"])
 
-        self._schema = schema
+        self._named_schemas = named_schemas
         self._schema_name = schema_name
         self._parsed_schema = parsed_schema
 
+    def _get_schema_id(self, subject):
+        """
+        Returns the id of the schema to serialize with under subject, registering
+        the configured schema if auto.register.schemas is enabled.
+        """
+
+        if self._use_latest_version:
+            return self._registry.get_latest_version(subject).schema_id
+
+        # Check to ensure this schema has been registered under subject_name.
+        if self._auto_register:
+            return self._registry.register_schema(subject, self._schema, self._normalize_schemas)
+
+        return self._registry.lookup_schema(subject, self._schema, self._normalize_schemas).schema_id
+
+    def warm_up(self, subjects):
+        """
+        Registers, or looks up, the schema under subjects ahead of the first
+        message, sending the Schema Registry requests concurrently.
+
+        Args:
+            subjects (list(str)): Subject names messages will be serialized under.
+
+        Raises:
+            SchemaRegistryError: If there was an error registering the schema with
+                                 Schema Registry, or auto.register.schemas is
+                                 false and the schema was not registered.
+        """
+
+        subjects = [subject for subject in subjects if subject not in self._known_subjects]
+        for subject, schema_id in zip(subjects, _map_concurrently(self._get_schema_id, subjects)):
+            self._schema_id = schema_id
+            self._known_subjects.add(subject)
+
     def __call__(self, obj, ctx):
         """
         Serializes an object to Avro binary format, prepending it with Confluent
@@ -276,24 +399,10 @@ class AvroSerializer(Serializer):
         subject = self._subject_name_func(ctx, self._schema_name)
 
         if subject not in self._known_subjects:
-            if self._use_latest_version:
-                latest_schema = self._registry.get_latest_version(subject)
-                self._schema_id = latest_schema.schema_id
-
-            else:
-                # Check to ensure this schema has been registered under subject_name.
-                if self._auto_register:
-                    # The schema name will always be the same. We can't however register
-                    # a schema without a subject so we set the schema_id here to handle
-                    # the initial registration.
-                    self._schema_id = self._registry.register_schema(subject,
-                                                                     self._schema,
-                                                                     self._normalize_schemas)
-                else:
-                    registered_schema = self._registry.lookup_schema(subject,
-                                                                     self._schema,
-                                                                     self._normalize_schemas)
-                    self._schema_id = registered_schema.schema_id
+            # The schema name will always be the same. We can't however register
+            # a schema without a subject so we set the schema_id here to handle
+            # the initial registration.
+            self._schema_id = self._get_schema_id(subject)
             self._known_subjects.add(subject)
 
         if self._to_dict is not None:
@@ -303,12 +412,59 @@ class AvroSerializer(Serializer):
 
         with _ContextStringIO() as fo:
             # Write the magic byte and schema ID in network byte order (big endian)
-            fo.write(pack('>bI', _MAGIC_BYTE, self._schema_id))
+            fo.write(_framing.header(self._schema_id))
             # write the record to the rest of the buffer
             schemaless_writer(fo, self._parsed_schema, value)
 
             return fo.getvalue()
 
+    def serialize_many(self, objs, ctx):
+        """
+        Serializes objects to Avro binary format, prepending them with Confluent
+        Schema Registry framing.
+
+        The subject is resolved once per batch and a single buffer is reused.
+
+        Args:
+            objs (list): The object instances to serialize.
+
+            ctx (SerializationContext): Metadata pertaining to the serialization operation.
+
+        Raises:
+            SerializerError: If any error occurs serializing an object.
+            SchemaRegistryError: If there was an error registering the schema with
+                                 Schema Registry, or auto.register.schemas is
+                                 false and the schema was not registered.
+
+        Returns:
+            list(bytes): Confluent Schema Registry encoded Avro bytes, None for None objects.
+        """
+
+        subject = self._subject_name_func(ctx, self._schema_name)
+
+        if subject not in self._known_subjects:
+            self._schema_id = self._get_schema_id(subject)
+            self._known_subjects.add(subject)
+
+        header = _framing.header(self._schema_id)
+        values = []
+        with _ContextStringIO() as fo:
+            for obj in objs:
+                if obj is None:
+                    values.append(None)
+                    continue
+
+                if self._to_dict is not None:
+                    obj = self._to_dict(obj, ctx)
+
+                fo.seek(0)
+                fo.truncate()
+                fo.write(header)
+                schemaless_writer(fo, self._parsed_schema, obj)
+                values.append(fo.getvalue())
+
+        return values
+
 
 class AvroDeserializer(Deserializer):
     """
@@ -349,6 +505,9 @@ class AvroDeserializer(Deserializer):
     __slots__ = ['_reader_schema', '_registry', '_from_dict', '_writer_schemas', '_return_record_name', '_schema',
                  '_named_schemas']
 
+    # subclasses resolving references asynchronously do so on first use
+    _defer_references = False
+
     def __init__(self, schema_registry_client, schema_str=None, from_dict=None, return_record_name=False):
         schema = None
         if schema_str is not None:
@@ -363,14 +522,10 @@ class AvroDeserializer(Deserializer):
         self._registry = schema_registry_client
         self._writer_schemas = {}
 
-        if schema:
-            schema_dict = loads(self._schema.schema_str)
-            self._named_schemas = _resolve_named_schema(self._schema, schema_registry_client)
-            self._reader_schema = parse_schema(schema_dict,
-                                               named_schemas=self._named_schemas)
-        else:
-            self._named_schemas = None
-            self._reader_schema = None
+        self._named_schemas = None
+        self._reader_schema = None
+        if schema and not (self._defer_references and schema.references):
+            self._parse_reader_schema(_resolve_named_schema(self._schema, schema_registry_client))
 
         if from_dict is not None and not callable(from_dict):
             raise ValueError("from_dict must be callable with the signature "
@@ -381,6 +536,63 @@ class AvroDeserializer(Deserializer):
         if not isinstance(self._return_record_name, bool):
             raise ValueError("return_record_name must be a boolean value")
 
+    def _parse_reader_schema(self, named_schemas):
+        """
+        Parses the configured reader schema.
+
+        Args:
+            named_schemas (dict): Named schemas referenced by the reader schema.
+        """
+
+        self._named_schemas = named_schemas
+        self._reader_schema = parse_schema(loads(self._schema.schema_str),
+                                           named_schemas=named_schemas)
+
+    def _parse_writer_schema(self, schema_id, registered_schema, named_schemas):
+        """
+        Parses and caches the writer schema registered with schema_id.
+
+        Args:
+            schema_id (int): Schema id
+
+            registered_schema (Schema): Schema registered with schema_id
+
+            named_schemas (dict): Named schemas referenced by the writer schema.
+
+        Returns:
+            dict: The parsed writer schema
+        """
+
+        self._named_schemas = named_schemas
+        prepared_schema = _schema_loads(registered_schema.schema_str)
+        writer_schema = parse_schema(loads(
+            prepared_schema.schema_str), named_schemas=named_schemas)
+        self._writer_schemas[schema_id] = writer_schema
+        return writer_schema
+
+    def warm_up(self, subjects=None, schema_ids=None):
+        """
+        Fetches and parses writer schemas ahead of the first message, sending
+        the Schema Registry requests concurrently.
+
+        Args:
+            subjects (list(str), optional): Subject names, the latest version of
+                each is prepared.
+
+            schema_ids (list(int), optional): Writer schema ids.
+
+        Raises:
+            SchemaRegistryError: if a subject or schema id was not found.
+        """
+
+        latest, schemas = self._registry.warm_up(subjects, schema_ids)
+        for registered_schema in latest.values():
+            schemas[registered_schema.schema_id] = registered_schema.schema
+
+        for schema_id, schema in schemas.items():
+            if schema_id not in self._writer_schemas:
+                self._parse_writer_schema(schema_id, schema, _resolve_named_schema(schema, self._registry))
+
     def __call__(self, data, ctx):
         """
         Deserialize Avro binary encoded data with Confluent Schema Registry framing to
@@ -403,28 +615,17 @@ class AvroDeserializer(Deserializer):
         if data is None:
             return None
 
-        if len(data) <= 5:
-            raise SerializationError("Expecting data framing of length 6 bytes or "
-                                     "more but total data size is {} bytes. This "
-                                     "message was not produced with a Confluent "
-                                     "Schema Registry serializer".format(len(data)))
+        schema_id = _framing.read_schema_id(data)
 
         with _ContextStringIO(data) as payload:
-            magic, schema_id = unpack('>bI', payload.read(5))
-            if magic != _MAGIC_BYTE:
-                raise SerializationError("Unexpected magic byte {}. This message "
-                                         "was not produced with a Confluent "
-                                         "Schema Registry serializer".format(magic))
+            payload.seek(_framing.HEADER_SIZE)
 
             writer_schema = self._writer_schemas.get(schema_id, None)
 
             if writer_schema is None:
                 registered_schema = self._registry.get_schema(schema_id)
-                self._named_schemas = _resolve_named_schema(registered_schema, self._registry)
-                prepared_schema = _schema_loads(registered_schema.schema_str)
-                writer_schema = parse_schema(loads(
-                    prepared_schema.schema_str), named_schemas=self._named_schemas)
-                self._writer_schemas[schema_id] = writer_schema
+                writer_schema = self._parse_writer_schema(
+                    schema_id, registered_schema, _resolve_named_schema(registered_schema, self._registry))
 
             obj_dict = schemaless_reader(payload,
                                          writer_schema,
@@ -435,3 +636,208 @@ class AvroDeserializer(Deserializer):
                 return self._from_dict(obj_dict, ctx)
 
             return obj_dict
+
+    def deserialize_many(self, datas, ctx):
+        """
+        Deserialize Avro binary encoded data with Confluent Schema Registry framing to
+        dicts, or object instances according to from_dict, if specified.
+
+        Writer schemas not seen before are fetched concurrently, once per schema
+        id, before the batch is decoded.
+
+        Args:
+            datas (list(bytes)): Serialized messages.
+
+            ctx (SerializationContext): Metadata relevant to the serialization
+                operation.
+
+        Raises:
+            SerializerError: if an error occurs parsing data.
+
+        Returns:
+            list: dicts, or object instances according to from_dict, None for None data.
+        """
+
+        schema_ids = [None if data is None else _framing.read_schema_id(data) for data in datas]
+        missing = set(schema_ids).difference(self._writer_schemas, [None])
+        if missing:
+            self.warm_up(schema_ids=sorted(missing))
+
+        return self._read_many(datas, schema_ids, ctx)
+
+    def _read_many(self, datas, schema_ids, ctx):
+        objs = []
+        for data, schema_id in zip(datas, schema_ids):
+            if data is None:
+                objs.append(None)
+                continue
+
+            with _ContextStringIO(data) as payload:
+                payload.seek(_framing.HEADER_SIZE)
+                obj_dict = schemaless_reader(payload,
+                                             self._writer_schemas[schema_id],
+                                             self._reader_schema,
+                                             self._return_record_name)
+
+            if self._from_dict is not None:
+                obj_dict = self._from_dict(obj_dict, ctx)
+            objs.append(obj_dict)
+
+        return objs
+
+
+class AsyncAvroSerializer(AvroSerializer):
+    """
+    AvroSerializer for use with an
+    :py:class:`~confluent_kafka.schema_registry.async_schema_registry_client.AsyncSchemaRegistryClient`.
+
+    Calls are awaited: ``value = await serializer(obj, ctx)``. Schema Registry
+    requests do not block the event loop, schemas referenced by ``schema_str``
+    are resolved on the first call.
+
+    See :py:class:`AvroSerializer` for arguments and configuration properties.
+    """
+    __slots__ = []
+
+    _defer_references = True
+
+    async def _async_get_schema_id(self, subject):
+        if self._use_latest_version:
+            return (await self._registry.get_latest_version(subject)).schema_id
+
+        if self._auto_register:
+            return await self._registry.register_schema(subject, self._schema, self._normalize_schemas)
+
+        return (await self._registry.lookup_schema(subject, self._schema, self._normalize_schemas)).schema_id
+
+    async def warm_up(self, subjects):
+        """
+        Registers, or looks up, the schema under subjects ahead of the first
+        message, sending the Schema Registry requests concurrently.
+
+        See :py:meth:`AvroSerializer.warm_up`.
+        """
+
+        if self._parsed_schema is None:
+            self._parse_schema(await _async_resolve_named_schema(self._schema, self._registry))
+
+        subjects = [subject for subject in subjects if subject not in self._known_subjects]
+        schema_ids = await asyncio.gather(*[self._async_get_schema_id(subject) for subject in subjects])
+        for subject, schema_id in zip(subjects, schema_ids):
+            self._schema_id = schema_id
+            self._known_subjects.add(subject)
+
+    async def __call__(self, obj, ctx):
+        """
+        Serializes an object to Avro binary format, prepending it with Confluent
+        Schema Registry framing.
+
+        See :py:meth:`AvroSerializer.__call__`.
+        """
+
+        if obj is None:
+            return None
+
+        if self._parsed_schema is None:
+            self._parse_schema(await _async_resolve_named_schema(self._schema, self._registry))
+
+        subject = self._subject_name_func(ctx, self._schema_name)
+
+        if subject not in self._known_subjects:
+            self._schema_id = await self._async_get_schema_id(subject)
+            self._known_subjects.add(subject)
+
+        return super(AsyncAvroSerializer, self).__call__(obj, ctx)
+
+    async def serialize_many(self, objs, ctx):
+        """
+        Serializes objects to Avro binary format, prepending them with Confluent
+        Schema Registry framing.
+
+        See :py:meth:`AvroSerializer.serialize_many`.
+        """
+
+        if self._parsed_schema is None:
+            self._parse_schema(await _async_resolve_named_schema(self._schema, self._registry))
+
+        subject = self._subject_name_func(ctx, self._schema_name)
+
+        if subject not in self._known_subjects:
+            self._schema_id = await self._async_get_schema_id(subject)
+            self._known_subjects.add(subject)
+
+        return super(AsyncAvroSerializer, self).serialize_many(objs, ctx)
+
+
+class AsyncAvroDeserializer(AvroDeserializer):
+    """
+    AvroDeserializer for use with an
+    :py:class:`~confluent_kafka.schema_registry.async_schema_registry_client.AsyncSchemaRegistryClient`.
+
+    Calls are awaited: ``obj = await deserializer(data, ctx)``. Schema Registry
+    requests do not block the event loop, schemas referenced by ``schema_str``
+    are resolved on the first call.
+
+    See :py:class:`AvroDeserializer` for arguments.
+    """
+    __slots__ = []
+
+    _defer_references = True
+
+    async def warm_up(self, subjects=None, schema_ids=None):
+        """
+        Fetches and parses writer schemas ahead of the first message, sending
+        the Schema Registry requests concurrently.
+
+        See :py:meth:`AvroDeserializer.warm_up`.
+        """
+
+        if self._schema is not None and self._reader_schema is None:
+            self._parse_reader_schema(await _async_resolve_named_schema(self._schema, self._registry))
+
+        latest, schemas = await self._registry.warm_up(subjects, schema_ids)
+        for registered_schema in latest.values():
+            schemas[registered_schema.schema_id] = registered_schema.schema
+
+        for schema_id, schema in schemas.items():
+            if schema_id not in self._writer_schemas:
+                self._parse_writer_schema(schema_id, schema,
+                                          await _async_resolve_named_schema(schema, self._registry))
+
+    async def __call__(self, data, ctx):
+        """
+        Deserialize Avro binary encoded data with Confluent Schema Registry framing to
+        a dict, or object instance according to from_dict, if specified.
+
+        See :py:meth:`AvroDeserializer.__call__`.
+        """
+
+        if data is None:
+            return None
+
+        if self._schema is not None and self._reader_schema is None:
+            self._parse_reader_schema(await _async_resolve_named_schema(self._schema, self._registry))
+
+        schema_id = _framing.read_schema_id(data)
+        if schema_id not in self._writer_schemas:
+            registered_schema = await self._registry.get_schema(schema_id)
+            self._parse_writer_schema(
+                schema_id, registered_schema,
+                await _async_resolve_named_schema(registered_schema, self._registry))
+
+        return super(AsyncAvroDeserializer, self).__call__(data, ctx)
+
+    async def deserialize_many(self, datas, ctx):
+        """
+        Deserialize Avro binary encoded data with Confluent Schema Registry framing to
+        dicts, or object instances according to from_dict, if specified.
+
+        See :py:meth:`AvroDeserializer.deserialize_many`.
+        """
+
+        schema_ids = [None if data is None else _framing.read_schema_id(data) for data in datas]
+        missing = set(schema_ids).difference(self._writer_schemas, [None])
+        if missing or (self._schema is not None and self._reader_schema is None):
+            await self.warm_up(schema_ids=sorted(missing))
+
+        return self._read_many(datas, schema_ids, ctx)
@@ -15,34 +15,22 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from io import BytesIO
-
+import asyncio
 import json
-import struct
 
-from jsonschema import validate, ValidationError, RefResolver
+from jsonschema import RefResolver
+from jsonschema.exceptions import best_match
+from jsonschema.validators import validator_for
 
-from confluent_kafka.schema_registry import (_MAGIC_BYTE,
+from confluent_kafka.schema_registry import (_framing,
                                              Schema,
                                              topic_subject_name_strategy)
+from confluent_kafka.schema_registry.schema_registry_client import _map_concurrently
 from confluent_kafka.serialization import (SerializationError,
                                            Deserializer,
                                            Serializer)
 
 
-class _ContextStringIO(BytesIO):
-    """
-    Wrapper to allow use of StringIO via 'with' constructs.
-    """
-
-    def __enter__(self):
-        return self
-
-    def __exit__(self, *args):
-        self.close()
-        return False
-
-
 def _resolve_named_schema(schema, schema_registry_client, named_schemas=None):
     """
     Resolves named schemas referenced by the provided schema recursively.
@@ -62,6 +50,51 @@ def _resolve_named_schema(schema, schema_registry_client, named_schemas=None):
     return named_schemas
 
 
+async def _async_resolve_named_schema(schema, schema_registry_client, named_schemas=None):
+    """
+    Resolves named schemas referenced by the provided schema recursively.
+    :param schema: Schema to resolve named schemas for.
+    :param schema_registry_client: AsyncSchemaRegistryClient to use for retrieval.
+    :param named_schemas: Dict of named schemas resolved recursively.
+    :return: named_schemas dict.
+    """
+    if named_schemas is None:
+        named_schemas = {}
+    if schema.references is not None:
+        for ref in schema.references:
+            referenced_schema = await schema_registry_client.get_version(ref.subject, ref.version)
+            await _async_resolve_named_schema(referenced_schema.schema, schema_registry_client, named_schemas)
+            referenced_schema_dict = json.loads(referenced_schema.schema.schema_str)
+            named_schemas[ref.name] = referenced_schema_dict
+    return named_schemas
+
+
+def _compile_validator(parsed_schema, named_schemas=None):
+    """
+    Creates a validator for the provided schema.
+    :param parsed_schema: Parsed JSON schema dict.
+    :param named_schemas: Dict of named schemas referenced by the schema, if any.
+    :return: jsonschema validator instance.
+    """
+    validator_cls = validator_for(parsed_schema)
+    validator_cls.check_schema(parsed_schema)
+    if named_schemas:
+        return validator_cls(parsed_schema,
+                             resolver=RefResolver(parsed_schema.get('$id'),
+                                                  parsed_schema,
+                                                  store=named_schemas))
+    return validator_cls(parsed_schema)
+
+
+def _validate(validator, instance):
+    """
+    Validates instance, raising the same error jsonschema.validate() would.
+    """
+    error = best_match(validator.iter_errors(instance))
+    if error is not None:
+        raise SerializationError(error.message)
+
+
 class JSONSerializer(Serializer):
     """
     Serializer that outputs JSON encoded data with Confluent Schema Registry framing.
@@ -157,7 +190,8 @@ class JSONSerializer(Serializer):
     """  # noqa: E501
     __slots__ = ['_hash', '_auto_register', '_normalize_schemas', '_use_latest_version',
                  '_known_subjects', '_parsed_schema', '_registry', '_schema', '_schema_id',
-                 '_schema_name', '_subject_name_func', '_to_dict', '_are_references_provided']
+                 '_schema_name', '_subject_name_func', '_to_dict', '_are_references_provided',
+                 '_validator']
 
     _default_conf = {'auto.register.schemas': True,
                      'normalize.schemas': False,
@@ -217,6 +251,47 @@ class JSONSerializer(Serializer):
 
         self._schema_name = schema_name
         self._parsed_schema = schema_dict
+        # compiled on first use, named schemas are resolved then
+        self._validator = None
+
+    def _get_schema_id(self, subject):
+        """
+        Returns the id of the schema to serialize with under subject, registering
+        the configured schema if auto.register.schemas is enabled.
+        """
+
+        if self._use_latest_version:
+            return self._registry.get_latest_version(subject).schema_id
+
+        # Check to ensure this schema has been registered under subject_name.
+        if self._auto_register:
+            return self._registry.register_schema(subject, self._schema, self._normalize_schemas)
+
+        return self._registry.lookup_schema(subject, self._schema, self._normalize_schemas).schema_id
+
+    def warm_up(self, subjects):
+        """
+        Registers, or looks up, the schema under subjects and compiles its
+        validator ahead of the first message, sending the Schema Registry
+        requests concurrently.
+
+        Args:
+            subjects (list(str)): Subject names messages will be serialized under.
+
+        Raises:
+            SchemaRegistryError: If there was an error registering the schema with
+                                 Schema Registry, or auto.register.schemas is
+                                 false and the schema was not registered.
+        """
+
+        subjects = [subject for subject in subjects if subject not in self._known_subjects]
+        for subject, schema_id in zip(subjects, _map_concurrently(self._get_schema_id, subjects)):
+            self._schema_id = schema_id
+            self._known_subjects.add(subject)
+
+        if self._validator is None:
+            self._validator = _compile_validator(self._parsed_schema,
+                                                 _resolve_named_schema(self._schema, self._registry))
 
     def __call__(self, obj, ctx):
         """
@@ -243,24 +318,10 @@ class JSONSerializer(Serializer):
         subject = self._subject_name_func(ctx, self._schema_name)
 
         if subject not in self._known_subjects:
-            if self._use_latest_version:
-                latest_schema = self._registry.get_latest_version(subject)
-                self._schema_id = latest_schema.schema_id
-
-            else:
-                # Check to ensure this schema has been registered under subject_name.
-                if self._auto_register:
-                    # The schema name will always be the same. We can't however register
-                    # a schema without a subject so we set the schema_id here to handle
-                    # the initial registration.
-                    self._schema_id = self._registry.register_schema(subject,
-                                                                     self._schema,
-                                                                     self._normalize_schemas)
-                else:
-                    registered_schema = self._registry.lookup_schema(subject,
-                                                                     self._schema,
-                                                                     self._normalize_schemas)
-                    self._schema_id = registered_schema.schema_id
+            # The schema name will always be the same. We can't however register
+            # a schema without a subject so we set the schema_id here to handle
+            # the initial registration.
+            self._schema_id = self._get_schema_id(subject)
             self._known_subjects.add(subject)
 
         if self._to_dict is not None:
@@ -268,26 +329,60 @@ class JSONSerializer(Serializer):
         else:
             value = obj
 
-        try:
-            if self._are_references_provided:
-                named_schemas = _resolve_named_schema(self._schema, self._registry)
-                validate(instance=value, schema=self._parsed_schema,
-                         resolver=RefResolver(self._parsed_schema.get('$id'),
-                                              self._parsed_schema,
-                                              store=named_schemas))
-            else:
-                validate(instance=value, schema=self._parsed_schema)
-        except ValidationError as ve:
-            raise SerializationError(ve.message)
+        if self._validator is None:
+            self._validator = _compile_validator(self._parsed_schema,
+                                                 _resolve_named_schema(self._schema, self._registry))
+        _validate(self._validator, value)
 
-        with _ContextStringIO() as fo:
-            # Write the magic byte and schema ID in network byte order (big endian)
-            fo.write(struct.pack('>bI', _MAGIC_BYTE, self._schema_id))
-            # JSON dump always writes a str never bytes
-            # https://docs.python.org/3/library/json.html
-            fo.write(json.dumps(value).encode('utf8'))
+        # JSON dump always writes a str never bytes
+        # https://docs.python.org/3/library/json.html
+        return _framing.header(self._schema_id) + json.dumps(value).encode('utf8')
 
-            return fo.getvalue()
+    def serialize_many(self, objs, ctx):
+        """
+        Serializes objects to JSON, prepending them with Confluent Schema Registry
+        framing.
+
+        The subject and the framing are resolved once per batch.
+
+        Args:
+            objs (list): The object instances to serialize.
+
+            ctx (SerializationContext): Metadata relevant to the serialization
+                operation.
+
+        Raises:
+            SerializerError if any error occurs serializing an object.
+
+        Returns:
+            list(bytes): JSON serialized data with Confluent Schema Registry
+            framing, None for None objects.
+        """
+
+        subject = self._subject_name_func(ctx, self._schema_name)
+
+        if subject not in self._known_subjects:
+            self._schema_id = self._get_schema_id(subject)
+            self._known_subjects.add(subject)
+
+        if self._validator is None:
+            self._validator = _compile_validator(self._parsed_schema,
+                                                 _resolve_named_schema(self._schema, self._registry))
+
+        header = _framing.header(self._schema_id)
+        values = []
+        for obj in objs:
+            if obj is None:
+                values.append(None)
+                continue
+
+            if self._to_dict is not None:
+                obj = self._to_dict(obj, ctx)
+
+            _validate(self._validator, obj)
+            values.append(header + json.dumps(obj).encode('utf8'))
+
+        return values
 
 
 class JSONDeserializer(Deserializer):
@@ -308,7 +403,8 @@ class JSONDeserializer(Deserializer):
         schema_registry_client (SchemaRegistryClient, optional): Schema Registry client instance. Needed if ``schema_str`` is a schema referencing other schemas.
     """  # noqa: E501
 
-    __slots__ = ['_parsed_schema', '_from_dict', '_registry', '_are_references_provided', '_schema']
+    __slots__ = ['_parsed_schema', '_from_dict', '_registry', '_are_references_provided', '_schema',
+                 '_validator']
 
     def __init__(self, schema_str, from_dict=None, schema_registry_client=None):
         self._are_references_provided = False
@@ -326,6 +422,8 @@ class JSONDeserializer(Deserializer):
         self._parsed_schema = json.loads(schema.schema_str)
         self._schema = schema
         self._registry = schema_registry_client
+        # compiled on first use, named schemas are resolved then
+        self._validator = None
 
         if from_dict is not None and not callable(from_dict):
             raise ValueError("from_dict must be callable with the signature"
@@ -333,6 +431,17 @@ class JSONDeserializer(Deserializer):
 
         self._from_dict = from_dict
 
+    def warm_up(self):
+        """
+        Compiles the schema validator ahead of the first message, resolving
+        referenced schemas. JSON documents are self-describing, writer schemas
+        are not fetched.
+        """
+
+        if self._validator is None:
+            self._validator = _compile_validator(self._parsed_schema,
+                                                 _resolve_named_schema(self._schema, self._registry))
+
     def __call__(self, data, ctx):
         """
         Deserialize a JSON encoded record with Confluent Schema Registry framing to
@@ -354,35 +463,193 @@ class JSONDeserializer(Deserializer):
         if data is None:
             return None
 
-        if len(data) <= 5:
-            raise SerializationError("Expecting data framing of length 6 bytes or "
-                                     "more but total data size is {} bytes. This "
-                                     "message was not produced with a Confluent "
-                                     "Schema Registry serializer".format(len(data)))
-
-        with _ContextStringIO(data) as payload:
-            magic, schema_id = struct.unpack('>bI', payload.read(5))
-            if magic != _MAGIC_BYTE:
-                raise SerializationError("Unexpected magic byte {}. This message "
-                                         "was not produced with a Confluent "
-                                         "Schema Registry serializer".format(magic))
-
-            # JSON documents are self-describing; no need to query schema
-            obj_dict = json.loads(payload.read())
-
-            try:
-                if self._are_references_provided:
-                    named_schemas = _resolve_named_schema(self._schema, self._registry)
-                    validate(instance=obj_dict,
-                             schema=self._parsed_schema, resolver=RefResolver(self._parsed_schema.get('$id'),
-                                                                              self._parsed_schema,
-                                                                              store=named_schemas))
-                else:
-                    validate(instance=obj_dict, schema=self._parsed_schema)
-            except ValidationError as ve:
-                raise SerializationError(ve.message)
+        _framing.read_schema_id(data)
+
+        # JSON documents are self-describing; no need to query schema
+        obj_dict = json.loads(str(_framing.payload(data), 'utf8'))
+
+        if self._validator is None:
+            self._validator = _compile_validator(self._parsed_schema,
+                                                 _resolve_named_schema(self._schema, self._registry))
+        _validate(self._validator, obj_dict)
+
+        if self._from_dict is not None:
+            return self._from_dict(obj_dict, ctx)
+
+        return obj_dict
+
+    def deserialize_many(self, datas, ctx):
+        """
+        Deserialize JSON encoded records with Confluent Schema Registry framing to
+        dicts, or object instances according to from_dict if from_dict is specified.
+
+        Args:
+            datas (list(bytes)): JSON serialized records with Confluent Schema Registry framing.
+
+            ctx (SerializationContext): Metadata relevant to the serialization operation.
+
+        Returns:
+            list: dicts, or object instances according to from_dict, None for None data.
+
+        Raises:
+            SerializerError: If there was an error reading the Confluent framing data, or
+               if a record was not successfully validated with the configured schema.
+        """
+
+        self.warm_up()
+
+        return self._read_many(datas, ctx)
+
+    def _read_many(self, datas, ctx):
+        objs = []
+        for data in datas:
+            if data is None:
+                objs.append(None)
+                continue
+
+            _framing.read_schema_id(data)
+            obj_dict = json.loads(str(_framing.payload(data), 'utf8'))
+            _validate(self._validator, obj_dict)
 
             if self._from_dict is not None:
-                return self._from_dict(obj_dict, ctx)
+                obj_dict = self._from_dict(obj_dict, ctx)
+            objs.append(obj_dict)
+
+        return objs
+
+
+class AsyncJSONSerializer(JSONSerializer):
+    """
+    JSONSerializer for use with an
+    :py:class:`~confluent_kafka.schema_registry.async_schema_registry_client.AsyncSchemaRegistryClient`.
+
+    Calls are awaited: ``value = await serializer(obj, ctx)``. Schema Registry
+    requests do not block the event loop.
+
+    See :py:class:`JSONSerializer` for arguments and configuration properties.
+    """
+    __slots__ = []
+
+    async def _async_get_schema_id(self, subject):
+        if self._use_latest_version:
+            return (await self._registry.get_latest_version(subject)).schema_id
+
+        if self._auto_register:
+            return await self._registry.register_schema(subject, self._schema, self._normalize_schemas)
+
+        return (await self._registry.lookup_schema(subject, self._schema, self._normalize_schemas)).schema_id
+
+    async def warm_up(self, subjects):
+        """
+        Registers, or looks up, the schema under subjects and compiles its
+        validator ahead of the first message, sending the Schema Registry
+        requests concurrently.
+
+        See :py:meth:`JSONSerializer.warm_up`.
+        """
+
+        subjects = [subject for subject in subjects if subject not in self._known_subjects]
+        schema_ids = await asyncio.gather(*[self._async_get_schema_id(subject) for subject in subjects])
+        for subject, schema_id in zip(subjects, schema_ids):
+            self._schema_id = schema_id
+            self._known_subjects.add(subject)
+
+        if self._validator is None:
+            self._validator = _compile_validator(self._parsed_schema,
+                                                 await _async_resolve_named_schema(self._schema, self._registry))
+
+    async def __call__(self, obj, ctx):
+        """
+        Serializes an object to JSON, prepending it with Confluent Schema Registry
+        framing.
+
+        See :py:meth:`JSONSerializer.__call__`.
+        """
+
+        if obj is None:
+            return None
+
+        subject = self._subject_name_func(ctx, self._schema_name)
+
+        if subject not in self._known_subjects:
+            self._schema_id = await self._async_get_schema_id(subject)
+            self._known_subjects.add(subject)
+
+        if self._validator is None:
+            self._validator = _compile_validator(self._parsed_schema,
+                                                 await _async_resolve_named_schema(self._schema, self._registry))
+
+        return super(AsyncJSONSerializer, self).__call__(obj, ctx)
+
+    async def serialize_many(self, objs, ctx):
+        """
+        Serializes objects to JSON, prepending them with Confluent Schema Registry
+        framing.
+
+        See :py:meth:`JSONSerializer.serialize_many`.
+        """
+
+        subject = self._subject_name_func(ctx, self._schema_name)
+
+        if subject not in self._known_subjects:
+            self._schema_id = await self._async_get_schema_id(subject)
+            self._known_subjects.add(subject)
+
+        if self._validator is None:
+            self._validator = _compile_validator(self._parsed_schema,
+                                                 await _async_resolve_named_schema(self._schema, self._registry))
+
+        return super(AsyncJSONSerializer, self).serialize_many(objs, ctx)
+
+
+class AsyncJSONDeserializer(JSONDeserializer):
+    """
+    JSONDeserializer for use with an
+    :py:class:`~confluent_kafka.schema_registry.async_schema_registry_client.AsyncSchemaRegistryClient`.
+
+    Calls are awaited: ``obj = await deserializer(data, ctx)``. Schema Registry
+    requests do not block the event loop.
+
+    See :py:class:`JSONDeserializer` for arguments.
+    """
+    __slots__ = []
+
+    async def warm_up(self):
+        """
+        Compiles the schema validator ahead of the first message.
+
+        See :py:meth:`JSONDeserializer.warm_up`.
+        """
+
+        if self._validator is None:
+            self._validator = _compile_validator(self._parsed_schema,
+                                                 await _async_resolve_named_schema(self._schema, self._registry))
+
+    async def __call__(self, data, ctx):
+        """
+        Deserialize a JSON encoded record with Confluent Schema Registry framing to
+        a dict, or object instance according to from_dict if from_dict is specified.
+
+        See :py:meth:`JSONDeserializer.__call__`.
+        """
+
+        if data is None:
+            return None
+
+        if self._validator is None:
+            self._validator = _compile_validator(self._parsed_schema,
+                                                 await _async_resolve_named_schema(self._schema, self._registry))
+
+        return super(AsyncJSONDeserializer, self).__call__(data, ctx)
+
+    async def deserialize_many(self, datas, ctx):
+        """
+        Deserialize JSON encoded records with Confluent Schema Registry framing to
+        dicts, or object instances according to from_dict if from_dict is specified.
+
+        See :py:meth:`JSONDeserializer.deserialize_many`.
+        """
+
+        await self.warm_up()
 
-            return obj_dict
+        return self._read_many(datas, ctx)
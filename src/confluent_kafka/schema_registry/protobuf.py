@@ -15,20 +15,21 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import io
+import asyncio
 import sys
 import base64
-import struct
 import warnings
 from collections import deque
 
+from google.protobuf import descriptor_pb2, message_factory
 from google.protobuf.message import DecodeError
 from google.protobuf.message_factory import MessageFactory
 
-from . import (_MAGIC_BYTE,
+from . import (_framing,
                reference_subject_name_strategy,
                topic_subject_name_strategy,)
-from .schema_registry_client import (Schema,
+from .schema_registry_client import (_map_concurrently,
+                                     Schema,
                                      SchemaReference)
 from confluent_kafka.serialization import SerializationError
 
@@ -56,19 +57,6 @@ else:
         return chr(v)
 
 
-class _ContextStringIO(io.BytesIO):
-    """
-    Wrapper to allow use of StringIO via 'with' constructs.
-    """
-
-    def __enter__(self):
-        return self
-
-    def __exit__(self, *args):
-        self.close()
-        return False
-
-
 def _create_index_array(msg_desc):
     """
     Creates an index array specifying the location of msg_desc in
@@ -114,6 +102,48 @@ def _create_index_array(msg_desc):
     return list(msg_idx)
 
 
+def _get_message_class(descriptor):
+    """
+    Returns the concrete Message class of a MessageDescriptor.
+
+    Args:
+        descriptor (MessageDescriptor): Protobuf MessageDescriptor
+
+    Returns:
+        type: Message class
+    """
+
+    # MessageFactory.GetPrototype is not available in newer protobuf releases
+    get_message_class = getattr(message_factory, 'GetMessageClass', None)
+    if get_message_class is not None:
+        return get_message_class(descriptor)
+    return MessageFactory().GetPrototype(descriptor)
+
+
+def _index_message_names(file_desc):
+    """
+    Maps the index array of every message in a FileDescriptorProto to the
+    message's full name.
+
+    Args:
+        file_desc (FileDescriptorProto): Protobuf FileDescriptorProto
+
+    Returns:
+        dict: Message full name by index array tuple
+    """
+
+    names = {}
+
+    def visit(msg_types, prefix, msg_idx):
+        for idx, msg in enumerate(msg_types):
+            full_name = prefix + msg.name
+            names[msg_idx + (idx,)] = full_name
+            visit(msg.nested_type, full_name + '.', msg_idx + (idx,))
+
+    visit(file_desc.message_type, file_desc.package + '.' if file_desc.package else '', ())
+    return names
+
+
 def _schema_to_str(file_descriptor):
     """
     Base64 encode a FileDescriptor
@@ -304,7 +334,9 @@ class ProtobufSerializer(object):
 
         self._registry = schema_registry_client
         self._schema_id = None
-        self._known_subjects = set()
+        # subject -> framing header, precomputed from the subject's schema id
+        # and the message index array
+        self._known_subjects = {}
         self._msg_class = msg_type
 
         descriptor = msg_type.DESCRIPTOR
@@ -382,6 +414,46 @@ class ProtobufSerializer(object):
                                                reference.version))
         return schema_refs
 
+    def _get_schema_id(self, ctx, subject):
+        """
+        Returns the id of the schema to serialize with under subject, registering
+        the configured schema and its dependencies if auto.register.schemas is
+        enabled.
+        """
+
+        if self._use_latest_version:
+            return self._registry.get_latest_version(subject).schema_id
+
+        self._schema.references = self._resolve_dependencies(ctx, self._msg_class.DESCRIPTOR.file)
+
+        if self._auto_register:
+            return self._registry.register_schema(subject, self._schema, self._normalize_schemas)
+
+        return self._registry.lookup_schema(subject, self._schema, self._normalize_schemas).schema_id
+
+    def warm_up(self, subjects):
+        """
+        Registers, or looks up, the schema and its dependencies under subjects
+        ahead of the first message, sending the Schema Registry requests
+        concurrently.
+
+        ``reference.subject.name.strategy`` is called with a None
+        SerializationContext.
+
+        Args:
+            subjects (list(str)): Subject names messages will be serialized under.
+
+        Raises:
+            SchemaRegistryError: If there was an error registering the schema with
+                                 Schema Registry, or auto.register.schemas is
+                                 false and the schema was not registered.
+        """
+
+        subjects = [subject for subject in subjects if subject not in self._known_subjects]
+        schema_ids = _map_concurrently(lambda subject: self._get_schema_id(None, subject), subjects)
+        for subject, schema_id in zip(subjects, schema_ids):
+            self._add_subject(subject, schema_id)
+
     def __call__(self, message, ctx):
         """
         Serializes an instance of a class derived from Protobuf Message, and prepends
@@ -411,36 +483,182 @@ class ProtobufSerializer(object):
         subject = self._subject_name_func(ctx,
                                           message.DESCRIPTOR.full_name)
 
-        if subject not in self._known_subjects:
-            if self._use_latest_version:
-                latest_schema = self._registry.get_latest_version(subject)
-                self._schema_id = latest_schema.schema_id
-
-            else:
-                self._schema.references = self._resolve_dependencies(
-                    ctx, message.DESCRIPTOR.file)
-
-                if self._auto_register:
-                    self._schema_id = self._registry.register_schema(subject,
-                                                                     self._schema,
-                                                                     self._normalize_schemas)
-                else:
-                    self._schema_id = self._registry.lookup_schema(
-                        subject, self._schema, self._normalize_schemas).schema_id
-
-            self._known_subjects.add(subject)
-
-        with _ContextStringIO() as fo:
-            # Write the magic byte and schema ID in network byte order
-            # (big endian)
-            fo.write(struct.pack('>bI', _MAGIC_BYTE, self._schema_id))
-            # write the index array that specifies the message descriptor
-            # of the serialized data.
-            self._encode_varints(fo, self._index_array,
+        header = self._known_subjects.get(subject, None)
+        if header is None:
+            header = self._add_subject(subject, self._get_schema_id(ctx, subject))
+
+        return header + message.SerializeToString()
+
+    def serialize_many(self, messages, ctx):
+        """
+        Serializes instances of a class derived from Protobuf Message, and prepends
+        them with Confluent Schema Registry framing.
+
+        The subject and the framing are resolved once per batch.
+
+        Args:
+            messages (list(Message)): Instances of a class derived from Protobuf Message.
+
+            ctx (SerializationContext): Metadata relevant to the serialization.
+                operation.
+
+        Raises:
+            SerializerError if any error occurs during serialization.
+
+        Returns:
+            list(bytes): Protobuf serialized messages with Confluent Schema Registry
+            framing, None for None messages.
+        """
+
+        for message in messages:
+            if message is not None and not isinstance(message, self._msg_class):
+                raise ValueError("message must be of type {} not {}"
+                                 .format(self._msg_class, type(message)))
+
+        subject = self._subject_name_func(ctx, self._msg_class.DESCRIPTOR.full_name)
+
+        header = self._known_subjects.get(subject, None)
+        if header is None:
+            header = self._add_subject(subject, self._get_schema_id(ctx, subject))
+
+        return self._write_many(header, messages)
+
+    def _add_subject(self, subject, schema_id):
+        """
+        Records the schema id registered under subject and precomputes the
+        framing header written ahead of its messages.
+
+        Args:
+            subject (str): Subject name
+
+            schema_id (int): Schema id registered under subject
+
+        Returns:
+            bytes: The framing header
+        """
+
+        self._schema_id = schema_id
+        # The magic byte and schema ID in network byte order (big endian),
+        # followed by the index array that specifies the message descriptor
+        # of the serialized data.
+        header = _framing.header(schema_id, self._index_array,
                                  zigzag=not self._use_deprecated_format)
-            # write the serialized data itself
-            fo.write(message.SerializeToString())
-            return fo.getvalue()
+        self._known_subjects[subject] = header
+        return header
+
+    @staticmethod
+    def _write_many(header, messages):
+        return [None if message is None else header + message.SerializeToString()
+                for message in messages]
+
+
+class AsyncProtobufSerializer(ProtobufSerializer):
+    """
+    ProtobufSerializer for use with an
+    :py:class:`~confluent_kafka.schema_registry.async_schema_registry_client.AsyncSchemaRegistryClient`.
+
+    Calls are awaited: ``value = await serializer(message, ctx)``. Schema
+    Registry requests do not block the event loop.
+
+    See :py:class:`ProtobufSerializer` for arguments and configuration properties.
+    """
+    __slots__ = []
+
+    async def _async_resolve_dependencies(self, ctx, file_desc):
+        """
+        Resolves and optionally registers schema references recursively.
+
+        See :py:meth:`ProtobufSerializer._resolve_dependencies`.
+        """
+
+        schema_refs = []
+        for dep in file_desc.dependencies:
+            if self._skip_known_types and dep.name.startswith("google/protobuf/"):
+                continue
+            dep_refs = await self._async_resolve_dependencies(ctx, dep)
+            subject = self._ref_reference_subject_func(ctx, dep)
+            schema = Schema(_schema_to_str(dep),
+                            references=dep_refs,
+                            schema_type='PROTOBUF')
+            if self._auto_register:
+                await self._registry.register_schema(subject, schema)
+
+            reference = await self._registry.lookup_schema(subject, schema)
+            # schema_refs are per file descriptor
+            schema_refs.append(SchemaReference(dep.name,
+                                               subject,
+                                               reference.version))
+        return schema_refs
+
+    async def _async_get_schema_id(self, ctx, subject):
+        if self._use_latest_version:
+            return (await self._registry.get_latest_version(subject)).schema_id
+
+        self._schema.references = await self._async_resolve_dependencies(ctx, self._msg_class.DESCRIPTOR.file)
+
+        if self._auto_register:
+            return await self._registry.register_schema(subject, self._schema, self._normalize_schemas)
+
+        return (await self._registry.lookup_schema(subject, self._schema, self._normalize_schemas)).schema_id
+
+    async def warm_up(self, subjects):
+        """
+        Registers, or looks up, the schema and its dependencies under subjects
+        ahead of the first message, sending the Schema Registry requests
+        concurrently.
+
+        See :py:meth:`ProtobufSerializer.warm_up`.
+        """
+
+        subjects = [subject for subject in subjects if subject not in self._known_subjects]
+        schema_ids = await asyncio.gather(*[self._async_get_schema_id(None, subject) for subject in subjects])
+        for subject, schema_id in zip(subjects, schema_ids):
+            self._add_subject(subject, schema_id)
+
+    async def __call__(self, message, ctx):
+        """
+        Serializes an instance of a class derived from Protobuf Message, and prepends
+        it with Confluent Schema Registry framing.
+
+        See :py:meth:`ProtobufSerializer.__call__`.
+        """
+
+        if message is None:
+            return None
+
+        if not isinstance(message, self._msg_class):
+            raise ValueError("message must be of type {} not {}"
+                             .format(self._msg_class, type(message)))
+
+        subject = self._subject_name_func(ctx,
+                                          message.DESCRIPTOR.full_name)
+
+        header = self._known_subjects.get(subject, None)
+        if header is None:
+            header = self._add_subject(subject, await self._async_get_schema_id(ctx, subject))
+
+        return header + message.SerializeToString()
+
+    async def serialize_many(self, messages, ctx):
+        """
+        Serializes instances of a class derived from Protobuf Message, and prepends
+        them with Confluent Schema Registry framing.
+
+        See :py:meth:`ProtobufSerializer.serialize_many`.
+        """
+
+        for message in messages:
+            if message is not None and not isinstance(message, self._msg_class):
+                raise ValueError("message must be of type {} not {}"
+                                 .format(self._msg_class, type(message)))
+
+        subject = self._subject_name_func(ctx, self._msg_class.DESCRIPTOR.full_name)
+
+        header = self._known_subjects.get(subject, None)
+        if header is None:
+            header = self._add_subject(subject, await self._async_get_schema_id(ctx, subject))
+
+        return self._write_many(header, messages)
 
 
 class ProtobufDeserializer(object):
@@ -448,8 +666,13 @@ class ProtobufDeserializer(object):
     Deserializer for Protobuf serialized data with Confluent Schema Registry framing.
 
     Args:
-        message_type (Message derived type): Protobuf Message type.
+        message_type (Message derived type or list): Protobuf Message type, or
+            the Protobuf Message types to deserialize from a topic carrying
+            several message types.
         conf (dict): Configuration dictionary.
+        schema_registry_client (SchemaRegistryClient, optional): Schema Registry
+            client instance, used to tell which message type a record was
+            serialized with.
 
     ProtobufDeserializer configuration properties:
 
@@ -468,18 +691,24 @@ class ProtobufDeserializer(object):
     |                                     |          | in a future version of the client.                   |
     +-------------------------------------+----------+------------------------------------------------------+
 
+    Records are parsed into the Message type identified by their schema id and
+    message index array. With a single message_type and no
+    schema_registry_client every record is parsed into message_type. Records
+    of a message type not listed in message_type are skipped without being
+    parsed, None is returned for them.
 
     See Also:
     `Protobuf API reference <https://googleapis.dev/python/protobuf/latest/google/protobuf.html>`_
     """
 
-    __slots__ = ['_msg_class', '_index_array', '_use_deprecated_format']
+    __slots__ = ['_msg_class', '_index_array', '_use_deprecated_format', '_registry',
+                 '_subscribed', '_index_classes', '_msg_classes']
 
     _default_conf = {
         'use.deprecated.format': False,
     }
 
-    def __init__(self, message_type, conf=None):
+    def __init__(self, message_type, conf=None, schema_registry_client=None):
 
         # Require use.deprecated.format to be explicitly configured
         # during a transitionary period since old/new format are
@@ -508,9 +737,31 @@ class ProtobufDeserializer(object):
                           "consumers to 'use.deprecated.format':False as "
                           "soon as possible")
 
-        descriptor = message_type.DESCRIPTOR
-        self._index_array = _create_index_array(descriptor)
-        self._msg_class = MessageFactory().GetPrototype(descriptor)
+        message_types = message_type if isinstance(message_type, (list, tuple)) else [message_type]
+        if len(message_types) == 0:
+            raise ValueError("message_type must not be empty")
+
+        msg_classes = [_get_message_class(msg_type.DESCRIPTOR) for msg_type in message_types]
+        self._msg_class = msg_classes[0]
+        self._index_array = _create_index_array(self._msg_class.DESCRIPTOR)
+        self._registry = schema_registry_client
+        self._subscribed = {msg_class.DESCRIPTOR.full_name: msg_class for msg_class in msg_classes}
+
+        # index array -> message class, used without a Schema Registry client
+        self._index_classes = None
+        if schema_registry_client is None and len(msg_classes) > 1:
+            self._index_classes = {}
+            for msg_class in msg_classes:
+                msg_idx = tuple(_create_index_array(msg_class.DESCRIPTOR))
+                if msg_idx in self._index_classes:
+                    raise ValueError("{} and {} share the message index array {}, a "
+                                     "schema_registry_client is required to tell them apart"
+                                     .format(self._index_classes[msg_idx].DESCRIPTOR.full_name,
+                                             msg_class.DESCRIPTOR.full_name, list(msg_idx)))
+                self._index_classes[msg_idx] = msg_class
+
+        # schema id -> {index array: message class, None if not subscribed}
+        self._msg_classes = {}
 
     @staticmethod
     def _decode_varint(buf, zigzag=True):
@@ -604,36 +855,190 @@ class ProtobufDeserializer(object):
                 operation.
 
         Returns:
-            Message: Protobuf Message instance.
+            Message: Protobuf Message instance, None if the message type is
+            not subscribed to.
 
         Raises:
             SerializerError: If there was an error reading the Confluent framing
                 data, or parsing the protobuf serialized message.
         """
 
+        return self._read(data)
+
+    def _read(self, data):
         if data is None:
             return None
 
         # SR wire protocol + msg_index length
-        if len(data) < 6:
-            raise SerializationError("Expecting data framing of length 6 bytes or "
-                                     "more but total data size is {} bytes. This "
-                                     "message was not produced with a Confluent "
-                                     "Schema Registry serializer".format(len(data)))
-
-        with _ContextStringIO(data) as payload:
-            magic, schema_id = struct.unpack('>bI', payload.read(5))
-            if magic != _MAGIC_BYTE:
-                raise SerializationError("Unknown magic byte. This message was "
-                                         "not produced with a Confluent "
-                                         "Schema Registry serializer")
-
-            # Protobuf Messages are self-describing; no need to query schema
-            _ = self._read_index_array(payload, zigzag=not self._use_deprecated_format)
-            msg = self._msg_class()
+        schema_id = _framing.read_schema_id(data)
+
+        # Protobuf Messages are self-describing; the schema is only queried
+        # to resolve the message type
+        msg_index, offset = _framing.read_msg_index(data, zigzag=not self._use_deprecated_format)
+        msg_class = self._get_msg_class(schema_id, msg_index)
+        if msg_class is None:
+            return None
+
+        msg = msg_class()
+        try:
+            msg.ParseFromString(_framing.payload(data, offset))
+        except DecodeError as e:
+            raise SerializationError(str(e))
+
+        return msg
+
+    def deserialize_many(self, datas, ctx):
+        """
+        Deserialize serialized protobuf messages with Confluent Schema Registry
+        framing.
+
+        Args:
+            datas (list(bytes)): Serialized protobuf messages with Confluent
+                Schema Registry framing.
+
+            ctx (SerializationContext): Metadata relevant to the serialization
+                operation.
+
+        Returns:
+            list(Message): Protobuf Message instances, None for None data.
+
+        Raises:
+            SerializerError: If there was an error reading the Confluent framing
+                data, or parsing a protobuf serialized message.
+        """
+
+        self._add_schemas([_framing.read_schema_id(data) for data in datas if data is not None])
+        return self._read_many(datas)
+
+    def _read_many(self, datas):
+        msgs = []
+        # framing of the previous record and its message class, records of a
+        # batch mostly share both, the framing is self-delimiting
+        header = None
+        msg_class = None
+        for data in datas:
+            if data is None:
+                msgs.append(None)
+                continue
+
+            if header is None or data[:len(header)] != header:
+                schema_id = _framing.read_schema_id(data)
+                msg_index, offset = _framing.read_msg_index(data, zigzag=not self._use_deprecated_format)
+                msg_class = self._get_msg_class(schema_id, msg_index)
+                header = bytes(data[:offset])
+
+            if msg_class is None:
+                msgs.append(None)
+                continue
+
+            msg = msg_class()
             try:
-                msg.ParseFromString(payload.read())
+                msg.ParseFromString(_framing.payload(data, len(header)))
             except DecodeError as e:
                 raise SerializationError(str(e))
+            msgs.append(msg)
+
+        return msgs
+
+    def _get_msg_class(self, schema_id, msg_index):
+        """
+        Returns the message class to parse a record into, None if its message
+        type is not subscribed to.
+
+        Args:
+            schema_id (int): Schema id of the record
+
+            msg_index (list(int)): Message index array of the record
+
+        Raises:
+            SerializationError: If the message index array is not found in the schema.
+        """
+
+        if self._registry is None:
+            if self._index_classes is None:
+                return self._msg_class
+            return self._index_classes.get(tuple(msg_index), None)
+
+        msg_classes = self._msg_classes.get(schema_id, None)
+        if msg_classes is None:
+            msg_classes = self._add_schema(schema_id, self._registry.get_schema(schema_id, fmt='serialized'))
+
+        try:
+            return msg_classes[tuple(msg_index)]
+        except KeyError:
+            raise SerializationError("Message index array {} not found in schema {}"
+                                     .format(msg_index, schema_id))
+
+    def _add_schemas(self, schema_ids):
+        """
+        Fetches the schemas not seen yet, concurrently, once per schema id.
+        """
+
+        if self._registry is None:
+            return
+        missing = sorted(set(schema_ids).difference(self._msg_classes))
+        schemas = _map_concurrently(lambda schema_id: self._registry.get_schema(schema_id, fmt='serialized'),
+                                    missing)
+        for schema_id, schema in zip(missing, schemas):
+            self._add_schema(schema_id, schema)
+
+    def _add_schema(self, schema_id, schema):
+        """
+        Maps the message index arrays of a schema in serialized format to the
+        subscribed message classes.
+        """
+
+        file_desc = descriptor_pb2.FileDescriptorProto.FromString(
+            base64.standard_b64decode(schema.schema_str))
+        msg_classes = {msg_idx: self._subscribed.get(name, None)
+                       for msg_idx, name in _index_message_names(file_desc).items()}
+        self._msg_classes[schema_id] = msg_classes
+        return msg_classes
+
+
+class AsyncProtobufDeserializer(ProtobufDeserializer):
+    """
+    ProtobufDeserializer for use with an
+    :py:class:`~confluent_kafka.schema_registry.async_schema_registry_client.AsyncSchemaRegistryClient`.
+
+    Calls are awaited: ``msg = await deserializer(data, ctx)``. The Schema
+    Registry is only queried to resolve the message type of a record, the
+    requests do not block the event loop.
+
+    See :py:class:`ProtobufDeserializer` for arguments and configuration properties.
+    """
+    __slots__ = []
+
+    async def _async_add_schemas(self, schema_ids):
+        if self._registry is None:
+            return
+        missing = sorted(set(schema_ids).difference(self._msg_classes))
+        schemas = await asyncio.gather(*[self._registry.get_schema(schema_id, fmt='serialized')
+                                         for schema_id in missing])
+        for schema_id, schema in zip(missing, schemas):
+            self._add_schema(schema_id, schema)
+
+    async def __call__(self, data, ctx):
+        """
+        Deserialize a serialized protobuf message with Confluent Schema Registry
+        framing.
+
+        See :py:meth:`ProtobufDeserializer.__call__`.
+        """
+
+        if data is None:
+            return None
+
+        await self._async_add_schemas([_framing.read_schema_id(data)])
+        return super(AsyncProtobufDeserializer, self).__call__(data, ctx)
+
+    async def deserialize_many(self, datas, ctx):
+        """
+        Deserialize serialized protobuf messages with Confluent Schema Registry
+        framing.
+
+        See :py:meth:`ProtobufDeserializer.deserialize_many`.
+        """
 
-            return msg
+        await self._async_add_schemas([_framing.read_schema_id(data) for data in datas if data is not None])
+        return self._read_many(datas)
@@ -17,8 +17,11 @@
 #
 import json
 import logging
+import sqlite3
 import urllib
-from collections import defaultdict
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from threading import Lock
 
 from requests import (Session,
@@ -48,11 +51,98 @@ except NameError:
 
 log = logging.getLogger(__name__)
 VALID_AUTH_PROVIDERS = ['URL', 'USER_INFO']
+# Maximum number of concurrent warm up requests, the default HTTP connection pool size.
+_WARM_UP_WORKERS = 10
 
 
-class _RestClient(object):
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _map_concurrently(func, items):
     """
-    HTTP client for Confluent Schema Registry.
+    Calls func with each item on a thread pool.
+
+    Args:
+        func (callable): Callable(item) -> result
+
+        items (list): Arguments func is called with
+
+    Returns:
+        list: The results, in the order of items
+
+    Raises:
+        The first exception raised by func
+    """
+
+    if len(items) <= 1:
+        return [func(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(len(items), _WARM_UP_WORKERS)) as executor:
+        return list(executor.map(func, items))
+
+
+def _pop_cache_conf(conf):
+    """
+    Removes the cache properties from a client configuration.
+
+    Args:
+        conf (dict): Client configuration
+
+    Returns:
+        tuple(int, float, float, str): Cache capacity, latest and negative entry
+        time-to-live, persistent cache path
+    """
+
+    cache_capacity = conf.pop('cache.capacity', 1000)
+    if not isinstance(cache_capacity, int) or isinstance(cache_capacity, bool):
+        raise TypeError("cache.capacity must be an instance of int, not "
+                        + str(type(cache_capacity)))
+
+    cache_latest_ttl = conf.pop('cache.latest.ttl.sec', 30)
+    if cache_latest_ttl is not None and not _is_number(cache_latest_ttl):
+        raise TypeError("cache.latest.ttl.sec must be a number, not "
+                        + str(type(cache_latest_ttl)))
+
+    cache_negative_ttl = conf.pop('cache.negative.ttl.sec', 5)
+    if not _is_number(cache_negative_ttl):
+        raise TypeError("cache.negative.ttl.sec must be a number, not "
+                        + str(type(cache_negative_ttl)))
+
+    cache_persistent_path = conf.pop('cache.persistent.path', None)
+    if cache_persistent_path is not None and not isinstance(cache_persistent_path, string_type):
+        raise TypeError("cache.persistent.path must be a str, not "
+                        + str(type(cache_persistent_path)))
+
+    return cache_capacity, cache_latest_ttl, cache_negative_ttl, cache_persistent_path
+
+
+def _is_fixed_version(version):
+    """
+    Returns True if version refers to a specific version rather than the latest one.
+    """
+    return isinstance(version, int) and not isinstance(version, bool) and version >= 0
+
+
+def _registered_schema(response):
+    """
+    Creates a RegisteredSchema from a Schema Registry subject version response.
+    """
+    return RegisteredSchema(schema_id=response['id'],
+                            schema=Schema(response['schema'],
+                                          response.get('schemaType', 'AVRO'),
+                                          [
+                                              SchemaReference(name=ref['name'],
+                                                              subject=ref['subject'],
+                                                              version=ref['version'])
+                                              for ref in response.get('references', [])
+                                          ]),
+                            subject=response['subject'],
+                            version=response['version'])
+
+
+class _BaseRestClient(object):
+    """
+    Configuration and response handling shared by the Schema Registry HTTP clients.
 
     See SchemaRegistryClient for configuration details.
 
@@ -61,8 +151,6 @@ class _RestClient(object):
     """
 
     def __init__(self, conf):
-        self.session = Session()
-
         # copy dict to avoid mutating the original
         conf_copy = conf.copy()
 
@@ -76,21 +164,17 @@ class _RestClient(object):
             raise ValueError("Invalid url {}".format(base_url))
         self.base_url = base_url.rstrip('/')
 
-        # The following configs map Requests Session class properties.
-        # See the API docs for specifics.
-        # https://requests.readthedocs.io/en/master/api/#request-sessions
-        ca = conf_copy.pop('ssl.ca.location', None)
-        if ca is not None:
-            self.session.verify = ca
+        self.ca = conf_copy.pop('ssl.ca.location', None)
 
         key = conf_copy.pop('ssl.key.location', None)
         cert = conf_copy.pop('ssl.certificate.location', None)
 
+        self.cert = None
         if cert is not None and key is not None:
-            self.session.cert = (cert, key)
+            self.cert = (cert, key)
 
         if cert is not None and key is None:
-            self.session.cert = cert
+            self.cert = cert
 
         if key is not None and cert is None:
             raise ValueError("ssl.certificate.location required when"
@@ -111,13 +195,85 @@ class _RestClient(object):
                 raise ValueError("basic.auth.user.info must be in the form"
                                  " of {username}:{password}")
 
-        self.session.auth = userinfo if userinfo != ('', '') else None
+        self.auth = userinfo if userinfo != ('', '') else None
 
         # Any leftover keys are unknown to _RestClient
         if len(conf_copy) > 0:
             raise ValueError("Unrecognized properties: {}"
                              .format(", ".join(conf_copy.keys())))
 
+    @staticmethod
+    def _prepare_request(body):
+        """
+        Returns the headers and encoded content of a Schema Registry request.
+
+        Args:
+            body (dict): Request content
+
+        Returns:
+            tuple(dict, str): Request headers and content
+        """
+
+        headers = {'Accept': "application/vnd.schemaregistry.v1+json,"
+                             " application/vnd.schemaregistry+json,"
+                             " application/json"}
+
+        if body is not None:
+            body = json.dumps(body)
+            headers = {'Content-Length': str(len(body)),
+                       'Content-Type': "application/vnd.schemaregistry.v1+json"}
+
+        return headers, body
+
+    @staticmethod
+    def _handle_response(response):
+        """
+        Returns the content of a successful response, raises SchemaRegistryError otherwise.
+
+        Args:
+            response: HTTP response
+
+        Returns:
+            dict: Schema Registry response content.
+        """
+
+        try:
+            if 200 <= response.status_code <= 299:
+                return response.json()
+            raise SchemaRegistryError(response.status_code,
+                                      response.json().get('error_code'),
+                                      response.json().get('message'))
+        # Schema Registry may return malformed output when it hits unexpected errors
+        except (ValueError, KeyError, AttributeError):
+            raise SchemaRegistryError(response.status_code,
+                                      -1,
+                                      "Unknown Schema Registry Error: "
+                                      + str(response.content))
+
+
+class _RestClient(_BaseRestClient):
+    """
+    HTTP client for Confluent Schema Registry.
+
+    See SchemaRegistryClient for configuration details.
+
+    Args:
+        conf (dict): Dictionary containing _RestClient configuration
+    """
+
+    def __init__(self, conf):
+        super(_RestClient, self).__init__(conf)
+
+        # The following configs map Requests Session class properties.
+        # See the API docs for specifics.
+        # https://requests.readthedocs.io/en/master/api/#request-sessions
+        self.session = Session()
+        if self.ca is not None:
+            self.session.verify = self.ca
+        if self.cert is not None:
+            self.session.cert = self.cert
+        self.session.auth = self.auth
+
     def _close(self):
         self.session.close()
 
@@ -156,46 +312,288 @@ class _RestClient(object):
             dict: Schema Registry response content.
         """
 
-        headers = {'Accept': "application/vnd.schemaregistry.v1+json,"
-                             " application/vnd.schemaregistry+json,"
-                             " application/json"}
-
-        if body is not None:
-            body = json.dumps(body)
-            headers = {'Content-Length': str(len(body)),
-                       'Content-Type': "application/vnd.schemaregistry.v1+json"}
+        headers, body = self._prepare_request(body)
 
         response = self.session.request(
             method, url="/".join([self.base_url, url]),
             headers=headers, data=body, params=query)
 
+        return self._handle_response(response)
+
+
+class _LRUCache(object):
+    """
+    Thread-safe LRU cache with an optional per-entry time-to-live.
+
+    Args:
+        capacity (int): Maximum number of entries, the least recently used
+            entry is evicted once exceeded.
+
+        ttl (float, optional): Seconds an entry stays valid for. Entries
+            never expire if None.
+    """
+
+    def __init__(self, capacity, ttl=None):
+        self.lock = Lock()
+        self.capacity = capacity
+        self.ttl = ttl
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """
+        Get the value cached for key.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            The cached value if present and not expired; else None
+        """
+
+        with self.lock:
+            entry = self._entries.get(key, None)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        """
+        Cache value for key.
+
+        Args:
+            key: Cache key
+
+            value: Value to cache, must not be None
+
+            ttl (float, optional): Overrides the cache's time-to-live for this entry.
+        """
+
+        if ttl is None:
+            ttl = self.ttl
+        if self.capacity <= 0 or (ttl is not None and ttl <= 0):
+            return
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+
+        with self.lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+    def remove_if(self, predicate):
+        """
+        Remove all entries matching predicate.
+
+        Args:
+            predicate (callable): Callable(key, value) -> bool
+        """
+
+        with self.lock:
+            for key in [key for key, (value, _) in self._entries.items() if predicate(key, value)]:
+                del self._entries[key]
+
+    def clear(self):
+        with self.lock:
+            self._entries.clear()
+
+
+class _NotFound(object):
+    """
+    Negative cache entry, remembers a 404 response from the Schema Registry.
+    """
+    __slots__ = ['error_code', 'error_message']
+
+    def __init__(self, error):
+        self.error_code = error.error_code
+        self.error_message = error.error_message
+
+    def raise_error(self):
+        raise SchemaRegistryError(404, self.error_code, self.error_message)
+
+
+class _PersistentSchemaStore(object):
+    """
+    SQLite file holding the entries which never change once registered:
+    schemas by id and subject versions by number.
+
+    Rows are keyed by Schema Registry URL so a file may be shared by clients
+    of different registries. Storage errors are logged and otherwise ignored,
+    the store only saves Schema Registry round trips.
+
+    Args:
+        path (str): Database file path, created if missing.
+
+        registry_url (str): URL of the Schema Registry the entries belong to.
+    """
+
+    def __init__(self, path, registry_url):
+        self.lock = Lock()
+        self.path = path
+        # credentials in the url are not written to disk
+        url = urllib.parse.urlsplit(registry_url)
+        self.registry = urllib.parse.urlunsplit((url.scheme, url.hostname + (':{}'.format(url.port)
+                                                                             if url.port else ''),
+                                                 url.path, '', ''))
+        self._conn = None
         try:
-            if 200 <= response.status_code <= 299:
-                return response.json()
-            raise SchemaRegistryError(response.status_code,
-                                      response.json().get('error_code'),
-                                      response.json().get('message'))
-        # Schema Registry may return malformed output when it hits unexpected errors
-        except (ValueError, KeyError, AttributeError):
-            raise SchemaRegistryError(response.status_code,
-                                      -1,
-                                      "Unknown Schema Registry Error: "
-                                      + str(response.content))
+            conn = sqlite3.connect(path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS schemas"
+                         " (registry TEXT, id INTEGER, schema TEXT, schema_type TEXT, refs TEXT,"
+                         " PRIMARY KEY (registry, id))")
+            conn.execute("CREATE TABLE IF NOT EXISTS versions"
+                         " (registry TEXT, subject TEXT, version INTEGER, id INTEGER,"
+                         " PRIMARY KEY (registry, subject, version))")
+        except sqlite3.Error as e:
+            log.warning("Persistent schema cache {} disabled: {}".format(path, e))
+            return
+        self._conn = conn
+
+    def _execute(self, sql, params=()):
+        if self._conn is None:
+            return []
+        try:
+            with self.lock:
+                return self._conn.execute(sql, params).fetchall()
+        except sqlite3.Error as e:
+            log.warning("Persistent schema cache {} error: {}".format(self.path, e))
+            return []
+
+    @staticmethod
+    def _schema(schema_str, schema_type, refs):
+        return Schema(schema_str, schema_type,
+                      [SchemaReference(name=ref['name'], subject=ref['subject'], version=ref['version'])
+                       for ref in json.loads(refs)])
+
+    def get_schema(self, schema_id):
+        """
+        Returns:
+            Schema: The stored schema if known; else None
+        """
+
+        rows = self._execute("SELECT schema, schema_type, refs FROM schemas"
+                             " WHERE registry = ? AND id = ?", (self.registry, schema_id))
+        return self._schema(*rows[0]) if rows else None
+
+    def set_schema(self, schema_id, schema):
+        refs = json.dumps([{'name': ref.name, 'subject': ref.subject, 'version': ref.version}
+                           for ref in schema.references or []])
+        self._execute("INSERT OR REPLACE INTO schemas VALUES (?, ?, ?, ?, ?)",
+                      (self.registry, schema_id, schema.schema_str, schema.schema_type, refs))
+
+    def get_version(self, subject, version):
+        """
+        Returns:
+            RegisteredSchema: The stored subject version if known; else None
+        """
+
+        rows = self._execute("SELECT v.id, s.schema, s.schema_type, s.refs FROM versions v"
+                             " JOIN schemas s ON s.registry = v.registry AND s.id = v.id"
+                             " WHERE v.registry = ? AND v.subject = ? AND v.version = ?",
+                             (self.registry, subject, version))
+        if not rows:
+            return None
+        schema_id, schema_str, schema_type, refs = rows[0]
+        return RegisteredSchema(schema_id, self._schema(schema_str, schema_type, refs), subject, version)
+
+    def set_version(self, registered_schema):
+        self.set_schema(registered_schema.schema_id, registered_schema.schema)
+        self._execute("INSERT OR REPLACE INTO versions VALUES (?, ?, ?, ?)",
+                      (self.registry, registered_schema.subject, registered_schema.version,
+                       registered_schema.schema_id))
+
+    def remove_versions(self, subject, version=None):
+        if version is None:
+            self._execute("DELETE FROM versions WHERE registry = ? AND subject = ?",
+                          (self.registry, subject))
+        else:
+            self._execute("DELETE FROM versions WHERE registry = ? AND subject = ? AND version = ?",
+                          (self.registry, subject, version))
+
+    def schemas(self, limit):
+        """
+        Returns:
+            list(tuple(int, Schema)): Up to limit stored schemas with their ids
+        """
+
+        rows = self._execute("SELECT id, schema, schema_type, refs FROM schemas"
+                             " WHERE registry = ? LIMIT ?", (self.registry, limit))
+        return [(row[0], self._schema(*row[1:])) for row in rows]
+
+    def versions(self, limit):
+        """
+        Returns:
+            list(RegisteredSchema): Up to limit stored subject versions
+        """
+
+        rows = self._execute("SELECT v.subject, v.version, v.id, s.schema, s.schema_type, s.refs"
+                             " FROM versions v JOIN schemas s ON s.registry = v.registry AND s.id = v.id"
+                             " WHERE v.registry = ? LIMIT ?", (self.registry, limit))
+        return [RegisteredSchema(row[2], self._schema(*row[3:]), row[0], row[1]) for row in rows]
+
+    def close(self):
+        if self._conn is not None:
+            with self.lock:
+                self._conn.close()
+                self._conn = None
 
 
 class _SchemaCache(object):
     """
     Thread-safe cache for use with the Schema Registry Client.
 
-    This cache may be used to retrieve schema ids, schemas or to check
-    known subject membership.
+    This cache may be used to retrieve schema ids, schemas, registered
+    versions or to check known subject membership.
+
+    Entries which never change once registered (schemas by id, subject
+    versions by number) are only evicted when the cache is full. Entries
+    which may change (latest versions, version lists, compatibility levels)
+    also expire after ``latest_ttl`` seconds. Schema Registry 404 responses
+    are remembered for ``negative_ttl`` seconds.
+
+    Args:
+        capacity (int): Maximum number of entries per index.
+
+        latest_ttl (float, optional): Time-to-live of mutable entries, never
+            expire if None.
+
+        negative_ttl (float): Time-to-live of not found entries, not cached if 0.
+
+        store (_PersistentSchemaStore, optional): Persistent store schemas by
+            id and subject versions are loaded from and written through to.
     """
 
-    def __init__(self):
+    def __init__(self, capacity=1000, latest_ttl=None, negative_ttl=0, store=None):
         self.lock = Lock()
-        self.schema_id_index = {}
-        self.schema_index = {}
-        self.subject_schemas = defaultdict(set)
+        self.negative_ttl = negative_ttl
+        self.store = store
+        # key -> Future of the request in flight
+        self.in_flight = {}
+        # schema_id -> Schema
+        self.schema_id_index = _LRUCache(capacity)
+        # (subject, Schema) -> schema_id, registrations by this client
+        self.subject_schema_index = _LRUCache(capacity)
+        # (subject, Schema, normalize) -> RegisteredSchema
+        self.lookup_index = _LRUCache(capacity)
+        # (subject, version) -> RegisteredSchema
+        self.version_index = _LRUCache(capacity)
+        # (kind, subject) -> latest RegisteredSchema, versions or compatibility level
+        self.latest_index = _LRUCache(capacity, latest_ttl)
+
+        if store is not None and capacity > 0:
+            for schema_id, schema in store.schemas(capacity):
+                self.schema_id_index.set(schema_id, schema)
+            for registered_schema in store.versions(capacity):
+                self.version_index.set((registered_schema.subject, registered_schema.version),
+                                       registered_schema)
 
     def set(self, schema_id, schema, subject_name=None):
         """
@@ -212,11 +610,11 @@ class _SchemaCache(object):
             int: The schema_id
         """
 
-        with self.lock:
-            self.schema_id_index[schema_id] = schema
-            self.schema_index[schema] = schema_id
-            if subject_name is not None:
-                self.subject_schemas[subject_name].add(schema)
+        self.schema_id_index.set(schema_id, schema)
+        if subject_name is not None:
+            self.subject_schema_index.set((subject_name, schema), schema_id)
+        if self.store is not None:
+            self.store.set_schema(schema_id, schema)
 
     def get_schema(self, schema_id):
         """
@@ -229,7 +627,10 @@ class _SchemaCache(object):
             Schema: The schema if known; else None
         """
 
-        return self.schema_id_index.get(schema_id, None)
+        schema = self.schema_id_index.get(schema_id)
+        if isinstance(schema, _NotFound):
+            return None
+        return schema
 
     def get_schema_id_by_subject(self, subject, schema):
         """
@@ -244,9 +645,133 @@ class _SchemaCache(object):
             int: Schema ID if known; else None
         """
 
+        return self.subject_schema_index.get((subject, schema))
+
+    def get_or_fetch(self, index, key, fetch, *args):
+        """
+        Get the value cached for key in index, fetching and caching it on a miss.
+
+        Concurrent misses for the same key share a single fetch. A
+        SchemaRegistryError with HTTP status 404 raised by fetch is cached as
+        well and raised again until it expires.
+
+        Args:
+            index (_LRUCache): One of this cache's indexes
+
+            key: Cache key
+
+            fetch (callable): Callable(*args) -> value, retrieves the value from the Schema Registry
+
+            args: Arguments passed to fetch
+
+        Returns:
+            The cached or fetched value
+        """
+
+        value = index.get(key)
+        if value is None:
+            value = self.single_flight((id(index), key), self._fetch, index, key, fetch, args)
+
+        if isinstance(value, _NotFound):
+            value.raise_error()
+        return value
+
+    def _fetch(self, index, key, fetch, args):
+        # the previous request for key may have completed since the caller's lookup
+        value = index.get(key)
+        if value is not None:
+            return value
+
+        try:
+            value = fetch(*args)
+        except SchemaRegistryError as e:
+            if e.http_status_code != 404:
+                raise
+            value = _NotFound(e)
+            index.set(key, value, self.negative_ttl)
+            return value
+
+        index.set(key, value)
+        return value
+
+    def single_flight(self, key, fetch, *args):
+        """
+        Call fetch unless a call identified by the same key is already in
+        flight, in which case its outcome is shared instead.
+
+        Args:
+            key: Identifies the request
+
+            fetch (callable): Callable(*args) -> value
+
+            args: Arguments passed to fetch
+
+        Returns:
+            The value returned by fetch
+
+        Raises:
+            Any exception raised by fetch
+        """
+
         with self.lock:
-            if schema in self.subject_schemas[subject]:
-                return self.schema_index.get(schema, None)
+            call = self.in_flight.get(key, None)
+            leader = call is None
+            if leader:
+                call = self.in_flight[key] = Future()
+
+        if not leader:
+            return call.result()
+
+        try:
+            result = fetch(*args)
+        except BaseException as e:
+            call.set_exception(e)
+            raise
+        else:
+            call.set_result(result)
+            return result
+        finally:
+            with self.lock:
+                del self.in_flight[key]
+
+    def invalidate_subject(self, subject, version=None):
+        """
+        Remove entries which may be stale after subject, or a version of it, was deleted.
+
+        Args:
+            subject (str): Subject name
+
+            version (int, optional): Version which was deleted, all versions if None.
+        """
+
+        self.latest_index.remove_if(lambda key, value: key[1] == subject)
+        self.lookup_index.remove_if(lambda key, value: key[0] == subject)
+        self.subject_schema_index.remove_if(lambda key, value: key[0] == subject)
+        if version is None:
+            self.version_index.remove_if(lambda key, value: key[0] == subject)
+        else:
+            self.version_index.remove_if(lambda key, value: key == (subject, version))
+        if self.store is not None:
+            self.store.remove_versions(subject, version)
+
+    def invalidate_registered(self, subject):
+        """
+        Remove entries which may be stale after a schema was registered under subject.
+
+        Args:
+            subject (str): Subject name
+        """
+
+        self.latest_index.remove_if(lambda key, value: key[1] == subject)
+        self.lookup_index.remove_if(lambda key, value: key[0] == subject and isinstance(value, _NotFound))
+        self.version_index.remove_if(lambda key, value: key[0] == subject and isinstance(value, _NotFound))
+
+    def invalidate_compatibility(self):
+        """
+        Remove cached compatibility levels.
+        """
+
+        self.latest_index.remove_if(lambda key, value: key[0] == 'compatibility')
 
 
 class SchemaRegistryClient(object):
@@ -281,6 +806,35 @@ class SchemaRegistryClient(object):
     |                              |      | By default userinfo is extracted from           |
     |                              |      | the URL if present.                             |
     +------------------------------+------+-------------------------------------------------+
+    |                              |      | Maximum number of entries kept per cached       |
+    | ``cache.capacity``           | int  | lookup, least recently used entries are evicted |
+    |                              |      | first. 0 disables caching.                      |
+    |                              |      |                                                 |
+    |                              |      | Defaults to 1000.                               |
+    +------------------------------+------+-------------------------------------------------+
+    |                              |      | Seconds latest versions, subject version lists  |
+    | ``cache.latest.ttl.sec``     | int  | and compatibility levels are cached for. 0      |
+    |                              |      | disables caching them, None caches them until   |
+    |                              |      | evicted.                                        |
+    |                              |      |                                                 |
+    |                              |      | Defaults to 30.                                 |
+    +------------------------------+------+-------------------------------------------------+
+    |                              |      | Seconds a "not found" (HTTP 404) response is    |
+    | ``cache.negative.ttl.sec``   | int  | cached for. 0 disables negative caching.        |
+    |                              |      |                                                 |
+    |                              |      | Defaults to 5.                                  |
+    +------------------------------+------+-------------------------------------------------+
+    |                              |      | Path to a SQLite file schemas by id and subject |
+    | ``cache.persistent.path``    | str  | versions are written to, and loaded from when   |
+    |                              |      | the client is created. The file may be shared   |
+    |                              |      | by processes and registries.                    |
+    |                              |      |                                                 |
+    |                              |      | Not set by default.                             |
+    +------------------------------+------+-------------------------------------------------+
+
+    Schemas by id and subject versions by number never change once registered
+    and are cached until evicted. Changes made through this client invalidate
+    the affected entries.
 
     Args:
         conf (dict): Schema Registry client configuration.
@@ -290,8 +844,15 @@ class SchemaRegistryClient(object):
     """  # noqa: E501
 
     def __init__(self, conf):
-        self._rest_client = _RestClient(conf)
-        self._cache = _SchemaCache()
+        # copy dict to avoid mutating the original
+        conf_copy = conf.copy()
+
+        capacity, latest_ttl, negative_ttl, persistent_path = _pop_cache_conf(conf_copy)
+        self._rest_client = _RestClient(conf_copy)
+        store = None
+        if persistent_path is not None:
+            store = _PersistentSchemaStore(persistent_path, self._rest_client.base_url)
+        self._cache = _SchemaCache(capacity, latest_ttl, negative_ttl, store)
 
     def __enter__(self):
         return self
@@ -299,6 +860,8 @@ class SchemaRegistryClient(object):
     def __exit__(self, *args):
         if self._rest_client is not None:
             self._rest_client._close()
+        if self._cache.store is not None:
+            self._cache.store.close()
 
     def register_schema(self, subject_name, schema, normalize_schemas=False):
         """
@@ -320,6 +883,16 @@ class SchemaRegistryClient(object):
             `POST Subject API Reference <https://docs.confluent.io/current/schema-registry/develop/api.html#post--subjects-(string-%20subject)-versions>`_
         """  # noqa: E501
 
+        schema_id = self._cache.get_schema_id_by_subject(subject_name, schema)
+        if schema_id is not None:
+            return schema_id
+
+        # concurrent registrations of the same schema share one request
+        return self._cache.single_flight(('register', subject_name, schema, normalize_schemas),
+                                         self._post_schema, subject_name, schema, normalize_schemas)
+
+    def _post_schema(self, subject_name, schema, normalize_schemas):
+        # a concurrent registration may have completed since the caller's lookup
         schema_id = self._cache.get_schema_id_by_subject(subject_name, schema)
         if schema_id is not None:
             return schema_id
@@ -340,10 +913,11 @@ class SchemaRegistryClient(object):
 
         schema_id = response['id']
         self._cache.set(schema_id, schema, subject_name)
+        self._cache.invalidate_registered(subject_name)
 
         return schema_id
 
-    def get_schema(self, schema_id):
+    def get_schema(self, schema_id, fmt=None):
         """
         Fetches the schema associated with ``schema_id`` from the
         Schema Registry. The result is cached so subsequent attempts will not
@@ -352,6 +926,10 @@ class SchemaRegistryClient(object):
         Args:
             schema_id (int): Schema id
 
+            fmt (str, optional): Format of the returned schema, e.g. ``serialized``
+                for a Protobuf schema as a base64 encoded FileDescriptorProto.
+                Defaults to the Schema Registry default format.
+
         Returns:
             Schema: Schema instance identified by the ``schema_id``
 
@@ -362,11 +940,20 @@ class SchemaRegistryClient(object):
          `GET Schema API Reference <https://docs.confluent.io/current/schema-registry/develop/api.html#get--schemas-ids-int-%20id>`_
         """  # noqa: E501
 
-        schema = self._cache.get_schema(schema_id)
-        if schema is not None:
-            return schema
+        # schemas in another format are cached apart from the schema_id index entries
+        key = schema_id if fmt is None else (schema_id, fmt)
+        return self._cache.get_or_fetch(self._cache.schema_id_index, key,
+                                        self._fetch_schema, schema_id, fmt)
+
+    def _fetch_schema(self, schema_id, fmt=None):
+        store = self._cache.store if fmt is None else None
+        if store is not None:
+            schema = store.get_schema(schema_id)
+            if schema is not None:
+                return schema
 
-        response = self._rest_client.get('schemas/ids/{}'.format(schema_id))
+        query = None if fmt is None else {'format': fmt}
+        response = self._rest_client.get('schemas/ids/{}'.format(schema_id), query)
         schema = Schema(schema_str=response['schema'],
                         schema_type=response.get('schemaType', 'AVRO'))
 
@@ -375,8 +962,8 @@ class SchemaRegistryClient(object):
             for ref in response.get('references', [])
         ]
 
-        self._cache.set(schema_id, schema)
-
+        if store is not None:
+            store.set_schema(schema_id, schema)
         return schema
 
     def lookup_schema(self, subject_name, schema, normalize_schemas=False):
@@ -398,6 +985,10 @@ class SchemaRegistryClient(object):
             `POST Subject API Reference <https://docs.confluent.io/current/schema-registry/develop/api.html#post--subjects-(string-%20subject)-versions>`_
         """  # noqa: E501
 
+        return self._cache.get_or_fetch(self._cache.lookup_index, (subject_name, schema, normalize_schemas),
+                                        self._fetch_lookup_schema, subject_name, schema, normalize_schemas)
+
+    def _fetch_lookup_schema(self, subject_name, schema, normalize_schemas):
         request = {'schema': schema.schema_str}
 
         # CP 5.5 adds new fields (for JSON and Protobuf).
@@ -412,19 +1003,7 @@ class SchemaRegistryClient(object):
                                           .format(_urlencode(subject_name), normalize_schemas),
                                           body=request)
 
-        schema_type = response.get('schemaType', 'AVRO')
-
-        return RegisteredSchema(schema_id=response['id'],
-                                schema=Schema(response['schema'],
-                                              schema_type,
-                                              [
-                                                  SchemaReference(name=ref['name'],
-                                                                  subject=ref['subject'],
-                                                                  version=ref['version'])
-                                                  for ref in response.get('references', [])
-                                              ]),
-                                subject=response['subject'],
-                                version=response['version'])
+        return _registered_schema(response)
 
     def get_subjects(self):
         """
@@ -469,6 +1048,8 @@ class SchemaRegistryClient(object):
             self._rest_client.delete('subjects/{}?permanent=true'
                                      .format(_urlencode(subject_name)))
 
+        self._cache.invalidate_subject(subject_name)
+
         return list
 
     def get_latest_version(self, subject_name):
@@ -488,22 +1069,8 @@ class SchemaRegistryClient(object):
             `GET Subject Version API Reference <https://docs.confluent.io/current/schema-registry/develop/api.html#get--subjects-(string-%20subject)-versions-(versionId-%20version)>`_
         """  # noqa: E501
 
-        response = self._rest_client.get('subjects/{}/versions/{}'
-                                         .format(_urlencode(subject_name),
-                                                 'latest'))
-
-        schema_type = response.get('schemaType', 'AVRO')
-        return RegisteredSchema(schema_id=response['id'],
-                                schema=Schema(response['schema'],
-                                              schema_type,
-                                              [
-                                                  SchemaReference(name=ref['name'],
-                                                                  subject=ref['subject'],
-                                                                  version=ref['version'])
-                                                  for ref in response.get('references', [])
-                                              ]),
-                                subject=response['subject'],
-                                version=response['version'])
+        return self._cache.get_or_fetch(self._cache.latest_index, ('latest', subject_name),
+                                        self._fetch_version, subject_name, 'latest')
 
     def get_version(self, subject_name, version):
         """
@@ -524,22 +1091,63 @@ class SchemaRegistryClient(object):
             `GET Subject Version API Reference <https://docs.confluent.io/current/schema-registry/develop/api.html#get--subjects-(string-%20subject)-versions-(versionId-%20version)>`_
         """  # noqa: E501
 
+        if version == 'latest':
+            return self._cache.get_or_fetch(self._cache.latest_index, ('latest', subject_name),
+                                            self._fetch_version, subject_name, version)
+
+        if _is_fixed_version(version):
+            return self._cache.get_or_fetch(self._cache.version_index, (subject_name, version),
+                                            self._fetch_version, subject_name, version)
+
+        return self._fetch_version(subject_name, version)
+
+    def _fetch_version(self, subject_name, version):
+        # only fixed versions never change
+        store = self._cache.store if _is_fixed_version(version) else None
+        if store is not None:
+            registered_schema = store.get_version(subject_name, version)
+            if registered_schema is not None:
+                return registered_schema
+
         response = self._rest_client.get('subjects/{}/versions/{}'
                                          .format(_urlencode(subject_name),
                                                  version))
 
-        schema_type = response.get('schemaType', 'AVRO')
-        return RegisteredSchema(schema_id=response['id'],
-                                schema=Schema(response['schema'],
-                                              schema_type,
-                                              [
-                                                  SchemaReference(name=ref['name'],
-                                                                  subject=ref['subject'],
-                                                                  version=ref['version'])
-                                                  for ref in response.get('references', [])
-                                              ]),
-                                subject=response['subject'],
-                                version=response['version'])
+        registered_schema = _registered_schema(response)
+        if store is not None:
+            store.set_version(registered_schema)
+        return registered_schema
+
+    def warm_up(self, subjects=None, schema_ids=None):
+        """
+        Fetches the latest version of subjects and the schemas registered
+        with schema_ids into the cache, sending the requests concurrently.
+
+        Args:
+            subjects (list(str), optional): Subject names
+
+            schema_ids (list(int), optional): Schema ids
+
+        Returns:
+            tuple(dict, dict): Latest RegisteredSchema by subject name and Schema by schema id
+
+        Raises:
+            SchemaRegistryError: if a subject or schema id was not found
+        """
+
+        subjects = list(subjects or [])
+        schema_ids = list(schema_ids or [])
+
+        calls = ([(self.get_latest_version, subject) for subject in subjects]
+                 + [(self.get_schema, schema_id) for schema_id in schema_ids])
+        results = _map_concurrently(lambda call: call[0](call[1]), calls)
+
+        latest = dict(zip(subjects, results[:len(subjects)]))
+        for registered_schema in latest.values():
+            # messages are likely written with the latest version
+            if self._cache.get_schema(registered_schema.schema_id) is None:
+                self._cache.schema_id_index.set(registered_schema.schema_id, registered_schema.schema)
+        return latest, dict(zip(schema_ids, results[len(subjects):]))
 
     def get_versions(self, subject_name):
         """
@@ -558,7 +1166,11 @@ class SchemaRegistryClient(object):
             `GET Subject Versions API Reference <https://docs.confluent.io/current/schema-registry/develop/api.html#post--subjects-(string-%20subject)-versions>`_
         """  # noqa: E501
 
-        return self._rest_client.get('subjects/{}/versions'.format(_urlencode(subject_name)))
+        # the cached list is shared, callers get their own copy
+        versions = self._cache.get_or_fetch(self._cache.latest_index, ('versions', subject_name),
+                                            self._rest_client.get,
+                                            'subjects/{}/versions'.format(_urlencode(subject_name)))
+        return list(versions)
 
     def delete_version(self, subject_name, version):
         """
@@ -582,6 +1194,9 @@ class SchemaRegistryClient(object):
         response = self._rest_client.delete('subjects/{}/versions/{}'.
                                             format(_urlencode(subject_name),
                                                    version))
+
+        self._cache.invalidate_subject(subject_name, version if _is_fixed_version(version) else None)
+
         return response
 
     def set_compatibility(self, subject_name=None, level=None):
@@ -609,12 +1224,16 @@ class SchemaRegistryClient(object):
             raise ValueError("level must be set")
 
         if subject_name is None:
-            return self._rest_client.put('config',
-                                         body={'compatibility': level.upper()})
+            result = self._rest_client.put('config',
+                                           body={'compatibility': level.upper()})
+        else:
+            result = self._rest_client.put('config/{}'
+                                           .format(_urlencode(subject_name)),
+                                           body={'compatibility': level.upper()})
+
+        self._cache.invalidate_compatibility()
 
-        return self._rest_client.put('config/{}'
-                                     .format(_urlencode(subject_name)),
-                                     body={'compatibility': level.upper()})
+        return result
 
     def get_compatibility(self, subject_name=None):
         """
@@ -639,7 +1258,8 @@ class SchemaRegistryClient(object):
         else:
             url = 'config'
 
-        result = self._rest_client.get(url)
+        result = self._cache.get_or_fetch(self._cache.latest_index, ('compatibility', subject_name),
+                                          self._rest_client.get, url)
         return result['compatibilityLevel']
 
     def test_compatibility(self, subject_name, schema, version="latest"):
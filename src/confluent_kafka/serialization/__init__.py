@@ -128,6 +128,28 @@ class Serializer(object):
 
         raise NotImplementedError
 
+    def serialize_many(self, objs, ctx=None):
+        """
+        Converts each of objs to bytes.
+
+        Implementations may override this method to amortize per object work
+        across the batch.
+
+        Args:
+            objs (list): objects to be serialized
+
+            ctx (SerializationContext): Metadata pertaining to the serialization
+                operation
+
+        Raises:
+            SerializerError if an error occurs during serialization
+
+        Returns:
+            list: bytes, or None for None objects, in the order of objs
+        """
+
+        return [self(obj, ctx) for obj in objs]
+
 
 class Deserializer(object):
     """
@@ -185,6 +207,28 @@ class Deserializer(object):
 
         raise NotImplementedError
 
+    def deserialize_many(self, values, ctx=None):
+        """
+        Converts each of values to an object.
+
+        Implementations may override this method to amortize per value work
+        across the batch.
+
+        Args:
+            values (list): bytes to be deserialized
+
+            ctx (SerializationContext): Metadata pertaining to the serialization
+                operation
+
+        Raises:
+            SerializerError if an error occurs during deserialization
+
+        Returns:
+            list: objects, or None for None values, in the order of values
+        """
+
+        return [self(value, ctx) for value in values]
+
 
 class DoubleSerializer(Serializer):
     """
@@ -1091,6 +1091,265 @@ static PyObject *Consumer_consume (Handle *self, PyObject *args,
 }
 
 
+/**
+ * @brief Create an array.array of \p typecode from the \p size bytes at \p buf.
+ */
+static PyObject *Consumer_array_new (PyObject *array_type,
+                                     const char *typecode,
+                                     const void *buf, size_t size) {
+        PyObject *arr, *r;
+
+        arr = PyObject_CallFunction(array_type, "s", typecode);
+        if (!arr)
+                return NULL;
+
+        r = PyObject_CallMethod(arr, "frombytes", "y#",
+                                (const char *)buf, (Py_ssize_t)size);
+        if (!r) {
+                Py_DECREF(arr);
+                return NULL;
+        }
+        Py_DECREF(r);
+
+        return arr;
+}
+
+
+static PyObject *Consumer_consume_columns (Handle *self, PyObject *args,
+                                           PyObject *kwargs) {
+        unsigned int num_messages = 1;
+        double tmout = -1.0f;
+        static char *kws[] = { "num_messages", "timeout", NULL };
+        rd_kafka_message_t **rkmessages;
+        rd_kafka_queue_t *rkqu = self->u.Consumer.rkqu;
+        rd_kafka_topic_t *last_rkt = NULL;
+        CallState cs;
+        Py_ssize_t i, n, cnt = 0;
+        size_t keys_size = 0, values_size = 0;
+        int64_t *cols = NULL;
+        int64_t *partitions, *offsets, *timestamps;
+        int64_t *key_offsets, *value_offsets;
+        int8_t *tstypes = NULL;
+        char *keys_buf, *values_buf, *key_valid, *value_valid;
+        PyObject *array_type = NULL, *ColumnBatch_type = NULL;
+        PyObject *topics = NULL, *errors = NULL, *last_topic = NULL;
+        PyObject *keys = NULL, *values = NULL;
+        PyObject *key_validity = NULL, *value_validity = NULL;
+        PyObject *batch_kwargs = NULL, *batch_args = NULL;
+        PyObject *batch = NULL;
+
+        if (!self->rk) {
+                PyErr_SetString(PyExc_RuntimeError,
+                                "Consumer closed");
+                return NULL;
+        }
+
+        if (!PyArg_ParseTupleAndKeywords(args, kwargs, "|Id", kws,
+                                         &num_messages, &tmout))
+                return NULL;
+
+        if (num_messages > 1000000) {
+                PyErr_SetString(PyExc_ValueError,
+                                "num_messages must be between 0 and 1000000 (1M)");
+                return NULL;
+        }
+
+        rkmessages = malloc((num_messages ? num_messages : 1) *
+                            sizeof(rd_kafka_message_t *));
+        if (!rkmessages)
+                return PyErr_NoMemory();
+
+        CallState_begin(self, &cs);
+
+        n = (Py_ssize_t)rd_kafka_consume_batch_queue(rkqu,
+                                                     cfl_timeout_ms(tmout),
+                                                     rkmessages, num_messages);
+
+        if (!CallState_end(self, &cs)) {
+                for (i = 0; i < n; i++) {
+                        rd_kafka_message_destroy(rkmessages[i]);
+                }
+                free(rkmessages);
+                return NULL;
+        }
+
+        if (n < 0) {
+                free(rkmessages);
+                cfl_PyErr_Format(rd_kafka_last_error(),
+                                 "%s", rd_kafka_err2str(rd_kafka_last_error()));
+                return NULL;
+        }
+
+        /* Size the columns up front so every buffer is allocated once. */
+        for (i = 0; i < n; i++) {
+                if (rkmessages[i]->err)
+                        continue;
+                keys_size += rkmessages[i]->key_len;
+                values_size += rkmessages[i]->len;
+                cnt++;
+        }
+
+        /* partitions, offsets and timestamps hold cnt items,
+         * key_offsets and value_offsets hold cnt + 1 items. */
+        cols = malloc(sizeof(*cols) * (cnt * 5 + 2));
+        tstypes = malloc(cnt + 1);
+        if (!cols || !tstypes) {
+                PyErr_NoMemory();
+                goto err;
+        }
+        partitions = cols;
+        offsets = partitions + cnt;
+        timestamps = offsets + cnt;
+        key_offsets = timestamps + cnt;
+        value_offsets = key_offsets + cnt + 1;
+
+        if (!(topics = PyList_New(0)) ||
+            !(errors = PyList_New(0)) ||
+            !(keys = PyBytes_FromStringAndSize(NULL, keys_size)) ||
+            !(values = PyBytes_FromStringAndSize(NULL, values_size)) ||
+            !(key_validity = PyBytes_FromStringAndSize(NULL, cnt)) ||
+            !(value_validity = PyBytes_FromStringAndSize(NULL, cnt)))
+                goto err;
+
+        keys_buf = PyBytes_AS_STRING(keys);
+        values_buf = PyBytes_AS_STRING(values);
+        key_valid = PyBytes_AS_STRING(key_validity);
+        value_valid = PyBytes_AS_STRING(value_validity);
+
+        key_offsets[0] = 0;
+        value_offsets[0] = 0;
+        cnt = 0;
+
+        for (i = 0; i < n; i++) {
+                rd_kafka_message_t *rkm = rkmessages[i];
+                rd_kafka_timestamp_type_t tstype;
+                int r;
+
+                if (rkm->err) {
+                        /* Events and errors are not part of the columns */
+                        PyObject *msgobj = Message_new0(self, rkm);
+                        if (!msgobj)
+                                goto err;
+#ifdef RD_KAFKA_V_HEADERS
+                        rd_kafka_message_detach_headers(rkm, &((Message *)msgobj)->c_headers);
+#endif
+                        r = PyList_Append(errors, msgobj);
+                        Py_DECREF(msgobj);
+                        if (r == -1)
+                                goto err;
+                        continue;
+                }
+
+                /* Consecutive messages of the same topic share the str */
+                if (!last_topic || rkm->rkt != last_rkt) {
+                        Py_XDECREF(last_topic);
+                        last_topic = PyUnicode_FromString(
+                                rd_kafka_topic_name(rkm->rkt));
+                        if (!last_topic)
+                                goto err;
+                        last_rkt = rkm->rkt;
+                }
+                if (PyList_Append(topics, last_topic) == -1)
+                        goto err;
+
+                partitions[cnt] = rkm->partition;
+                offsets[cnt] = rkm->offset;
+                timestamps[cnt] = rd_kafka_message_timestamp(rkm, &tstype);
+                tstypes[cnt] = (int8_t)tstype;
+
+                if (rkm->key_len)
+                        memcpy(keys_buf + key_offsets[cnt], rkm->key,
+                               rkm->key_len);
+                key_offsets[cnt + 1] = key_offsets[cnt] + rkm->key_len;
+                key_valid[cnt] = rkm->key != NULL;
+
+                if (rkm->len)
+                        memcpy(values_buf + value_offsets[cnt], rkm->payload,
+                               rkm->len);
+                value_offsets[cnt + 1] = value_offsets[cnt] + rkm->len;
+                value_valid[cnt] = rkm->payload != NULL;
+
+                cnt++;
+        }
+
+        for (i = 0; i < n; i++)
+                rd_kafka_message_destroy(rkmessages[i]);
+        free(rkmessages);
+        rkmessages = NULL;
+
+        array_type = cfl_PyObject_lookup("array", "array");
+        if (!array_type)
+                goto err;
+
+        ColumnBatch_type = cfl_PyObject_lookup("confluent_kafka",
+                                               "ColumnBatch");
+        if (!ColumnBatch_type)
+                goto err;
+
+        if (!(batch_kwargs = PyDict_New()) ||
+            PyDict_SetItemString(batch_kwargs, "topics", topics) == -1 ||
+            PyDict_SetItemString(batch_kwargs, "keys", keys) == -1 ||
+            PyDict_SetItemString(batch_kwargs, "key_validity",
+                                 key_validity) == -1 ||
+            PyDict_SetItemString(batch_kwargs, "values", values) == -1 ||
+            PyDict_SetItemString(batch_kwargs, "value_validity",
+                                 value_validity) == -1 ||
+            PyDict_SetItemString(batch_kwargs, "errors", errors) == -1)
+                goto err;
+
+#define _COLUMN_SET(name, typecode, buf, size) do {                     \
+                PyObject *_arr = Consumer_array_new(array_type, typecode, \
+                                                    buf, size);          \
+                int _r;                                                 \
+                if (!_arr)                                              \
+                        goto err;                                       \
+                _r = PyDict_SetItemString(batch_kwargs, name, _arr);    \
+                Py_DECREF(_arr);                                        \
+                if (_r == -1)                                           \
+                        goto err;                                       \
+        } while (0)
+
+        _COLUMN_SET("partitions", "q", partitions, sizeof(*cols) * cnt);
+        _COLUMN_SET("offsets", "q", offsets, sizeof(*cols) * cnt);
+        _COLUMN_SET("timestamps", "q", timestamps, sizeof(*cols) * cnt);
+        _COLUMN_SET("timestamp_types", "b", tstypes, cnt);
+        _COLUMN_SET("key_offsets", "q", key_offsets,
+                    sizeof(*cols) * (cnt + 1));
+        _COLUMN_SET("value_offsets", "q", value_offsets,
+                    sizeof(*cols) * (cnt + 1));
+
+#undef _COLUMN_SET
+
+        if (!(batch_args = PyTuple_New(0)))
+                goto err;
+        batch = PyObject_Call(ColumnBatch_type, batch_args, batch_kwargs);
+
+ err:
+        if (rkmessages) {
+                for (i = 0; i < n; i++)
+                        rd_kafka_message_destroy(rkmessages[i]);
+                free(rkmessages);
+        }
+        if (cols)
+                free(cols);
+        if (tstypes)
+                free(tstypes);
+        Py_XDECREF(last_topic);
+        Py_XDECREF(topics);
+        Py_XDECREF(errors);
+        Py_XDECREF(keys);
+        Py_XDECREF(values);
+        Py_XDECREF(key_validity);
+        Py_XDECREF(value_validity);
+        Py_XDECREF(array_type);
+        Py_XDECREF(ColumnBatch_type);
+        Py_XDECREF(batch_kwargs);
+        Py_XDECREF(batch_args);
+
+        return batch;
+}
+
+
 static PyObject *Consumer_close (Handle *self, PyObject *ignore) {
         CallState cs;
 
@@ -1234,6 +1493,34 @@ static PyMethodDef Consumer_methods[] = {
           "  :raises ValueError: if num_messages > 1M\n"
 	  "\n"
 	},
+	{ "consume_columns", (PyCFunction)Consumer_consume_columns,
+	  METH_VARARGS|METH_KEYWORDS,
+	  ".. py:function:: consume_columns([num_messages=1], [timeout=-1])\n"
+	  "\n"
+	  "  Consumes a batch of messages in columnar form. "
+          "Callbacks may be executed as a side effect of calling this method.\n"
+	  "\n"
+	  "  Unlike :py:func:`consume()` no :py:class:`Message` object is "
+	  "created per message: partitions, offsets and timestamps are "
+	  "returned as ``array.array`` columns and keys and values as a "
+	  "single contiguous buffer each with an offsets array, in the "
+	  "Apache Arrow binary layout. Events and errors, such as "
+	  "_PARTITION_EOF, are not part of the columns and are returned as "
+	  ":py:class:`Message` objects in :py:attr:`ColumnBatch.errors`. "
+	  "Message headers are not returned.\n"
+	  "\n"
+	  "  .. note: Callbacks may be called from this method, "
+	  "such as ``on_assign``, ``on_revoke``, et.al.\n"
+	  "\n"
+	  "  :param int num_messages: The maximum number of messages to return (default: 1).\n"
+	  "  :param float timeout: The maximum time to block waiting for message, event or callback (default: infinite (-1)). (Seconds)\n"
+	  "  :returns: The consumed messages (possibly empty on timeout)\n"
+	  "  :rtype: ColumnBatch\n"
+          "  :raises RuntimeError: if called on a closed consumer\n"
+          "  :raises KafkaError: in case of internal error\n"
+          "  :raises ValueError: if num_messages > 1M\n"
+	  "\n"
+	},
 	{ "assign", (PyCFunction)Consumer_assign, METH_O,
 	  ".. py:function:: assign(partitions)\n"
 	  "\n"
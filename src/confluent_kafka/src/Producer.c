@@ -48,41 +48,105 @@
 struct Producer_msgstate {
 	Handle   *self;
 	PyObject *dr_cb;
+        PyObject *opaque; /**< Reported to on_delivery_batch */
+        Py_buffer buf;  /**< Value buffer held until the delivery report
+                         *   with produce.zero.copy, buf.obj is NULL
+                         *   if not held. */
+        struct Producer_msgstate *next; /**< Next free msgstate in the
+                                         *   Producer's msgstate_pool */
 };
 
+/**
+ * Maximum number of free msgstates kept for reuse per Producer.
+ */
+#define PRODUCER_MSGSTATE_POOL_MAX 1024
+
 
 /**
  * Create a new per-message state.
- * Returns NULL if neither dr_cb or partitioner_cb is set.
+ * Returns NULL if no per-message state is needed: dr_cb is the default
+ * delivery report callback (or there is none), which dr_msg_cb() serves
+ * from the Producer, there is no opaque and no value buffer is held.
+ *
+ * Must be called with the GIL held.
  */
 static __inline struct Producer_msgstate *
 Producer_msgstate_new (Handle *self,
-		       PyObject *dr_cb) {
+		       PyObject *dr_cb, PyObject *opaque, int hold_buf) {
 	struct Producer_msgstate *msgstate;
 
-	msgstate = calloc(1, sizeof(*msgstate));
+        if (!hold_buf && !opaque && dr_cb == self->u.Producer.default_dr_cb)
+                return NULL;
+
+        if ((msgstate = self->u.Producer.msgstate_pool)) {
+                self->u.Producer.msgstate_pool = msgstate->next;
+                self->u.Producer.msgstate_pool_cnt--;
+                memset(msgstate, 0, sizeof(*msgstate));
+        } else
+                msgstate = calloc(1, sizeof(*msgstate));
+
 	msgstate->self = self;
 
 	if (dr_cb) {
 		msgstate->dr_cb = dr_cb;
 		Py_INCREF(dr_cb);
 	}
+        if (opaque) {
+                msgstate->opaque = opaque;
+                Py_INCREF(opaque);
+        }
 	return msgstate;
 }
 
+/**
+ * Destroy a per-message state, it is kept for reuse unless the
+ * Producer's pool is full.
+ *
+ * Must be called with the GIL held.
+ */
 static __inline void
 Producer_msgstate_destroy (struct Producer_msgstate *msgstate) {
+        Handle *self = msgstate->self;
+
 	if (msgstate->dr_cb)
 		Py_DECREF(msgstate->dr_cb);
-	free(msgstate);
+        if (msgstate->opaque)
+                Py_DECREF(msgstate->opaque);
+        if (msgstate->buf.obj)
+                PyBuffer_Release(&msgstate->buf);
+
+        if (self->u.Producer.msgstate_pool_cnt < PRODUCER_MSGSTATE_POOL_MAX) {
+                msgstate->next = self->u.Producer.msgstate_pool;
+                self->u.Producer.msgstate_pool = msgstate;
+                self->u.Producer.msgstate_pool_cnt++;
+        } else
+                free(msgstate);
 }
 
 
 static void Producer_clear0 (Handle *self) {
+        struct Producer_msgstate *msgstate;
+
         if (self->u.Producer.default_dr_cb) {
                 Py_DECREF(self->u.Producer.default_dr_cb);
                 self->u.Producer.default_dr_cb = NULL;
         }
+
+        if (self->u.Producer.dr_batch_cb) {
+                Py_DECREF(self->u.Producer.dr_batch_cb);
+                self->u.Producer.dr_batch_cb = NULL;
+        }
+
+        if (self->u.Producer.dr_batch) {
+                Py_DECREF(self->u.Producer.dr_batch);
+                self->u.Producer.dr_batch = NULL;
+        }
+
+        while ((msgstate = self->u.Producer.msgstate_pool)) {
+                self->u.Producer.msgstate_pool = msgstate->next;
+                free(msgstate);
+        }
+        self->u.Producer.msgstate_pool_cnt = 0;
 }
 
 static int Producer_clear (Handle *self) {
@@ -114,6 +178,10 @@ static int Producer_traverse (Handle *self,
 			      visitproc visit, void *arg) {
 	if (self->u.Producer.default_dr_cb)
 		Py_VISIT(self->u.Producer.default_dr_cb);
+	if (self->u.Producer.dr_batch_cb)
+		Py_VISIT(self->u.Producer.dr_batch_cb);
+	if (self->u.Producer.dr_batch)
+		Py_VISIT(self->u.Producer.dr_batch);
 
 	Handle_traverse(self, visit, arg);
 
@@ -121,29 +189,132 @@ static int Producer_traverse (Handle *self,
 }
 
 
+/**
+ * @returns a new, empty, tuple of on_delivery_batch lists.
+ */
+static PyObject *Producer_dr_batch_new (void) {
+        return Py_BuildValue("([][][][][])");
+}
+
+
+/**
+ * @brief Add a delivery report to the reports pending for
+ *        on_delivery_batch.
+ *
+ * Must be called with the GIL held.
+ *
+ * @returns 0 on success or -1 with a Python exception raised.
+ */
+static int Producer_dr_batch_add (Handle *self, const rd_kafka_message_t *rkm,
+                                  PyObject *opaque) {
+        PyObject *batch = self->u.Producer.dr_batch;
+        PyObject *values[5];
+        Py_ssize_t cnt = PyList_GET_SIZE(PyTuple_GET_ITEM(batch, 0));
+        int i, r = 0;
+
+        values[0] = KafkaError_new_or_None(rkm->err, NULL);
+        values[1] = cfl_PyUnistr(_FromString(rd_kafka_topic_name(rkm->rkt)));
+        values[2] = cfl_PyInt_FromInt(rkm->partition);
+        values[3] = PyLong_FromLongLong(rkm->offset);
+        values[4] = opaque ? opaque : Py_None;
+        Py_INCREF(values[4]);
+
+        for (i = 0 ; i < 5 ; i++) {
+                if (!values[i] ||
+                    (!r && PyList_Append(PyTuple_GET_ITEM(batch, i),
+                                         values[i]) == -1))
+                        r = -1;
+                Py_XDECREF(values[i]);
+        }
+
+        if (r == -1) {
+                /* Keep the lists the same length */
+                for (i = 0 ; i < 5 ; i++)
+                        PyList_SetSlice(PyTuple_GET_ITEM(batch, i),
+                                        cnt, PY_SSIZE_T_MAX, NULL);
+        }
+
+        return r;
+}
+
+
+/**
+ * @brief Call on_delivery_batch with the delivery reports collected by
+ *        dr_msg_cb(), if any.
+ *
+ * Must be called with the GIL held.
+ *
+ * @returns 0 on success or -1 with a Python exception raised.
+ */
+static int Producer_dr_batch_dispatch (Handle *self) {
+        PyObject *batch = self->u.Producer.dr_batch;
+        PyObject *result;
+
+        if (!batch || !PyList_GET_SIZE(PyTuple_GET_ITEM(batch, 0)))
+                return 0;
+
+        if (!(self->u.Producer.dr_batch = Producer_dr_batch_new())) {
+                self->u.Producer.dr_batch = batch;
+                return -1;
+        }
+
+        result = PyObject_CallObject(self->u.Producer.dr_batch_cb, batch);
+        Py_DECREF(batch);
+
+        if (!result)
+                return -1;
+
+        Py_DECREF(result);
+        return 0;
+}
+
+
 static void dr_msg_cb (rd_kafka_t *rk, const rd_kafka_message_t *rkm,
 			   void *opaque) {
 	struct Producer_msgstate *msgstate = rkm->_private;
 	Handle *self = opaque;
 	CallState *cs;
+	PyObject *dr_cb;
 	PyObject *args;
 	PyObject *result;
 	PyObject *msgobj;
+        int batch;
 
-	if (!msgstate)
-		return;
+        /* Messages for the default callback, or none, have no msgstate */
+        dr_cb = msgstate ? msgstate->dr_cb : self->u.Producer.default_dr_cb;
 
-	cs = CallState_get(self);
+        /* Reports without a callback of their own are collected for
+         * on_delivery_batch, if configured. */
+        batch = !dr_cb && self->u.Producer.dr_batch;
 
-	if (!msgstate->dr_cb) {
-		/* No callback defined */
-		goto done;
-	}
+        /* Return without acquiring the GIL if there is neither a callback
+         * to call nor a msgstate to destroy.
+         * Skip callback if delivery.report.only.error=true */
+        if (!msgstate &&
+            ((!dr_cb && !batch) ||
+             (self->u.Producer.dr_only_error && !rkm->err)))
+                return;
+
+	cs = CallState_get(self);
 
         /* Skip callback if delivery.report.only.error=true */
         if (self->u.Producer.dr_only_error && !rkm->err)
                 goto done;
 
+        if (batch) {
+                if (Producer_dr_batch_add(self, rkm, msgstate ?
+                                          msgstate->opaque : NULL) == -1) {
+                        CallState_crash(cs);
+                        rd_kafka_yield(rk);
+                }
+                goto done;
+        }
+
+	if (!dr_cb) {
+		/* No callback defined */
+		goto done;
+	}
+
 	msgobj = Message_new0(self, rkm);
 
         args = Py_BuildValue("(OO)", ((Message *)msgobj)->error, msgobj);
@@ -157,7 +328,7 @@ static void dr_msg_cb (rd_kafka_t *rk, const rd_kafka_message_t *rkm,
 		goto done;
 	}
 
-	result = PyObject_CallObject(msgstate->dr_cb, args);
+	result = PyObject_CallObject(dr_cb, args);
 	Py_DECREF(args);
 
 	if (result)
@@ -168,14 +339,15 @@ static void dr_msg_cb (rd_kafka_t *rk, const rd_kafka_message_t *rkm,
 	}
 
  done:
-	Producer_msgstate_destroy(msgstate);
+        if (msgstate)
+                Producer_msgstate_destroy(msgstate);
 	CallState_resume(cs);
 }
 
 
 #if HAVE_PRODUCEV
 static rd_kafka_resp_err_t
-Producer_producev (Handle *self,
+Producer_producev (Handle *self, int msgflags,
                    const char *topic, int32_t partition,
                    const void *value, size_t value_len,
                    const void *key, size_t key_len,
@@ -186,7 +358,7 @@ Producer_producev (Handle *self,
                    ) {
 
         return rd_kafka_producev(self->rk,
-                                 RD_KAFKA_V_MSGFLAGS(RD_KAFKA_MSG_F_COPY),
+                                 RD_KAFKA_V_MSGFLAGS(msgflags),
                                  RD_KAFKA_V_TOPIC(topic),
                                  RD_KAFKA_V_PARTITION(partition),
                                  RD_KAFKA_V_KEY(key, (size_t)key_len),
@@ -202,7 +374,7 @@ Producer_producev (Handle *self,
 #else
 
 static rd_kafka_resp_err_t
-Producer_produce0 (Handle *self,
+Producer_produce0 (Handle *self, int msgflags,
                    const char *topic, int32_t partition,
                    const void *value, size_t value_len,
                    const void *key, size_t key_len,
@@ -213,7 +385,7 @@ Producer_produce0 (Handle *self,
         if (!(rkt = rd_kafka_topic_new(self->rk, topic, NULL)))
                 return RD_KAFKA_RESP_ERR__INVALID_ARG;
 
-	if (rd_kafka_produce(rkt, partition, RD_KAFKA_MSG_F_COPY,
+	if (rd_kafka_produce(rkt, partition, msgflags,
 			     (void *)value, value_len,
 			     (void *)key, key_len, opaque) == -1)
                 err = rd_kafka_last_error();
@@ -230,8 +402,10 @@ static PyObject *Producer_produce (Handle *self, PyObject *args,
 	const char *topic, *value = NULL, *key = NULL;
         Py_ssize_t value_len = 0, key_len = 0;
 	int partition = RD_KAFKA_PARTITION_UA;
+	PyObject *valueobj = NULL, *opaque = NULL;
 	PyObject *headers = NULL, *dr_cb = NULL, *dr_cb2 = NULL;
         long long timestamp = 0;
+        int msgflags = RD_KAFKA_MSG_F_COPY;
         rd_kafka_resp_err_t err;
 	struct Producer_msgstate *msgstate;
 #ifdef RD_KAFKA_V_HEADERS
@@ -246,15 +420,26 @@ static PyObject *Producer_produce (Handle *self, PyObject *args,
 			       "on_delivery", /* Alias */
                    "timestamp",
                    "headers",
+                   "opaque",
 			       NULL };
 
-	if (!PyArg_ParseTupleAndKeywords(args, kwargs,
-					 "s|z#z#iOOLO"
+        if (self->u.Producer.zero_copy) {
+                /* The value may be any buffer protocol object */
+                if (!PyArg_ParseTupleAndKeywords(args, kwargs,
+                                                 "s|Oz#iOOLOO", kws,
+                                                 &topic, &valueobj,
+                                                 &key, &key_len, &partition,
+                                                 &dr_cb, &dr_cb2,
+                                                 &timestamp, &headers,
+                                                 &opaque))
+                        return NULL;
+        } else if (!PyArg_ParseTupleAndKeywords(args, kwargs,
+					 "s|z#z#iOOLOO"
                                          , kws,
 					 &topic, &value, &value_len,
 					 &key, &key_len, &partition,
 					 &dr_cb, &dr_cb2,
-                     &timestamp, &headers))
+                     &timestamp, &headers, &opaque))
 		return NULL;
 
 #if !HAVE_PRODUCEV
@@ -293,13 +478,49 @@ static PyObject *Producer_produce (Handle *self, PyObject *args,
 	if (!dr_cb || dr_cb == Py_None)
 		dr_cb = self->u.Producer.default_dr_cb;
 
-	/* Create msgstate if necessary, may return NULL if no callbacks
-	 * are wanted. */
-	msgstate = Producer_msgstate_new(self, dr_cb);
+        /* The opaque is only reported to on_delivery_batch */
+        if (opaque == Py_None || !self->u.Producer.dr_batch_cb)
+                opaque = NULL;
+
+	/* Create msgstate if necessary, may return NULL if only the default
+	 * callback, or none, is wanted without an opaque and no value
+	 * buffer is held. */
+	msgstate = Producer_msgstate_new(self, dr_cb, opaque,
+                                         valueobj && valueobj != Py_None &&
+                                         !cfl_PyUnistr(_Check)(valueobj));
+
+        if (valueobj && valueobj != Py_None) {
+                int r = 0;
+
+                if (cfl_PyUnistr(_Check)(valueobj)) {
+                        /* There is no buffer to hold on to for str,
+                         * its UTF-8 encoding is copied. */
+                        if (!(value = PyUnicode_AsUTF8AndSize(valueobj,
+                                                              &value_len)))
+                                r = -1;
+                } else if ((r = PyObject_GetBuffer(valueobj, &msgstate->buf,
+                                                   PyBUF_SIMPLE)) != -1) {
+                        /* The buffer is released by the delivery report,
+                         * librdkafka does not copy it. */
+                        value = msgstate->buf.buf;
+                        value_len = msgstate->buf.len;
+                        msgflags = 0;
+                }
+
+                if (r == -1) {
+                        if (msgstate)
+                                Producer_msgstate_destroy(msgstate);
+#ifdef RD_KAFKA_V_HEADERS
+                        if (rd_headers)
+                                rd_kafka_headers_destroy(rd_headers);
+#endif
+                        return NULL;
+                }
+        }
 
         /* Produce message */
 #if HAVE_PRODUCEV
-        err = Producer_producev(self, topic, partition,
+        err = Producer_producev(self, msgflags, topic, partition,
                                 value, value_len,
                                 key, key_len,
                                 msgstate, timestamp
@@ -308,7 +529,7 @@ static PyObject *Producer_produce (Handle *self, PyObject *args,
 #endif
                                 );
 #else
-        err = Producer_produce0(self, topic, partition,
+        err = Producer_produce0(self, msgflags, topic, partition,
                                 value, value_len,
                                 key, key_len,
                                 msgstate);
@@ -333,6 +554,311 @@ static PyObject *Producer_produce (Handle *self, PyObject *args,
 }
 
 
+/**
+ * @brief Get the buffer of a produce_batch() message value or key.
+ *        None, or a missing field, is returned as a NULL buffer.
+ *
+ * The buffer is borrowed from \p o.
+ *
+ * @returns 0 on success or -1 with a Python exception raised.
+ */
+static int Producer_batch_buf (PyObject *o, Py_ssize_t idx, const char *what,
+                               const char **bufp, Py_ssize_t *lenp) {
+        if (!o || o == Py_None) {
+                *bufp = NULL;
+                *lenp = 0;
+                return 0;
+        }
+
+        if (cfl_PyBin(_Check)(o)) {
+                *bufp = cfl_PyBin(_AS_STRING)(o);
+                *lenp = cfl_PyBin(_GET_SIZE)(o);
+                return 0;
+        }
+
+        if (cfl_PyUnistr(_Check)(o)) {
+                if (!(*bufp = PyUnicode_AsUTF8AndSize(o, lenp)))
+                        return -1;
+                return 0;
+        }
+
+        PyErr_Format(PyExc_TypeError,
+                     "messages[%zd]: expected %s to be str, bytes or None, "
+                     "not %s", idx, what, Py_TYPE(o)->tp_name);
+        return -1;
+}
+
+
+/**
+ * @brief Parse a produce_batch() message, either a
+ *        (value, key, headers, timestamp) tuple where trailing fields
+ *        may be omitted, or a dict with the same keys.
+ *
+ * The value and key buffers set on \p rkm are borrowed from \p msg.
+ *
+ * @returns 0 on success or -1 with a Python exception raised.
+ */
+static int Producer_batch_msg_parse (PyObject *msg, Py_ssize_t idx,
+                                     rd_kafka_message_t *rkm,
+#ifdef RD_KAFKA_V_HEADERS
+                                     rd_kafka_headers_t **rd_headersp,
+#endif
+                                     int64_t *timestampp) {
+        PyObject *value = NULL, *key = NULL;
+        PyObject *headers = NULL, *timestamp = NULL;
+        const char *buf;
+        Py_ssize_t len;
+
+        if (PyDict_Check(msg)) {
+                value = PyDict_GetItemString(msg, "value");
+                key = PyDict_GetItemString(msg, "key");
+                headers = PyDict_GetItemString(msg, "headers");
+                timestamp = PyDict_GetItemString(msg, "timestamp");
+
+        } else if (PyTuple_Check(msg)) {
+                Py_ssize_t size = PyTuple_GET_SIZE(msg);
+
+                if (size < 1 || size > 4) {
+                        PyErr_Format(PyExc_ValueError,
+                                     "messages[%zd]: expected a "
+                                     "(value, key, headers, timestamp) tuple, "
+                                     "not %zd elements", idx, size);
+                        return -1;
+                }
+
+                value = PyTuple_GET_ITEM(msg, 0);
+                if (size > 1)
+                        key = PyTuple_GET_ITEM(msg, 1);
+                if (size > 2)
+                        headers = PyTuple_GET_ITEM(msg, 2);
+                if (size > 3)
+                        timestamp = PyTuple_GET_ITEM(msg, 3);
+
+        } else {
+                PyErr_Format(PyExc_TypeError,
+                             "messages[%zd]: expected tuple or dict, not %s",
+                             idx, Py_TYPE(msg)->tp_name);
+                return -1;
+        }
+
+        if (Producer_batch_buf(value, idx, "value", &buf, &len) == -1)
+                return -1;
+        rkm->payload = (void *)buf;
+        rkm->len = (size_t)len;
+
+        if (Producer_batch_buf(key, idx, "key", &buf, &len) == -1)
+                return -1;
+        rkm->key = (void *)buf;
+        rkm->key_len = (size_t)len;
+
+        if (timestamp && timestamp != Py_None) {
+#if !HAVE_PRODUCEV
+                PyErr_Format(PyExc_NotImplementedError,
+                             "Producer timestamps require "
+                             "confluent-kafka-python built for librdkafka "
+                             "version >=v0.9.4 (librdkafka runtime 0x%x, "
+                             "buildtime 0x%x)",
+                             rd_kafka_version(), RD_KAFKA_VERSION);
+                return -1;
+#else
+                *timestampp = PyLong_AsLongLong(timestamp);
+                if (*timestampp == -1 && PyErr_Occurred())
+                        return -1;
+#endif
+        }
+
+        if (headers && headers != Py_None) {
+#ifndef RD_KAFKA_V_HEADERS
+                PyErr_Format(PyExc_NotImplementedError,
+                             "Producer message headers requires "
+                             "confluent-kafka-python built for librdkafka "
+                             "version >=v0.11.4 (librdkafka runtime 0x%x, "
+                             "buildtime 0x%x)",
+                             rd_kafka_version(), RD_KAFKA_VERSION);
+                return -1;
+#else
+                if (!(*rd_headersp = py_headers_to_c(headers)))
+                        return -1;
+#endif
+        }
+
+        return 0;
+}
+
+
+static PyObject *Producer_produce_batch (Handle *self, PyObject *args,
+                                         PyObject *kwargs) {
+        const char *topic;
+        int partition = RD_KAFKA_PARTITION_UA;
+        PyObject *messages, *seq;
+        PyObject *dr_cb = NULL, *dr_cb2 = NULL;
+        PyObject *errors = NULL;
+        rd_kafka_topic_t *rkt;
+        rd_kafka_message_t *rkmessages;
+#ifdef RD_KAFKA_V_HEADERS
+        rd_kafka_headers_t **rd_headers;
+#endif
+        int64_t *timestamps;
+        Py_ssize_t cnt, i;
+
+        static char *kws[] = { "topic",
+                               "messages",
+                               "partition",
+                               "callback",
+                               "on_delivery", /* Alias */
+                               NULL };
+
+        if (!PyArg_ParseTupleAndKeywords(args, kwargs, "sO|iOO", kws,
+                                         &topic, &messages, &partition,
+                                         &dr_cb, &dr_cb2))
+                return NULL;
+
+        if (!(seq = PySequence_Fast(messages,
+                                    "expected messages to be a sequence")))
+                return NULL;
+
+        cnt = PySequence_Fast_GET_SIZE(seq);
+        if (cnt == 0) {
+                Py_DECREF(seq);
+                return PyList_New(0);
+        }
+
+        rkmessages = calloc(cnt, sizeof(*rkmessages));
+#ifdef RD_KAFKA_V_HEADERS
+        rd_headers = calloc(cnt, sizeof(*rd_headers));
+#endif
+        timestamps = calloc(cnt, sizeof(*timestamps));
+        if (!rkmessages ||
+#ifdef RD_KAFKA_V_HEADERS
+            !rd_headers ||
+#endif
+            !timestamps) {
+                free(rkmessages);
+#ifdef RD_KAFKA_V_HEADERS
+                free(rd_headers);
+#endif
+                free(timestamps);
+                Py_DECREF(seq);
+                return PyErr_NoMemory();
+        }
+
+        /* Parse all messages before producing any of them so that a
+         * malformed message fails the call as a whole. */
+        for (i = 0 ; i < cnt ; i++) {
+                if (Producer_batch_msg_parse(PySequence_Fast_GET_ITEM(seq, i),
+                                             i, &rkmessages[i],
+#ifdef RD_KAFKA_V_HEADERS
+                                             &rd_headers[i],
+#endif
+                                             &timestamps[i]) == -1)
+                        goto done;
+        }
+
+        if (!(rkt = rd_kafka_topic_new(self->rk, topic, NULL))) {
+                cfl_PyErr_Format(rd_kafka_last_error(),
+                                 "Unable to produce message: %s",
+                                 rd_kafka_err2str(rd_kafka_last_error()));
+                goto done;
+        }
+
+        if (dr_cb2 && !dr_cb) /* Alias */
+                dr_cb = dr_cb2;
+
+        if (!dr_cb || dr_cb == Py_None)
+                dr_cb = self->u.Producer.default_dr_cb;
+
+        for (i = 0 ; i < cnt ; i++)
+                rkmessages[i]._private = Producer_msgstate_new(self, dr_cb,
+                                                               NULL, 0);
+
+#if HAVE_PRODUCEV
+        /* rd_kafka_produce_batch() supports neither headers nor timestamps:
+         * runs of messages without them are produced in one call each,
+         * the others with rd_kafka_producev(), preserving the order
+         * of the messages. */
+        i = 0;
+        while (i < cnt) {
+                Py_ssize_t start = i;
+
+                while (i < cnt &&
+#ifdef RD_KAFKA_V_HEADERS
+                       !rd_headers[i] &&
+#endif
+                       !timestamps[i])
+                        i++;
+
+                if (i > start)
+                        rd_kafka_produce_batch(rkt, partition,
+                                               RD_KAFKA_MSG_F_COPY,
+                                               &rkmessages[start],
+                                               (int)(i - start));
+
+                if (i < cnt) {
+                        rd_kafka_message_t *rkm = &rkmessages[i];
+
+                        rkm->err = Producer_producev(self,
+                                                     RD_KAFKA_MSG_F_COPY,
+                                                     topic, partition,
+                                                     rkm->payload, rkm->len,
+                                                     rkm->key, rkm->key_len,
+                                                     rkm->_private,
+                                                     timestamps[i]
+#ifdef RD_KAFKA_V_HEADERS
+                                                     ,rd_headers[i]
+#endif
+                                                     );
+#ifdef RD_KAFKA_V_HEADERS
+                        if (!rkm->err) /* Headers are now owned by librdkafka */
+                                rd_headers[i] = NULL;
+#endif
+                        i++;
+                }
+        }
+#else
+        /* Without producev no message has headers or a timestamp */
+        rd_kafka_produce_batch(rkt, partition, RD_KAFKA_MSG_F_COPY,
+                               rkmessages, (int)cnt);
+#endif
+
+        rd_kafka_topic_destroy(rkt);
+
+        if (!(errors = PyList_New(cnt))) {
+                /* Failed messages get no delivery report */
+                for (i = 0 ; i < cnt ; i++) {
+                        if (rkmessages[i].err && rkmessages[i]._private)
+                                Producer_msgstate_destroy(
+                                        rkmessages[i]._private);
+                }
+                goto done;
+        }
+
+        for (i = 0 ; i < cnt ; i++) {
+                /* Failed messages get no delivery report */
+                if (rkmessages[i].err && rkmessages[i]._private)
+                        Producer_msgstate_destroy(rkmessages[i]._private);
+
+                PyList_SET_ITEM(errors, i,
+                                KafkaError_new_or_None(rkmessages[i].err,
+                                                       NULL));
+        }
+
+ done:
+#ifdef RD_KAFKA_V_HEADERS
+        for (i = 0 ; i < cnt ; i++) {
+                if (rd_headers[i])
+                        rd_kafka_headers_destroy(rd_headers[i]);
+        }
+
+        free(rd_headers);
+#endif
+        free(rkmessages);
+        free(timestamps);
+        Py_DECREF(seq);
+
+        return errors;
+}
+
+
 /**
  * @brief Call rd_kafka_poll() and keep track of crashing callbacks.
  * @returns -1 if callback crashed (or poll() failed), else the number
@@ -350,6 +876,9 @@ static int Producer_poll0 (Handle *self, int tmout) {
 		return -1;
 	}
 
+        if (Producer_dr_batch_dispatch(self) == -1)
+                return -1;
+
 	return r;
 }
 
@@ -387,6 +916,9 @@ static PyObject *Producer_flush (Handle *self, PyObject *args,
         if (!CallState_end(self, &cs))
                 return NULL;
 
+        if (Producer_dr_batch_dispatch(self) == -1)
+                return NULL;
+
         if (err) /* Get the queue length on error (timeout) */
                 qlen = rd_kafka_outq_len(self->rk);
 
@@ -562,7 +1094,7 @@ static void *Producer_purge (Handle *self, PyObject *args,
 static PyMethodDef Producer_methods[] = {
 	{ "produce", (PyCFunction)Producer_produce,
 	  METH_VARARGS|METH_KEYWORDS,
-	  ".. py:function:: produce(topic, [value], [key], [partition], [on_delivery], [timestamp], [headers])\n"
+	  ".. py:function:: produce(topic, [value], [key], [partition], [on_delivery], [timestamp], [headers], [opaque])\n"
 	  "\n"
 	  "  Produce message to topic.\n"
 	  "  This is an asynchronous operation, an application may use the "
@@ -575,7 +1107,10 @@ static PyMethodDef Producer_methods[] = {
       "had headers set.\n"
 	  "\n"
 	  "  :param str topic: Topic to produce message to\n"
-	  "  :param str|bytes value: Message payload\n"
+	  "  :param str|bytes value: Message payload. With ``produce.zero.copy`` "
+	  "enabled any object supporting the buffer protocol, e.g. ``memoryview``, "
+	  "``bytearray`` or a numpy array, which is referenced rather than copied "
+	  "until the delivery report and must not be modified until then.\n"
 	  "  :param str|bytes key: Message key\n"
 	  "  :param int partition: Partition to produce to, else uses the "
 	  "configured built-in partitioner.\n"
@@ -585,6 +1120,9 @@ static PyMethodDef Producer_methods[] = {
           "  :param int timestamp: Message timestamp (CreateTime) in milliseconds since epoch UTC (requires librdkafka >= v0.9.4, api.version.request=true, and broker >= 0.10.0.0). Default value is current time.\n"
 	  "\n"
           "  :param dict|list headers: Message headers to set on the message. The header key must be a string while the value must be binary, unicode or None. Accepts a list of (key,value) or a dict. (Requires librdkafka >= v0.11.4 and broker version >= 0.11.0.0)\n"
+	  "  :param object opaque: Application object reported for the message "
+	  "to the ``on_delivery_batch`` callback, ignored if the producer has "
+	  "no ``on_delivery_batch`` callback.\n"
 	  "  :rtype: None\n"
 	  "  :raises BufferError: if the internal producer message queue is "
 	  "full (``queue.buffering.max.messages`` exceeded)\n"
@@ -593,6 +1131,38 @@ static PyMethodDef Producer_methods[] = {
 	  "\n"
 	},
 
+	{ "produce_batch", (PyCFunction)Producer_produce_batch,
+	  METH_VARARGS|METH_KEYWORDS,
+	  ".. py:function:: produce_batch(topic, messages, [partition], [on_delivery])\n"
+	  "\n"
+	  "  Produce a batch of messages to topic in a single call.\n"
+	  "  This is an asynchronous operation, like :py:func:`produce()`, "
+	  "``on_delivery`` is called from :py:func:`poll()` for every message "
+	  "that was successfully enqueued.\n"
+	  "\n"
+	  "  Messages without headers or timestamp are enqueued with "
+	  "``rd_kafka_produce_batch()``, which saves the per-message call "
+	  "overhead of :py:func:`produce()` for small messages.\n"
+	  "\n"
+	  "  :param str topic: Topic to produce messages to\n"
+	  "  :param list messages: Messages to produce, each a "
+	  "``(value, key, headers, timestamp)`` tuple, where trailing fields may "
+	  "be omitted, or a dict with the same keys. See :py:func:`produce()` "
+	  "for the types of the fields.\n"
+	  "  :param int partition: Partition to produce to, else uses the "
+	  "configured built-in partitioner.\n"
+	  "  :param func on_delivery(err,msg): Delivery report callback to call "
+	  "(from :py:func:`poll()` or :py:func:`flush()`) on successful or "
+	  "failed delivery\n"
+	  "  :returns: Per-message enqueue error, None for each message that was "
+	  "enqueued, else a KafkaError (e.g. ``_QUEUE_FULL``). No delivery report "
+	  "is called for messages that failed to be enqueued.\n"
+	  "  :rtype: list(KafkaError)\n"
+	  "  :raises TypeError: if a message is malformed, no message is produced then\n"
+	  "  :raises KafkaException: for other errors, see exception code\n"
+	  "\n"
+	},
+
 	{ "poll", (PyCFunction)Producer_poll, METH_VARARGS|METH_KEYWORDS,
 	  ".. py:function:: poll([timeout])\n"
 	  "\n"
@@ -602,6 +1172,8 @@ static PyMethodDef Producer_methods[] = {
 	  "  Callbacks:\n"
 	  "\n"
 	  "  - ``on_delivery`` callbacks from :py:func:`produce()`\n"
+	  "  - ``on_delivery_batch``, called once with the delivery reports "
+	  "served by this call\n"
 	  "  - ...\n"
 	  "\n"
 	  "  :param float timeout: Maximum time to block waiting for events. (Seconds)\n"
@@ -862,6 +1434,21 @@ static int Producer_init (PyObject *selfobj, PyObject *args, PyObject *kwargs) {
                                        args, kwargs)))
                 return -1;
 
+        if (self->u.Producer.dr_batch_cb) {
+                if (self->u.Producer.default_dr_cb) {
+                        cfl_PyErr_Format(RD_KAFKA_RESP_ERR__INVALID_ARG,
+                                         "on_delivery and on_delivery_batch "
+                                         "are mutually exclusive");
+                        rd_kafka_conf_destroy(conf);
+                        return -1;
+                }
+
+                if (!(self->u.Producer.dr_batch = Producer_dr_batch_new())) {
+                        rd_kafka_conf_destroy(conf);
+                        return -1;
+                }
+        }
+
         rd_kafka_conf_set_dr_msg_cb(conf, dr_msg_cb);
 
         self->rk = rd_kafka_new(RD_KAFKA_PRODUCER, conf,
@@ -2081,6 +2081,31 @@ static int producer_conf_set_special (Handle *self, rd_kafka_conf_t *conf,
                         return -1;
 
                 return 1;
+
+        } else if (!strcmp(name, "on_delivery_batch")) {
+		if (!PyCallable_Check(valobj)) {
+			cfl_PyErr_Format(
+				RD_KAFKA_RESP_ERR__INVALID_ARG,
+				"%s requires a callable "
+				"object", name);
+			return -1;
+		}
+
+                if (self->u.Producer.dr_batch_cb)
+                        Py_DECREF(self->u.Producer.dr_batch_cb);
+		self->u.Producer.dr_batch_cb = valobj;
+		Py_INCREF(self->u.Producer.dr_batch_cb);
+
+		return 1;
+
+        } else if (!strcmp(name, "produce.zero.copy")) {
+                /* Python client property: produce() passes the value's
+                 * buffer to librdkafka rather than a copy of it. */
+                if (!cfl_PyBool_get(valobj, name,
+                                    &self->u.Producer.zero_copy))
+                        return -1;
+
+                return 1;
         }
 
 	return 0; /* Not handled */
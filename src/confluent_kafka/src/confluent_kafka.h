@@ -245,6 +245,16 @@ typedef struct {
 		struct {
 			PyObject *default_dr_cb;
                         int dr_only_error; /**< delivery.report.only.error */
+                        int zero_copy;     /**< produce.zero.copy */
+                        PyObject *dr_batch_cb; /**< on_delivery_batch */
+                        /** Delivery reports pending for dr_batch_cb:
+                         *  a tuple of (errors, topics, partitions,
+                         *  offsets, opaques) lists. */
+                        PyObject *dr_batch;
+                        /** Free per-message states kept for reuse,
+                         *  protected by the GIL. */
+                        struct Producer_msgstate *msgstate_pool;
+                        int msgstate_pool_cnt;
 		} Producer;
 
 		/**
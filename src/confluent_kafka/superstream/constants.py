@@ -26,6 +26,15 @@ class SuperstreamValues:
     DEFAULT_SUPERSTREAM_TIMEOUT = 3000  # in milliseconds
     OPTIMIZED_CONFIGURATION_KEY = "optimized_configuration"
     INTERNAL_USERNAME = "superstream_internal"
+    # consecutive non JSON payloads after which a topic is no longer considered for reduction
+    NON_JSON_TOPIC_THRESHOLD = 10
+    # messages of a non JSON topic after which one is probed again, a burst of non JSON data does not stick
+    NON_JSON_TOPIC_REPROBE_INTERVAL = 1000
+    # learning messages waiting to be published, further messages are dropped
+    LEARNING_QUEUE_SIZE = 100
+    # messages of a topic held back while the replaced producer delivers its earlier ones,
+    # produce() raises BufferError beyond
+    SWAP_HELD_BACK_MESSAGES = 10000
 
     START_KEY = "start"
     ERROR_KEY = "error"
@@ -58,6 +67,10 @@ class EnvVarsMeta(type):
     def SUPERSTREAM_LEARNING_FACTOR(cls) -> int:
         return int(os.getenv("SUPERSTREAM_LEARNING_FACTOR", 20))
 
+    @property
+    def SUPERSTREAM_LEARNING_SAMPLE_RATE(cls) -> int:
+        return max(int(os.getenv("SUPERSTREAM_LEARNING_SAMPLE_RATE", 1)), 1)
+
     @property
     def SUPERSTREAM_TAGS(cls) -> str:
         return os.getenv("SUPERSTREAM_TAGS", "")
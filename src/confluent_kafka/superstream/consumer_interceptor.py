@@ -1,4 +1,3 @@
-import asyncio
 import sys
 import time
 from typing import Any, Dict, List, Optional
@@ -40,39 +39,68 @@ class SuperstreamConsumerInterceptor:
         return self.__intercept(message)
 
     def consume(self, messages) -> Optional[List[Any]]:
-        if messages is None:
+        if not messages:
+            return messages
+        try:
+            return self.__intercept_batch(messages)
+        except Exception:
             return messages
-        return [self.__intercept(message) for message in messages]
 
     def __intercept(self, message: Any) -> Any:
         if not message:
             return message
         self.__update_topic_partitions(message)
         try:
-            return asyncio.run(self.__deserialize(message))
+            return self.__deserialize(message)
         except Exception:
             return message
 
-    async def __deserialize(self, message: Any) -> Any:
-        message_value = message.value()
-        headers = message.headers()
-
-        if not headers or not message_value:
-            return message
+    def __intercept_batch(self, messages: List[Any]) -> List[Any]:
+        modified = []
+        for message in messages:
+            self.__update_topic_partitions(message)
+            if not message.value():
+                continue
+            schema_id = self.__get_schema_id(message)
+            if schema_id:
+                modified.append((message, schema_id))
+
+        if not modified or not self.__wait_for_superstream():
+            return messages
 
-        # superstream.client_counters.total_bytes_after_reduction += len(message_value)
-        schema_id = None
+        desc_map = self.superstream.consumer_proto_desc_map
+        missing = {schema_id for _, schema_id in modified if schema_id not in desc_map}
+        if missing:
+            # fetch all the missing schemas with a single round trip to the superstream event loop
+            future = self.superstream.submit_task(self.superstream.send_get_schema_requests(missing))
+            if future is not None:
+                future.result()
+            desc_map = self.superstream.consumer_proto_desc_map
+            for schema_id in missing:
+                if schema_id not in desc_map:
+                    self.__report_error(f"error getting schema with id: {schema_id}")
+
+        for message, schema_id in modified:
+            descriptor = desc_map.get(schema_id)
+            if descriptor:
+                self.__restore_value(message, descriptor)
+        return messages
+
+    def __report_error(self, msg: str):
+        # fire and forget, errors are reported from the superstream event loop
+        self.superstream.submit_task(self.superstream.handle_error(msg))
+
+    @staticmethod
+    def __get_schema_id(message: Any) -> Optional[str]:
+        headers = message.headers()
+        if not headers:
+            return None
         for key, value in headers:
             if key == "superstream_schema":
-                schema_id = value.decode("utf-8") if isinstance(value, bytes) else value
-                break
-
-        if not schema_id:
-            # if superstream.superstream_ready:
-            #   superstream.client_counters.total_bytes_before_reduction += len(message_value)
-            #   superstream.client_counters.total_messages_failed_consume += 1
-            return message
+                return value.decode("utf-8") if isinstance(value, bytes) else value
+        return None
 
+    def __wait_for_superstream(self) -> bool:
         wait_time = 60
         check_interval = 5
 
@@ -85,22 +113,48 @@ class SuperstreamConsumerInterceptor:
             sys.stderr.write(
                 "superstream: cannot connect with superstream and consume message that was modified by superstream"
             )
-            return message
+            return False
+        return True
 
+    def __get_descriptor(self, schema_id: str) -> Any:
         descriptor = self.superstream.consumer_proto_desc_map.get(schema_id)
-        if not descriptor:
-            await self.superstream.send_get_schema_request(schema_id)
-            descriptor = self.superstream.consumer_proto_desc_map.get(schema_id)
-            if not descriptor:
-                await self.superstream.handle_error(f"error getting schema with id: {schema_id}")
-                return message
+        if descriptor:
+            return descriptor
+
+        # cache miss, fetch the schema on the superstream event loop and wait for it
+        future = self.superstream.submit_task(self.superstream.send_get_schema_request(schema_id))
+        if future is not None:
+            future.result()
+        return self.superstream.consumer_proto_desc_map.get(schema_id)
 
+    def __restore_value(self, message: Any, descriptor: Any) -> Any:
         try:
-            deserialized_msg = proto_to_json(message_value, descriptor)
+            deserialized_msg = proto_to_json(message.value(), descriptor)
             # superstream.client_counters.total_bytes_before_reduction += len(deserialized_msg)
             # superstream.client_counters.total_messages_successfully_consumed += 1
-            message.set_value(deserialized_msg.encode("utf-8"))
-            return message
+            message.set_value(deserialized_msg)
         except Exception as e:
-            await self.superstream.handle_error(f"error deserializing data: {e!s}")
+            self.__report_error(f"error deserializing data: {e!s}")
+        return message
+
+    def __deserialize(self, message: Any) -> Any:
+        if not message.value():
             return message
+
+        # superstream.client_counters.total_bytes_after_reduction += len(message_value)
+        schema_id = self.__get_schema_id(message)
+        if not schema_id:
+            # if superstream.superstream_ready:
+            #   superstream.client_counters.total_bytes_before_reduction += len(message_value)
+            #   superstream.client_counters.total_messages_failed_consume += 1
+            return message
+
+        if not self.__wait_for_superstream():
+            return message
+
+        descriptor = self.__get_descriptor(schema_id)
+        if not descriptor:
+            self.__report_error(f"error getting schema with id: {schema_id}")
+            return message
+
+        return self.__restore_value(message, descriptor)
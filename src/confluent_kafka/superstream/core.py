@@ -1,5 +1,7 @@
 import asyncio
 import base64
+import collections
+import concurrent.futures
 import json
 import socket
 import sys
@@ -7,10 +9,9 @@ import threading
 import time
 import uuid
 from datetime import datetime, timedelta
-from typing import Any, Callable, Dict, List, Optional, Union
+from typing import Any, Callable, Coroutine, Dict, Iterable, List, Optional, Union
 
 import nats
-from google.protobuf.descriptor import Descriptor
 from nats.aio.client import Client as NatsClient
 from nats.errors import Error as NatsError
 from nats.js import JetStreamContext
@@ -26,6 +27,7 @@ from confluent_kafka.superstream.constants import (
 from confluent_kafka.superstream.exceptions import ErrGenerateConnectionId
 from confluent_kafka.superstream.factory import SuperstreamFactory
 from confluent_kafka.superstream.std import SuperstreamStd
+from confluent_kafka.superstream.transcoder import ProtoJsonTranscoder
 from confluent_kafka.superstream.types import (
     ClientConfigUpdateReq,
     ClientCounterUpdateRequest,
@@ -46,6 +48,7 @@ from confluent_kafka.superstream.types import (
 from confluent_kafka.superstream.update_manager import SuperstreamUpdateManager
 from confluent_kafka.superstream.utils import (
     KafkaUtil,
+    PartitionBitset,
     TaskUtil,
     _name,
     compile_descriptor,
@@ -55,8 +58,9 @@ from confluent_kafka.superstream.utils import (
 class Superstream:
     learning_factor_counter: int
     learning_request_sent: bool
+    learning_messages_dropped: int
     get_schema_request_sent: bool
-    consumer_proto_desc_map: Dict[str, Descriptor]
+    consumer_proto_desc_map: Dict[str, ProtoJsonTranscoder]
 
     # required properties
     account_name: str
@@ -69,7 +73,8 @@ class Superstream:
     tags: str
     compression_type: str = "zstd"
     client_counters: SuperstreamCounters
-    topic_partitions: Dict[str, List[int]]
+    topic_partitions: Dict[str, PartitionBitset]
+    topic_partitions_generation: int
 
     client_ip: str
     client_host: str
@@ -82,12 +87,13 @@ class Superstream:
     can_start = False
 
     update_manager: SuperstreamUpdateManager
-    producer_proto_desc: Optional[Descriptor]
+    producer_proto_desc: Optional[ProtoJsonTranscoder]
     producer_schema_id: str
 
     start_sub: Any
 
     std: SuperstreamStd
+    event_loop: Optional[asyncio.AbstractEventLoop]
 
     full_client_configs: Dict[str, Any]
     superstream_configs: Dict[str, Any]
@@ -111,6 +117,9 @@ class Superstream:
         self.configs = configs
         self.tags = tags
         self.topic_partitions = {}
+        self.topic_partitions_generation = 0
+        self._topic_partitions_lock = threading.Lock()
+        self._reported_topic_partitions_generation = -1
         self.std = SuperstreamStd()
 
         self.learning_factor_counter = 0
@@ -118,6 +127,15 @@ class Superstream:
         self.get_schema_request_sent = False
         self.producer_proto_desc = None
 
+        self.learning_sample_rate = EnvVars.SUPERSTREAM_LEARNING_SAMPLE_RATE
+        self.learning_messages_dropped = 0
+        self._learning_samples = 0
+        self._register_schema_queued = False
+        # learning messages handed over by producing threads, None requests the schema registration
+        self._learning_queue = collections.deque()
+        self._learning_event = None
+        self._learning_task = None
+
         self.consumer_proto_desc_map = {}
         self.client_counters = SuperstreamCounters()
 
@@ -125,8 +143,23 @@ class Superstream:
         self.superstream_configs = {}
         self.optimized_config_received = False
         self._initial_topic_partition_update_sent = False
+        self._initial_topic_partition_update_scheduled = False
 
         self._config_update_cb = None
+        self.event_loop = None
+
+    def submit_task(
+        self, task: Coroutine[Any, Any, Any]
+    ) -> Optional[concurrent.futures.Future]:
+        """
+        Schedule a coroutine on the superstream background event loop from any thread.
+        Returns None (and closes the coroutine) if the background loop is not running.
+        """
+        loop = self.event_loop
+        if loop is None or loop.is_closed() or not loop.is_running():
+            task.close()
+            return None
+        return asyncio.run_coroutine_threadsafe(task, loop)
 
     async def _request(
         self,
@@ -191,6 +224,53 @@ class Superstream:
                 f"{_name(self.send_learning_message)} at publish {e!s}"
             )
 
+    def enqueue_learning_message(self, msg: bytes) -> bool:
+        """
+        Hand a produced message over to the learning pipeline without blocking the producing thread.
+        Only every learning_sample_rate-th message is sampled and messages are dropped while the queue is full.
+        Once the learning factor is reached the schema registration request is queued instead.
+        :return: True if the message was queued.
+        """
+        if self.learning_factor_counter > self.learning_factor:
+            if self.learning_request_sent or self._register_schema_queued:
+                return False
+            self._register_schema_queued = True
+            return self._put_learning_item(None)
+
+        self._learning_samples += 1
+        if self._learning_samples % self.learning_sample_rate:
+            return False
+
+        if len(self._learning_queue) >= SuperstreamValues.LEARNING_QUEUE_SIZE:
+            self.learning_messages_dropped += 1
+            return False
+
+        self.learning_factor_counter += 1
+        return self._put_learning_item(msg)
+
+    def _put_learning_item(self, item: Optional[bytes]) -> bool:
+        self._learning_queue.append(item)
+        if len(self._learning_queue) == 1:
+            # the queue was empty, wake the drainer up
+            loop = self.event_loop
+            event = self._learning_event
+            if loop is not None and event is not None and loop.is_running():
+                loop.call_soon_threadsafe(event.set)
+        return True
+
+    async def _drain_learning_queue(self):
+        self._learning_event = asyncio.Event()
+        while True:
+            while self._learning_queue:
+                item = self._learning_queue.popleft()
+                if item is None:
+                    self._register_schema_queued = False
+                    await self.send_register_schema_req()
+                else:
+                    await self.send_learning_message(item)
+            await self._learning_event.wait()
+            self._learning_event.clear()
+
     async def send_client_type_update_req(self):
         if not self.client_type:
             return
@@ -306,29 +386,38 @@ class Superstream:
         This makes it faster to get topic and partition information of a client from the superstream.
         """
         try:
-            topic_partition_payload = TopicsPartitionsPerProducerConsumer(
-                producer_topics_partitions={},
-                consumer_group_topics_partitions={},
-                connection_id=self.kafka_connection_id,
-            )
-            if self.topic_partitions:
-                topic_partition_payload = TopicsPartitionsPerProducerConsumer(
-                    producer_topics_partitions=self.topic_partitions
-                    if self.client_type == SuperstreamClientType.PRODUCER.value
-                    else {},
-                    consumer_group_topics_partitions=self.topic_partitions
-                    if self.client_type == SuperstreamClientType.CONSUMER.value
-                    else {},
-                    connection_id=self.kafka_connection_id,
-                )
+            generation, topic_partition_payload = self._topic_partitions_payload()
             await self._publish(
                 SuperstreamSubjects.CLIENTS_UPDATE % ("config", self.client_hash),
                 topic_partition_payload.model_dump_json().encode(),
             )
             self._initial_topic_partition_update_sent = True
+            self._reported_topic_partitions_generation = generation
         except Exception as e:
+            # retried by the next topic partition update
+            self._initial_topic_partition_update_scheduled = False
             await self.handle_error(f"{_name(self.report_clients_update)}: {e!s}")
 
+    def _topic_partitions_payload(self):
+        """
+        Snapshot of the tracked topic partitions together with the generation it corresponds to.
+        """
+        with self._topic_partitions_lock:
+            generation = self.topic_partitions_generation
+            topic_partitions = {
+                topic: partitions.to_list()
+                for topic, partitions in self.topic_partitions.items()
+            }
+        return generation, TopicsPartitionsPerProducerConsumer(
+            producer_topics_partitions=topic_partitions
+            if self.client_type == SuperstreamClientType.PRODUCER.value
+            else {},
+            consumer_group_topics_partitions=topic_partitions
+            if self.client_type == SuperstreamClientType.CONSUMER.value
+            else {},
+            connection_id=self.kafka_connection_id,
+        )
+
     async def report_clients_update(self):
         async def client_update_task():
             async def update_client_counters():
@@ -360,26 +449,19 @@ class Superstream:
 
             async def update_client_topic_partitions():
                 try:
-                    topic_partition_payload = TopicsPartitionsPerProducerConsumer(
-                        producer_topics_partitions={},
-                        consumer_group_topics_partitions={},
-                        connection_id=self.kafka_connection_id,
-                    )
-                    if self.topic_partitions:
-                        topic_partition_payload = TopicsPartitionsPerProducerConsumer(
-                            producer_topics_partitions=self.topic_partitions
-                            if self.client_type == SuperstreamClientType.PRODUCER.value
-                            else {},
-                            consumer_group_topics_partitions=self.topic_partitions
-                            if self.client_type == SuperstreamClientType.CONSUMER.value
-                            else {},
-                            connection_id=self.kafka_connection_id,
-                        )
+                    if (
+                        self.topic_partitions_generation
+                        == self._reported_topic_partitions_generation
+                    ):
+                        # nothing changed since the last report
+                        return
+                    generation, topic_partition_payload = self._topic_partitions_payload()
                     await self._publish(
                         SuperstreamSubjects.CLIENTS_UPDATE
                         % ("config", self.client_hash),
                         topic_partition_payload.model_dump_json().encode(),
                     )
+                    self._reported_topic_partitions_generation = generation
 
                 except Exception as e:
                     await self.handle_error(
@@ -439,6 +521,14 @@ class Superstream:
                 f"{_name(self.send_get_schema_request)} at request {e!s}"
             )
 
+    async def send_get_schema_requests(self, schema_ids: Iterable[str]):
+        """
+        Fetch several schemas concurrently, each result is stored in consumer_proto_desc_map.
+        """
+        await asyncio.gather(
+            *(self.send_get_schema_request(schema_id) for schema_id in schema_ids)
+        )
+
     async def send_client_config_update_req(self):
         try:
             full_config = self.full_client_configs.copy()
@@ -513,6 +603,8 @@ class Superstream:
             self.learning_request_sent = False
             self.get_schema_request_sent = False
             self.consumer_proto_desc_map = {}
+            self._learning_queue.clear()
+            self._register_schema_queued = False
 
         except Exception as e:
             self.std.error(f"superstream: {e!s}")
@@ -586,6 +678,8 @@ class Superstream:
                 )
                 await self.subscribe_to_updates()
                 self.superstream_ready = True
+                # report the topic partitions again after a reconnection
+                self._reported_topic_partitions_generation = -1
                 await self.report_clients_update()
                 self.std.write("superstream: reconnected to superstream")
             except ErrGenerateConnectionId as e:
@@ -779,12 +873,27 @@ class Superstream:
             self.std.error(f"superstream: Could not subscribe to updates: {e}")
 
     def update_topic_partitions(self, topic: str, partition: int):
-        self.topic_partitions[topic] = self.topic_partitions.get(topic, [])
-        if partition not in self.topic_partitions[topic]:
-            self.topic_partitions[topic].append(partition)
+        if partition is None or partition < 0:
+            # topic level errors and events have no partition
+            return
+        partitions = self.topic_partitions.get(topic)
+        if partitions is not None and partition in partitions and self._initial_topic_partition_update_scheduled:
+            # already tracked, the common case does not take the lock
+            return
 
-        if self.topic_partitions and not self._initial_topic_partition_update_sent:
-            TaskUtil.create_task(self._send_initial_topic_partitions_update())
+        with self._topic_partitions_lock:
+            partitions = self.topic_partitions.get(topic)
+            if partitions is None:
+                partitions = PartitionBitset()
+                self.topic_partitions[topic] = partitions
+            if partitions.add(partition):
+                self.topic_partitions_generation += 1
+            send_initial_update = not self._initial_topic_partition_update_scheduled
+            self._initial_topic_partition_update_scheduled = True
+
+        if send_initial_update and self.submit_task(self._send_initial_topic_partitions_update()) is None:
+            # the background loop is not running yet, the next call retries
+            self._initial_topic_partition_update_scheduled = False
 
     def set_full_client_configs(self, full_client_configs: Dict[str, Any]):
         self.full_client_configs = full_client_configs
@@ -804,6 +913,10 @@ class Superstream:
             self.std.write("Successfully connected to superstream")
 
             await self.subscribe_to_updates()
+            if self.client_type == SuperstreamClientType.PRODUCER.value:
+                self._learning_task = asyncio.get_running_loop().create_task(
+                    self._drain_learning_queue()
+                )
             self.superstream_ready = True
             await self.report_clients_update()
             await self.send_client_type_update_req()
@@ -845,7 +958,7 @@ class Superstream:
                 asyncio.run_coroutine_threadsafe(task, new_loop)
                 return new_loop, t
 
-            init_in_background(superstream.init())
+            superstream.event_loop, _ = init_in_background(superstream.init())
 
             props.update(
                 {
@@ -898,7 +1011,7 @@ class Superstream:
                 asyncio.run_coroutine_threadsafe(task, new_loop)
                 return new_loop, t
 
-            init_in_background(superstream.init())
+            superstream.event_loop, _ = init_in_background(superstream.init())
 
             props.update(
                 {
@@ -1,15 +1,62 @@
-import asyncio
-from typing import Any, Callable, Dict, Union
+from typing import Any, Callable, Dict, Optional, Tuple
 
-from confluent_kafka.superstream.constants import SuperstreamKeys
+from confluent_kafka.superstream.constants import SuperstreamKeys, SuperstreamValues
 from confluent_kafka.superstream.core import Superstream
 from confluent_kafka.superstream.types import SuperstreamClientType
 from confluent_kafka.superstream.utils import (
     KafkaUtil,
+    _is_json_object_candidate,
+    _json_bytes,
     _try_convert_to_json,
     json_to_proto,
 )
 
+# positional parameters of Producer.produce()
+_PRODUCE_ARGS = ("topic", "value", "key", "partition", "callback", "on_delivery", "timestamp", "headers", "opaque")
+
+_MAX_DELIVERY_REPORT_ADAPTORS = 1024
+
+
+def _normalize_produce_args(args: Tuple, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Returns the produce() arguments as keyword arguments, the caller's kwargs are not modified.
+    """
+    if len(args) > len(_PRODUCE_ARGS):
+        raise TypeError(f"produce() takes at most {len(_PRODUCE_ARGS)} positional arguments")
+    produce_kwargs = dict(zip(_PRODUCE_ARGS, args))
+    produce_kwargs.update(kwargs)
+    return produce_kwargs
+
+
+def _merge_headers(headers: Any, superstream_headers: Dict[str, Any]) -> Any:
+    """
+    Returns a copy of the message headers with the superstream headers added,
+    the caller's headers are not modified.
+    """
+    if headers is None:
+        return superstream_headers
+    if isinstance(headers, dict):
+        return {**headers, **superstream_headers}
+    return list(headers) + list(superstream_headers.items())
+
+
+class _DeliveryReportAdaptor:
+    """
+    Delivery callback that tracks the topic partition of delivered messages
+    before calling the original callback.
+    """
+
+    __slots__ = ("_superstream", "_on_delivery")
+
+    def __init__(self, superstream: Superstream, on_delivery: Callable):
+        self._superstream = superstream
+        self._on_delivery = on_delivery
+
+    def __call__(self, err, msg):
+        if not err:
+            self._superstream.update_topic_partitions(msg.topic(), msg.partition())
+        self._on_delivery(err, msg)
+
 
 class SuperstreamProducerInterceptor:
     def __init__(self, config: Dict, producer_handler: Callable | None = None):
@@ -17,6 +64,10 @@ class SuperstreamProducerInterceptor:
             config, SuperstreamClientType.PRODUCER
         )
         self._producer_handler = producer_handler
+        # topic -> number of consecutive payloads that were not JSON objects
+        self._non_json_counts: Dict[str, int] = {}
+        # original delivery callback -> adaptor wrapping it
+        self._delivery_report_adaptors: Dict[Callable, _DeliveryReportAdaptor] = {}
 
     def set_config_update_cb(self, config_update_cb: Callable):
         if self.superstream:
@@ -48,107 +99,93 @@ class SuperstreamProducerInterceptor:
             return
 
         try:
-            topic_idx = 0
-            value_idx = 1
-            partition_idx = 3
-            on_delivery_idx = 4
-            headers_index = 6
-
-            topic = args[topic_idx] if len(args) > topic_idx else kwargs.get("topic")
-            if len(args) > partition_idx or "partition" in kwargs:
-                partition = (
-                    args[partition_idx]
-                    if len(args) > partition_idx
-                    else kwargs.get("partition")
-                )
+            produce_kwargs = _normalize_produce_args(args, kwargs)
+            topic = produce_kwargs.get("topic")
+            partition = produce_kwargs.get("partition")
+            if partition is not None:
                 superstream.update_topic_partitions(topic, partition)
 
-            msg = args[value_idx] if len(args) > value_idx else kwargs.get("value")
-            json_msg = _try_convert_to_json(msg)
+            json_msg = self._try_convert_to_json(topic, produce_kwargs.get("value"))
             if json_msg is None:
                 self._producer_handler(*args, **kwargs)
                 return
 
-            serialized_msg, superstream_headers = self._serialize(json_msg)
-
-            if superstream_headers is not None:
-                if len(args) > headers_index:
-                    if args[headers_index] is None:
-                        args[headers_index] = superstream_headers
-                    elif isinstance(args[headers_index], dict):
-                        args[headers_index].update(superstream_headers)
-                    elif isinstance(args[headers_index], list):
-                        args[headers_index].extend(list(superstream_headers.items()))
-                else:
-                    if kwargs.get("headers") is None:
-                        kwargs["headers"] = superstream_headers
-                    elif isinstance(kwargs["headers"], dict):
-                        kwargs["headers"].update(superstream_headers)
-                    elif isinstance(kwargs["headers"], list):
-                        kwargs["headers"].extend(list(superstream_headers.items()))
-
-            if len(args) > value_idx:
-                args = args[:value_idx] + (serialized_msg,) + args[value_idx + 1 :]
-            elif "value" in kwargs:
-                kwargs["value"] = serialized_msg
-
-            if len(args) > on_delivery_idx:
-                original_on_delivery_cb = args[on_delivery_idx]
-            if "on_delivery" in kwargs:
-                original_on_delivery_cb = kwargs["on_delivery"]
-
-            def updated_on_delivery_cb(err, msg):
-                if err:
-                    original_on_delivery_cb(err, msg)
-                else:
-                    topic = msg.topic()
-                    partition = msg.partition()
-                    superstream.update_topic_partitions(topic, partition)
-                    original_on_delivery_cb(err, msg)
-
-            if len(args) > on_delivery_idx:
-                args = (
-                    args[:on_delivery_idx]
-                    + (updated_on_delivery_cb,)
-                    + args[on_delivery_idx + 1 :]
+            serialized_msg, superstream_headers = self._serialize(*json_msg)
+            produce_kwargs["value"] = serialized_msg
+            if superstream_headers:
+                produce_kwargs["headers"] = _merge_headers(
+                    produce_kwargs.get("headers"), superstream_headers
                 )
-            elif "on_delivery" in kwargs:
-                kwargs["on_delivery"] = updated_on_delivery_cb
+
+            on_delivery = produce_kwargs.pop("callback", None) or produce_kwargs.get("on_delivery")
+            if on_delivery is not None:
+                produce_kwargs["on_delivery"] = self._get_delivery_report_adaptor(on_delivery)
 
         except Exception:
-            pass  # ignore errors from superstream, produce should be possible even if there is error in superstream
+            # ignore errors from superstream, produce should be possible even if there is error in superstream
+            self._producer_handler(*args, **kwargs)
+            return
+
+        self._producer_handler(**produce_kwargs)
+
+    def _get_delivery_report_adaptor(self, on_delivery: Callable) -> "_DeliveryReportAdaptor":
+        adaptor = self._delivery_report_adaptors.get(on_delivery)
+        if adaptor is None:
+            if len(self._delivery_report_adaptors) >= _MAX_DELIVERY_REPORT_ADAPTORS:
+                # callbacks created per message (e.g. lambdas) must not grow the cache forever
+                self._delivery_report_adaptors.clear()
+            adaptor = _DeliveryReportAdaptor(self.superstream, on_delivery)
+            self._delivery_report_adaptors[on_delivery] = adaptor
+        return adaptor
+
+    def _try_convert_to_json(self, topic: str, msg: Any) -> Optional[Tuple[Optional[bytes], Any]]:
+        if msg is None:
+            return None
+
+        non_json_count = self._non_json_counts.get(topic, 0)
+        skipped = non_json_count - SuperstreamValues.NON_JSON_TOPIC_THRESHOLD + 1
+        if skipped > 0 and skipped % SuperstreamValues.NON_JSON_TOPIC_REPROBE_INTERVAL:
+            # known non JSON topic, skip the attempt but probe again now and then
+            self._non_json_counts[topic] = non_json_count + 1
+            return None
+
+        json_msg = None
+        if _is_json_object_candidate(msg):
+            json_msg = _try_convert_to_json(msg)
 
-        self._producer_handler(*args, **kwargs)
+        if json_msg is None:
+            self._non_json_counts[topic] = non_json_count + 1
+        elif non_json_count:
+            self._non_json_counts[topic] = 0
+        return json_msg
 
-    def _serialize(self, json_msg: str) -> Union[bytes, Dict[str, Any]]:
+    def _serialize(
+        self, json_bytes: Optional[bytes], json_obj: Any
+    ) -> Tuple[bytes, Dict[str, Any]]:
         superstream: Superstream = self._superstream_config_.get(
             SuperstreamKeys.CONNECTION
         )
-        byte_msg = json_msg.encode("utf-8")
         headers: Dict[str, Any] = {}
 
         # superstream.client_counters.total_bytes_before_reduction += len(byte_msg)
 
         if superstream.producer_proto_desc and superstream.reduction_enabled:
             try:
-                byte_msg = json_to_proto(byte_msg, superstream.producer_proto_desc)
+                # the parsed payload goes straight into the encoder, the JSON text is never parsed again
+                byte_msg = json_to_proto(json_obj, superstream.producer_proto_desc)
                 # superstream.client_counters.total_messages_successfully_produce += 1
                 headers = {"superstream_schema": superstream.producer_schema_id}
-            except Exception as e:
-                superstream.handle_error(f"error serializing data: {e}")
-                # superstream.client_counters.total_messages_failed_produce += 1
                 return byte_msg, headers
-
-        elif superstream.reduction_enabled:
-            try:
-                if superstream.learning_factor_counter <= superstream.learning_factor:
-                    asyncio.run(superstream.send_learning_message(byte_msg))
-                    superstream.learning_factor_counter += 1
-                elif not superstream.learning_request_sent:
-                    asyncio.run(superstream.send_register_schema_req())
             except Exception as e:
-                asyncio.run(
-                    superstream.handle_error(f"error sending learning message: {e}")
+                superstream.submit_task(
+                    superstream.handle_error(f"error serializing data: {e}")
                 )
+                # superstream.client_counters.total_messages_failed_produce += 1
+                return _json_bytes(json_bytes, json_obj), headers
+
+        byte_msg = _json_bytes(json_bytes, json_obj)
+        if superstream.reduction_enabled:
+            # queued for the superstream event loop, learning never waits for the network
+            superstream.enqueue_learning_message(byte_msg)
 
         return byte_msg, headers
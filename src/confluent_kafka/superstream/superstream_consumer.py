@@ -1,5 +1,6 @@
 from typing import Any, Dict, List, Optional
 
+from confluent_kafka._model import ColumnBatch
 from confluent_kafka.cimpl import Consumer as _ConsumerImpl
 
 from .consumer_interceptor import SuperstreamConsumerInterceptor
@@ -22,4 +23,11 @@ class SuperstreamConsumer(_ConsumerImpl):
         messages = super().consume(*args, **kwargs)
         if messages is None:
             return messages
-        return [self._interceptor.consume(message) for message in messages]
\ No newline at end of file
+        return self._interceptor.consume(messages)
+
+    def consume_columns(self, *args, **kwargs) -> ColumnBatch:
+        if self._interceptor.superstream is None:
+            return super().consume_columns(*args, **kwargs)
+        # values reduced by superstream are recognized by their headers, which the columns do not carry,
+        # consume() restores them so all consume methods return the same data
+        return ColumnBatch.from_messages(self.consume(*args, **kwargs))
@@ -1,65 +1,392 @@
-import asyncio
-import queue
 import threading
-from typing import Dict
+import time
+from collections import deque
+from typing import Dict, Optional
 
+from confluent_kafka.cimpl import KafkaError, KafkaException
 from confluent_kafka.cimpl import Producer as _ProducerImpl
 
-from .producer_interceptor import SuperstreamProducerInterceptor
+from .constants import SuperstreamValues
+from .producer_interceptor import SuperstreamProducerInterceptor, _normalize_produce_args
+from .std import SuperstreamStd
+from .utils import KafkaUtil
 
+# fields of a produce_batch() message tuple
+_BATCH_MESSAGE_FIELDS = ("value", "key", "headers", "timestamp")
+
+
+def _check_batch_buf(idx, field, data):
+    if data is not None and not isinstance(data, (str, bytes)):
+        raise TypeError(f"messages[{idx}]: expected {field} to be str, bytes or None, not {type(data).__name__}")
+
+
+def _parse_batch_messages(messages):
+    """
+    Returns the produce() keyword arguments of produce_batch() messages.
+    Every message is checked before any is produced, a malformed message fails
+    the whole batch as it does with the C implementation.
+    """
+    parsed = []
+    for idx, message in enumerate(messages):
+        if isinstance(message, tuple):
+            if not 1 <= len(message) <= len(_BATCH_MESSAGE_FIELDS):
+                raise ValueError(f"messages[{idx}]: expected a (value, key, headers, timestamp) tuple, "
+                                 f"not {len(message)} elements")
+            message = dict(zip(_BATCH_MESSAGE_FIELDS, message))
+        elif not isinstance(message, dict):
+            raise TypeError(f"messages[{idx}]: expected tuple or dict, not {type(message).__name__}")
+
+        _check_batch_buf(idx, "value", message.get("value"))
+        _check_batch_buf(idx, "key", message.get("key"))
+
+        timestamp = message.get("timestamp")
+        if timestamp is not None and not isinstance(timestamp, int):
+            raise TypeError(f"messages[{idx}]: expected timestamp to be int, not {type(timestamp).__name__}")
+
+        headers = message.get("headers")
+        if headers is not None:
+            items = list(headers.items()) if isinstance(headers, dict) else headers
+            if not isinstance(items, list) or \
+                    not all(isinstance(header, tuple) and len(header) == 2 for header in items):
+                raise TypeError(f"messages[{idx}]: expected headers to be dict or list of (key, value) tuples")
+            for key, value in items:
+                if not isinstance(key, str):
+                    raise TypeError(f"messages[{idx}]: expected header key to be str, not {type(key).__name__}")
+                _check_batch_buf(idx, "header value", value)
+
+        parsed.append({field: message[field] for field in _BATCH_MESSAGE_FIELDS if message.get(field) is not None})
+    return parsed
+
+
+def _is_true(value) -> bool:
+    return str(value).lower() in ("true", "1")
+
+
+def _message_timeout(config: Dict) -> float:
+    """
+    Returns the time, in seconds, librdkafka takes at most to report a message as delivered or failed.
+    """
+    for key in ("message.timeout.ms", "delivery.timeout.ms"):
+        # 0 is infinite
+        if int(config.get(key, 0)) > 0:
+            return int(config[key]) / 1000
+    return KafkaUtil.Defaults["message.timeout.ms"] / 1000
+
+
+class _InFlight:
+    """
+    Undelivered messages of a producer per topic, counted down by the delivery
+    callbacks wrapping the application's ones.
+    """
+
+    __slots__ = ("_lock", "_topics", "only_error")
 
-class SuperstreamProducer:
     def __init__(self, config: Dict):
         self._lock = threading.Lock()
-        self._message_queue = queue.Queue()
+        self._topics: Dict[str, int] = {}
+        self.only_error = _is_true(config.get("delivery.report.only.error", False))
+
+    def producer_config(self, config: Dict) -> Dict:
+        """
+        Returns the producer configuration with every delivery report served through this counter.
+        """
+        config = dict(config)
+        # successful reports are needed to count the messages down, they are filtered by the callbacks instead
+        config.pop("delivery.report.only.error", None)
+        on_delivery_batch = config.get("on_delivery_batch")
+        on_delivery = config.get("on_delivery")
+        if callable(on_delivery_batch):
+            config["on_delivery_batch"] = _InFlightBatchDelivery(self, on_delivery_batch)
+        elif on_delivery is None or callable(on_delivery):
+            config["on_delivery"] = _InFlightDelivery(self, on_delivery)
+        return config
+
+    def add(self, topic: str, count: int = 1):
+        with self._lock:
+            self._topics[topic] = self._topics.get(topic, 0) + count
+
+    def done(self, topic: str):
+        with self._lock:
+            count = self._topics.get(topic, 0) - 1
+            if count > 0:
+                self._topics[topic] = count
+            else:
+                self._topics.pop(topic, None)
+
+    def __contains__(self, topic: str) -> bool:
+        return topic in self._topics
+
+    def __bool__(self) -> bool:
+        return bool(self._topics)
+
+
+class _InFlightDelivery:
+    __slots__ = ("_in_flight", "_on_delivery")
+
+    def __init__(self, in_flight: _InFlight, on_delivery):
+        self._in_flight = in_flight
+        self._on_delivery = on_delivery
+
+    def __call__(self, err, msg):
+        self._in_flight.done(msg.topic())
+        if self._on_delivery is not None and (err or not self._in_flight.only_error):
+            self._on_delivery(err, msg)
+
+
+class _InFlightBatchDelivery:
+    __slots__ = ("_in_flight", "_on_delivery_batch")
+
+    def __init__(self, in_flight: _InFlight, on_delivery_batch):
+        self._in_flight = in_flight
+        self._on_delivery_batch = on_delivery_batch
+
+    def __call__(self, errors, topics, partitions, offsets, opaques):
+        for topic in topics:
+            self._in_flight.done(topic)
+        if self._in_flight.only_error:
+            failed = [i for i, err in enumerate(errors) if err]
+            if not failed:
+                return
+            errors, topics, partitions, offsets, opaques = (
+                [column[i] for i in failed] for column in (errors, topics, partitions, offsets, opaques)
+            )
+        self._on_delivery_batch(errors, topics, partitions, offsets, opaques)
+
+
+class SuperstreamProducer:
+    def __init__(self, config: Dict):
+        self._update_lock = threading.Lock()
+        # orders produce() with the replacement of the producer
+        self._route_lock = threading.Lock()
+        # replaced producer delivering its outstanding messages, None when no swap is in progress
+        self._draining = None
+        self._draining_in_flight = None
+        # topic -> produce() arguments held back until the replaced producer delivered the topic's messages
+        self._held_back: Dict[str, deque] = {}
+        self._drained = threading.Event()
+        self._drained.set()
         self._interceptor = SuperstreamProducerInterceptor(config)
         config = self._interceptor.wait_for_superstream_configs_sync(config)
         self._interceptor.set_full_configuration(config)
-        self._p = _ProducerImpl(config)
-        self._interceptor.set_producer_handler(self._p.produce)
+        if self._interceptor.superstream:
+            # the producer may be replaced, messages are counted to keep each topic in order across producers
+            self._in_flight = _InFlight(config)
+            self._p = _ProducerImpl(self._in_flight.producer_config(config))
+            self._interceptor.set_producer_handler(self._produce_in_order)
+        else:
+            self._in_flight = None
+            self._p = _ProducerImpl(config)
+            self._interceptor.set_producer_handler(self._p.produce)
         self._interceptor.set_config_update_cb(self._update_config)
         self._config = config
-        self._loop = asyncio.get_event_loop()
 
     def __len__(self):
-        return len(self._p)
+        length = len(self._p)
+        draining = self._draining
+        if draining is not None:
+            length += len(draining)
+        return length + self._held_back_count()
 
     def produce(self, *args, **kwargs):
-        if self._lock.locked():
-            self._message_queue.put((args, kwargs))
-        else:
-            self._interceptor.produce(*args, **kwargs)
+        self._interceptor.produce(*args, **kwargs)
+
+    def _produce_in_order(self, *args, **kwargs):
+        produce_kwargs = _normalize_produce_args(args, kwargs)
+        topic = produce_kwargs.get("topic")
+        with self._route_lock:
+            if not self._is_held_back(topic):
+                self._produce_counted(produce_kwargs)
+                return
+            held_back = self._held_back.setdefault(topic, deque())
+            if len(held_back) >= SuperstreamValues.SWAP_HELD_BACK_MESSAGES:
+                raise BufferError(f"superstream: too many messages held back for topic {topic} "
+                                  "while the producer is replaced")
+            held_back.append(produce_kwargs)
+
+    def _is_held_back(self, topic: str) -> bool:
+        """
+        Returns True if the topic's messages are held back, must be called with the route lock held.
+        """
+        return topic in self._held_back or (
+            self._draining_in_flight is not None and topic in self._draining_in_flight
+        )
 
-    async def _produce_messages_from_queue(self):
-        while not self._message_queue.empty():
-            args, kwargs = self._message_queue.get()
-            self._interceptor.produce(*args, **kwargs)
+    def _held_back_count(self) -> int:
+        return sum(len(held_back) for held_back in list(self._held_back.values()))
+
+    def _produce_counted(self, produce_kwargs: Dict):
+        """
+        Produces with the current producer, must be called with the route lock held.
+        """
+        produce_kwargs = dict(produce_kwargs)
+        on_delivery = produce_kwargs.pop("callback", None) or produce_kwargs.get("on_delivery")
+        if on_delivery is not None:
+            produce_kwargs["on_delivery"] = _InFlightDelivery(self._in_flight, on_delivery)
+        topic = produce_kwargs.get("topic")
+        self._in_flight.add(topic)
+        try:
+            self._p.produce(**produce_kwargs)
+        except BaseException:
+            self._in_flight.done(topic)
+            raise
+
+    def _release_held_back(self, pending: Optional[_InFlight] = None):
+        """
+        Produces the held back messages of the topics without undelivered messages in pending,
+        of every topic if pending is None. Must be called with the route lock held.
+        """
+        for topic in list(self._held_back):
+            if pending is not None and topic in pending:
+                continue
+            held_back = self._held_back[topic]
+            while held_back:
+                try:
+                    self._produce_counted(held_back[0])
+                except BufferError:
+                    # retried once the current producer's queue has room
+                    break
+                except Exception as e:
+                    SuperstreamStd().error(f"superstream: error producing held back message: {e!s}")
+                held_back.popleft()
+            if not held_back:
+                del self._held_back[topic]
+
+    def produce_batch(self, topic, messages, partition=None, on_delivery=None, callback=None):
+        superstream = self._interceptor.superstream
+        if superstream and superstream.superstream_ready:
+            # payloads are reduced message by message
+            return self._produce_each(topic, messages, partition, on_delivery or callback)
+
+        produce_kwargs = {}
+        if partition is not None:
+            produce_kwargs["partition"] = partition
+        if on_delivery or callback:
+            produce_kwargs["on_delivery"] = on_delivery or callback
+        if self._in_flight is None:
+            return self._p.produce_batch(topic, messages, **produce_kwargs)
+
+        with self._route_lock:
+            if not self._is_held_back(topic):
+                if "on_delivery" in produce_kwargs:
+                    produce_kwargs["on_delivery"] = _InFlightDelivery(self._in_flight, produce_kwargs["on_delivery"])
+                self._in_flight.add(topic, len(messages))
+                try:
+                    errors = self._p.produce_batch(topic, messages, **produce_kwargs)
+                except BaseException:
+                    self._in_flight.add(topic, -len(messages))
+                    raise
+                for err in errors:
+                    if err is not None:
+                        self._in_flight.done(topic)
+                return errors
+        # the topic's earlier messages are still delivered by the replaced producer
+        return self._produce_each(topic, messages, partition, on_delivery or callback)
+
+    def _produce_each(self, topic, messages, partition, on_delivery):
+        errors = []
+        for produce_kwargs in _parse_batch_messages(messages):
+            if partition is not None:
+                produce_kwargs["partition"] = partition
+            if on_delivery is not None:
+                produce_kwargs["on_delivery"] = on_delivery
+            try:
+                self.produce(topic, **produce_kwargs)
+            except BufferError:
+                errors.append(KafkaError(KafkaError._QUEUE_FULL))
+            except KafkaException as e:
+                errors.append(e.args[0])
+            else:
+                errors.append(None)
+        return errors
 
     def _update_config(self, new_config: Dict):
-        with self._lock:
+        # the swap runs in the background so neither the superstream event loop nor produce() wait for it
+        threading.Thread(
+            target=self._swap_producer, args=(new_config,), daemon=True
+        ).start()
+
+    def _swap_producer(self, new_config: Dict):
+        with self._update_lock:
             try:
-                self.poll(0)
-                self.flush()
+                # build the new producer first, the current one keeps serving produce() meanwhile
+                new_in_flight = _InFlight(new_config)
+                new_p = _ProducerImpl(new_in_flight.producer_config(new_config))
+            except Exception as e:
+                SuperstreamStd().error(f"superstream: error creating producer: {e!s}")
+                return
 
-                self._p = _ProducerImpl(new_config)
-                
-                self._interceptor.set_full_configuration(new_config)
-                self._interceptor.set_producer_handler(self._p.produce)
-                asyncio.run_coroutine_threadsafe(
-                    self._produce_messages_from_queue(), self._loop
-                )
+            with self._route_lock:
+                old_p, old_in_flight = self._p, self._in_flight
+                drain_timeout = _message_timeout(self._config)
+                self._drained.clear()
+                self._draining, self._draining_in_flight = old_p, old_in_flight
+                self._p, self._in_flight = new_p, new_in_flight
+                self._config = new_config
+            self._interceptor.set_full_configuration(new_config)
 
+            try:
+                self._drain(old_p, old_in_flight, drain_timeout)
             except Exception as e:
-                print(e)
-                pass
+                SuperstreamStd().error(f"superstream: error draining producer: {e!s}")
+            finally:
+                with self._route_lock:
+                    self._draining = self._draining_in_flight = None
+                    self._release_held_back()
+                    dropped = self._held_back_count()
+                    self._held_back.clear()
+                if dropped:
+                    SuperstreamStd().error(f"superstream: {dropped} held back messages dropped, "
+                                           "the producer queue is full")
+                self._drained.set()
+
+    def _drain(self, old_p, old_in_flight: _InFlight, timeout: float):
+        """
+        Serves the replaced producer's delivery reports, each topic moves over to the new
+        producer, with its held back messages, once its earlier messages are delivered.
+        """
+        # librdkafka reports the messages it could not deliver within the message timeout
+        deadline = time.monotonic() + timeout + 1
+        while True:
+            with self._route_lock:
+                self._release_held_back(old_in_flight)
+                if not old_in_flight and not self._held_back:
+                    return
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            old_p.poll(min(remaining, 0.1))
+        SuperstreamStd().error(f"superstream: replaced producer did not deliver {len(old_p)} messages "
+                               f"within {timeout}s, held back messages are produced regardless")
 
     def poll(self, *args, **kwargs):
         return self._p.poll(*args, **kwargs)
 
     def flush(self, *args, **kwargs):
-        return self._p.flush(*args, **kwargs)
+        timeout = args[0] if args else kwargs.get("timeout", -1)
+        if timeout is None or timeout < 0:
+            self._drained.wait()
+            return self._p.flush()
+        # the replaced producer and the current one share the caller's timeout
+        deadline = time.monotonic() + timeout
+        if not self._drained.wait(timeout):
+            return len(self)
+        return self._p.flush(max(0.0, deadline - time.monotonic()))
 
     def purge(self, *args, **kwargs):
+        draining = self._draining
+        if draining is not None:
+            draining.purge(*args, **kwargs)
+        in_queue = args[0] if args else kwargs.get("in_queue", True)
+        if in_queue and self._held_back:
+            with self._route_lock:
+                # held back messages are queued ones, they are purged from the current producer
+                # so their delivery reports carry the purge error
+                while self._held_back:
+                    held_back = self._held_back_count()
+                    self._release_held_back()
+                    self._p.purge(*args, **kwargs)
+                    if self._held_back_count() == held_back:
+                        break
         return self._p.purge(*args, **kwargs)
 
     def list_topics(self, *args, **kwargs):
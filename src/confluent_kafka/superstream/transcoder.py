@@ -0,0 +1,760 @@
+import base64
+import json
+import math
+import struct
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from google.protobuf import json_format
+from google.protobuf.descriptor import Descriptor, FieldDescriptor
+from google.protobuf.message import DecodeError
+
+try:
+    from json.encoder import c_encode_basestring as _encode_str
+except ImportError:
+    _encode_str = None
+if _encode_str is None:
+    from json.encoder import py_encode_basestring as _encode_str
+
+_WIRE_VARINT = 0
+_WIRE_FIXED64 = 1
+_WIRE_LENGTH = 2
+_WIRE_START_GROUP = 3
+_WIRE_END_GROUP = 4
+_WIRE_FIXED32 = 5
+
+_UINT32_MASK = (1 << 32) - 1
+_UINT64_MASK = (1 << 64) - 1
+
+_INT32_RANGE = (-(1 << 31), (1 << 31) - 1)
+_UINT32_RANGE = (0, (1 << 32) - 1)
+_INT64_RANGE = (-(1 << 63), (1 << 63) - 1)
+_UINT64_RANGE = (0, (1 << 64) - 1)
+
+_FLOAT_MAX = 3.4028234663852886e38
+
+_FLOAT = struct.Struct("<f")
+_DOUBLE = struct.Struct("<d")
+_UINT32 = struct.Struct("<I")
+_UINT64 = struct.Struct("<Q")
+
+_NAN = "NaN"
+_INFINITY = "Infinity"
+_NEG_INFINITY = "-Infinity"
+
+_WELL_KNOWN_TYPES_PREFIX = "google.protobuf."
+
+_MISSING = object()
+
+# wire encodings of zero, the empty string and empty bytes, which implicit presence fields omit
+_DEFAULT_ENCODINGS = frozenset((b"\x00", b"\x00" * 4, b"\x00" * 8))
+
+_T = FieldDescriptor
+
+_VARINT_TYPES = frozenset(
+    (
+        _T.TYPE_INT32,
+        _T.TYPE_INT64,
+        _T.TYPE_UINT32,
+        _T.TYPE_UINT64,
+        _T.TYPE_SINT32,
+        _T.TYPE_SINT64,
+        _T.TYPE_BOOL,
+        _T.TYPE_ENUM,
+    )
+)
+_FIXED32_TYPES = frozenset((_T.TYPE_FIXED32, _T.TYPE_SFIXED32, _T.TYPE_FLOAT))
+_FIXED64_TYPES = frozenset((_T.TYPE_FIXED64, _T.TYPE_SFIXED64, _T.TYPE_DOUBLE))
+
+
+def _is_repeated(field: FieldDescriptor) -> bool:
+    try:
+        return field.is_repeated
+    except AttributeError:
+        return field.label == FieldDescriptor.LABEL_REPEATED
+
+
+def _is_packed(field: FieldDescriptor) -> bool:
+    try:
+        return field.is_packed
+    except AttributeError:
+        options = field.GetOptions()
+        if options.HasField("packed"):
+            return options.packed
+        return field.file.syntax == "proto3"
+
+
+def _is_map(field: FieldDescriptor) -> bool:
+    return (
+        field.type == FieldDescriptor.TYPE_MESSAGE
+        and field.message_type.GetOptions().map_entry
+    )
+
+
+def _wire_type(field_type: int) -> int:
+    if field_type in _VARINT_TYPES:
+        return _WIRE_VARINT
+    if field_type in _FIXED32_TYPES:
+        return _WIRE_FIXED32
+    if field_type in _FIXED64_TYPES:
+        return _WIRE_FIXED64
+    return _WIRE_LENGTH
+
+
+def _encode_varint(value: int) -> bytes:
+    out = bytearray()
+    _write_varint(out, value)
+    return bytes(out)
+
+
+def _write_varint(out: bytearray, value: int):
+    value &= _UINT64_MASK
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(buf: bytes, pos: int):
+    result = buf[pos]
+    pos += 1
+    if result < 0x80:
+        return result, pos
+    result &= 0x7F
+    shift = 7
+    while True:
+        b = buf[pos]
+        pos += 1
+        result |= (b & 0x7F) << shift
+        if b < 0x80:
+            return result & _UINT64_MASK, pos
+        shift += 7
+        if shift >= 70:
+            raise DecodeError("Too many bytes when decoding varint.")
+
+
+def _skip_field(buf: bytes, pos: int, wire_type: int) -> int:
+    if wire_type == _WIRE_VARINT:
+        _, pos = _read_varint(buf, pos)
+    elif wire_type == _WIRE_FIXED64:
+        pos += 8
+    elif wire_type == _WIRE_LENGTH:
+        length, pos = _read_varint(buf, pos)
+        pos += length
+    elif wire_type == _WIRE_FIXED32:
+        pos += 4
+    else:
+        raise DecodeError(f"Unsupported wire type: {wire_type}")
+    return pos
+
+
+def _to_int32(raw: int) -> int:
+    raw &= _UINT32_MASK
+    return raw - (1 << 32) if raw & 0x80000000 else raw
+
+
+def _to_int64(raw: int) -> int:
+    return raw - (1 << 64) if raw & (1 << 63) else raw
+
+
+def _unzigzag(raw: int) -> int:
+    return (raw >> 1) ^ -(raw & 1)
+
+
+def _float_to_json(value: float) -> str:
+    if value != value:
+        return '"NaN"'
+    if value in (math.inf, -math.inf):
+        return '"Infinity"' if value > 0 else '"-Infinity"'
+    return float.__repr__(value)
+
+
+def _shortest_float(value: float) -> float:
+    # same rounding as json_format, the shortest repr that maps to the same 4 byte float
+    precision = 6
+    rounded = float("{0:.{1}g}".format(value, precision))
+    while _FLOAT.unpack(_FLOAT.pack(rounded))[0] != value:
+        precision += 1
+        rounded = float("{0:.{1}g}".format(value, precision))
+    return rounded
+
+
+def _make_value_formatter(field: FieldDescriptor, plans: Dict[str, "_MessagePlan"]) -> Callable:
+    """
+    Returns a function that formats the raw wire value of a field as a JSON fragment.
+    Raw values are ints for varint and fixed width fields and bytes for length delimited fields.
+    """
+    t = field.type
+    if t == _T.TYPE_INT32:
+        return lambda raw: str(_to_int32(raw))
+    if t == _T.TYPE_INT64:
+        return lambda raw: f'"{_to_int64(raw)}"'
+    if t == _T.TYPE_UINT32:
+        return lambda raw: str(raw & _UINT32_MASK)
+    if t == _T.TYPE_UINT64:
+        return lambda raw: f'"{raw}"'
+    if t == _T.TYPE_SINT32:
+        return lambda raw: str(_unzigzag(raw & _UINT32_MASK))
+    if t == _T.TYPE_SINT64:
+        return lambda raw: f'"{_unzigzag(raw)}"'
+    if t == _T.TYPE_BOOL:
+        return lambda raw: "true" if raw else "false"
+    if t == _T.TYPE_FIXED32:
+        return str
+    if t == _T.TYPE_SFIXED32:
+        return lambda raw: str(raw - (1 << 32) if raw & 0x80000000 else raw)
+    if t == _T.TYPE_FIXED64:
+        return lambda raw: f'"{raw}"'
+    if t == _T.TYPE_SFIXED64:
+        return lambda raw: f'"{_to_int64(raw)}"'
+    if t == _T.TYPE_FLOAT:
+
+        def format_float(raw):
+            value = _FLOAT.unpack(_UINT32.pack(raw))[0]
+            if value != value or value in (math.inf, -math.inf):
+                return _float_to_json(value)
+            return float.__repr__(_shortest_float(value))
+
+        return format_float
+    if t == _T.TYPE_DOUBLE:
+        return lambda raw: _float_to_json(_DOUBLE.unpack(_UINT64.pack(raw))[0])
+    if t == _T.TYPE_STRING:
+        return lambda raw: _encode_str(raw.decode("utf-8"))
+    if t == _T.TYPE_BYTES:
+        return lambda raw: '"' + base64.b64encode(raw).decode("ascii") + '"'
+    if t == _T.TYPE_ENUM:
+        names = {v.number: _encode_str(v.name) for v in field.enum_type.values}
+
+        def format_enum(raw):
+            number = _to_int32(raw)
+            name = names.get(number)
+            return name if name is not None else str(number)
+
+        return format_enum
+    if t == _T.TYPE_MESSAGE:
+        plan = plans[field.message_type.full_name]
+        return lambda raw: plan.to_json(raw, 0, len(raw))
+    raise ValueError(f"unsupported field type {t} for field {field.full_name}")
+
+
+def _check_range(value: int, bounds, field: FieldDescriptor) -> int:
+    if value < bounds[0] or value > bounds[1]:
+        raise json_format.ParseError(f"Value out of range: {value} for field {field.full_name}")
+    return value
+
+
+def _parse_integer(value: Any, field: FieldDescriptor) -> int:
+    if isinstance(value, bool):
+        raise json_format.ParseError(f"Bool value {value} is not acceptable for integer field {field.full_name}")
+    if isinstance(value, float) and not value.is_integer():
+        raise json_format.ParseError(f"Couldn't parse integer: {value} for field {field.full_name}")
+    if isinstance(value, str) and " " in value:
+        raise json_format.ParseError(f"Couldn't parse integer: {value!r} for field {field.full_name}")
+    try:
+        return int(value)
+    except (TypeError, ValueError) as e:
+        raise json_format.ParseError(f"Couldn't parse integer: {value!r} for field {field.full_name}") from e
+
+
+def _parse_float(value: Any, field: FieldDescriptor) -> float:
+    if isinstance(value, float):
+        if math.isnan(value):
+            raise json_format.ParseError('Couldn\'t parse NaN, use quoted "NaN" instead')
+        if math.isinf(value):
+            raise json_format.ParseError('Couldn\'t parse Infinity or value too large, use quoted "Infinity" instead')
+    if value == "nan":
+        raise json_format.ParseError('Couldn\'t parse float "nan", use "NaN" instead')
+    try:
+        result = float(value)
+    except (TypeError, ValueError) as e:
+        if value == _NEG_INFINITY:
+            return -math.inf
+        if value == _INFINITY:
+            return math.inf
+        if value == _NAN:
+            return math.nan
+        raise json_format.ParseError(f"Couldn't parse float: {value!r} for field {field.full_name}") from e
+    if field.type == _T.TYPE_FLOAT and not math.isinf(result) and abs(result) > _FLOAT_MAX:
+        raise json_format.ParseError(f"Float value too large for field {field.full_name}")
+    return result
+
+
+def _make_value_encoder(field: FieldDescriptor, plans: Dict[str, "_MessagePlan"]) -> Callable:
+    """
+    Returns a function that converts a JSON value of a field into its wire encoding without the tag.
+    """
+    t = field.type
+    if t in (_T.TYPE_INT32, _T.TYPE_INT64, _T.TYPE_UINT32, _T.TYPE_UINT64):
+        bounds = {
+            _T.TYPE_INT32: _INT32_RANGE,
+            _T.TYPE_INT64: _INT64_RANGE,
+            _T.TYPE_UINT32: _UINT32_RANGE,
+            _T.TYPE_UINT64: _UINT64_RANGE,
+        }[t]
+        return lambda value: _encode_varint(_check_range(_parse_integer(value, field), bounds, field))
+    if t in (_T.TYPE_SINT32, _T.TYPE_SINT64):
+        bounds = _INT32_RANGE if t == _T.TYPE_SINT32 else _INT64_RANGE
+
+        def encode_sint(value):
+            number = _check_range(_parse_integer(value, field), bounds, field)
+            return _encode_varint(number << 1 if number >= 0 else ((-number) << 1) - 1)
+
+        return encode_sint
+    if t in (_T.TYPE_FIXED32, _T.TYPE_SFIXED32, _T.TYPE_FIXED64, _T.TYPE_SFIXED64):
+        packer, bounds = {
+            _T.TYPE_FIXED32: (struct.Struct("<I"), _UINT32_RANGE),
+            _T.TYPE_SFIXED32: (struct.Struct("<i"), _INT32_RANGE),
+            _T.TYPE_FIXED64: (struct.Struct("<Q"), _UINT64_RANGE),
+            _T.TYPE_SFIXED64: (struct.Struct("<q"), _INT64_RANGE),
+        }[t]
+        return lambda value: packer.pack(_check_range(_parse_integer(value, field), bounds, field))
+    if t == _T.TYPE_FLOAT:
+        return lambda value: _FLOAT.pack(_parse_float(value, field))
+    if t == _T.TYPE_DOUBLE:
+        return lambda value: _DOUBLE.pack(_parse_float(value, field))
+    if t == _T.TYPE_BOOL:
+
+        def encode_bool(value):
+            if not isinstance(value, bool):
+                raise json_format.ParseError(f"Expected true or false without quotes for field {field.full_name}")
+            return b"\x01" if value else b"\x00"
+
+        return encode_bool
+    if t == _T.TYPE_STRING:
+
+        def encode_string(value):
+            if not isinstance(value, str):
+                raise json_format.ParseError(f"Invalid string value {value!r} for field {field.full_name}")
+            data = value.encode("utf-8")
+            return _encode_varint(len(data)) + data
+
+        return encode_string
+    if t == _T.TYPE_BYTES:
+
+        def encode_bytes(value):
+            if not isinstance(value, str):
+                raise json_format.ParseError(f"Invalid bytes value {value!r} for field {field.full_name}")
+            encoded = value.encode("utf-8")
+            padded = encoded + b"=" * (-len(encoded) % 4)
+            try:
+                data = base64.urlsafe_b64decode(padded.replace(b"+", b"-").replace(b"/", b"_"))
+            except Exception as e:
+                raise json_format.ParseError(f"Invalid bytes value {value!r} for field {field.full_name}") from e
+            return _encode_varint(len(data)) + data
+
+        return encode_bytes
+    if t == _T.TYPE_ENUM:
+        numbers = {v.name: v.number for v in field.enum_type.values}
+        known = frozenset(numbers.values())
+        closed = getattr(field.enum_type, "is_closed", False)
+
+        def encode_enum(value):
+            number = numbers.get(value) if isinstance(value, str) else None
+            if number is None:
+                number = _parse_integer(value, field)
+                if closed and number not in known:
+                    raise json_format.ParseError(
+                        f"Invalid enum value {value} for enum type {field.enum_type.full_name}"
+                    )
+                _check_range(number, _INT32_RANGE, field)
+            return _encode_varint(number)
+
+        return encode_enum
+    if t == _T.TYPE_MESSAGE:
+        plan = plans[field.message_type.full_name]
+
+        def encode_message(value):
+            data = plan.from_json(value)
+            return _encode_varint(len(data)) + data
+
+        return encode_message
+    raise ValueError(f"unsupported field type {t} for field {field.full_name}")
+
+
+def _encode_map_key(key: str, field: FieldDescriptor):
+    t = field.type
+    if t == _T.TYPE_BOOL:
+        if key == "true":
+            return True
+        if key == "false":
+            return False
+        raise json_format.ParseError(f"Expected 'true' or 'false', not {key}")
+    if t == _T.TYPE_STRING:
+        return key
+    return _parse_integer(key, field)
+
+
+class _FieldPlan:
+    """
+    Precomputed transcoding instructions for a single field of a message.
+    """
+
+    __slots__ = (
+        "descriptor",
+        "number",
+        "name",
+        "json_key",
+        "wire_type",
+        "repeated",
+        "packable",
+        "packed",
+        "has_presence",
+        "is_map",
+        "oneof",
+        "tag",
+        "format_value",
+        "encode_value",
+        "map_key",
+        "map_value",
+    )
+
+    def __init__(self, field: FieldDescriptor):
+        self.descriptor = field
+        self.number = field.number
+        self.name = field.name
+        self.json_key = _encode_str(field.json_name) + ":"
+        self.wire_type = _wire_type(field.type)
+        self.repeated = _is_repeated(field)
+        self.packable = self.repeated and self.wire_type != _WIRE_LENGTH
+        self.packed = self.packable and _is_packed(field)
+        self.has_presence = not self.repeated and field.has_presence
+        self.is_map = _is_map(field)
+        self.oneof = field.containing_oneof.name if field.containing_oneof is not None else None
+        self.tag = _encode_varint(
+            (field.number << 3) | (_WIRE_LENGTH if self.packed else self.wire_type)
+        )
+        self.format_value = None
+        self.encode_value = None
+        self.map_key = None
+        self.map_value = None
+
+    def compile(self, plans: Dict[str, "_MessagePlan"]):
+        if self.is_map:
+            entry = self.descriptor.message_type
+            key_field = entry.fields_by_number[1]
+            value_field = entry.fields_by_number[2]
+            self.map_key = _FieldPlan(key_field)
+            self.map_value = _FieldPlan(value_field)
+            self.map_key.compile(plans)
+            self.map_value.compile(plans)
+            return
+        self.format_value = _make_value_formatter(self.descriptor, plans)
+        self.encode_value = _make_value_encoder(self.descriptor, plans)
+
+    def default_raw(self):
+        if self.wire_type == _WIRE_LENGTH:
+            return b""
+        return 0
+
+
+class _MessagePlan:
+    """
+    Precomputed transcoding instructions for a message type, shared by every field that refers to it.
+    """
+
+    __slots__ = ("full_name", "fields", "by_number", "by_name", "has_oneofs")
+
+    def __init__(self, descriptor: Descriptor):
+        self.full_name = descriptor.full_name
+        self.fields: List[_FieldPlan] = []
+        self.by_number: Dict[int, _FieldPlan] = {}
+        self.by_name: Dict[str, _FieldPlan] = {}
+        self.has_oneofs = False
+
+    def add_field(self, field_plan: _FieldPlan):
+        self.fields.append(field_plan)
+        self.fields.sort(key=lambda f: f.number)
+        self.by_number[field_plan.number] = field_plan
+        self.by_name[field_plan.descriptor.json_name] = field_plan
+        self.by_name[field_plan.name] = field_plan
+        if field_plan.oneof is not None:
+            self.has_oneofs = True
+
+    def _read_fields(self, buf: bytes, pos: int, end: int) -> Dict[int, Any]:
+        values: Dict[int, Any] = {}
+        by_number = self.by_number
+        while pos < end:
+            key, pos = _read_varint(buf, pos)
+            number = key >> 3
+            wire_type = key & 7
+            field = by_number.get(number)
+            if wire_type == _WIRE_VARINT:
+                raw, pos = _read_varint(buf, pos)
+            elif wire_type == _WIRE_LENGTH:
+                length, pos = _read_varint(buf, pos)
+                raw = buf[pos:pos + length]
+                pos += length
+            elif wire_type == _WIRE_FIXED32:
+                raw = _UINT32.unpack_from(buf, pos)[0]
+                pos += 4
+            elif wire_type == _WIRE_FIXED64:
+                raw = _UINT64.unpack_from(buf, pos)[0]
+                pos += 8
+            else:
+                raise DecodeError(f"Unsupported wire type {wire_type} in message {self.full_name}")
+
+            if field is None:
+                continue
+
+            if wire_type != field.wire_type:
+                if not (field.packable and wire_type == _WIRE_LENGTH):
+                    # a mismatching wire type is treated as an unknown field
+                    continue
+                items = values.setdefault(number, [])
+                self._read_packed(raw, field.wire_type, items)
+                continue
+
+            if field.repeated:
+                values.setdefault(number, []).append(raw)
+            elif field.wire_type == _WIRE_LENGTH and field.descriptor.type == _T.TYPE_MESSAGE and number in values:
+                # repeated occurrences of a singular message field are merged
+                values[number] = values[number] + raw
+            else:
+                values[number] = raw
+        if pos != end:
+            raise DecodeError(f"Truncated message {self.full_name}")
+        return values
+
+    @staticmethod
+    def _read_packed(buf: bytes, wire_type: int, items: List[Any]):
+        pos = 0
+        end = len(buf)
+        if wire_type == _WIRE_VARINT:
+            while pos < end:
+                raw, pos = _read_varint(buf, pos)
+                items.append(raw)
+        elif wire_type == _WIRE_FIXED32:
+            items.extend(v[0] for v in _UINT32.iter_unpack(buf))
+        else:
+            items.extend(v[0] for v in _UINT64.iter_unpack(buf))
+
+    def to_json(self, buf: bytes, pos: int, end: int) -> str:
+        values = self._read_fields(buf, pos, end)
+        if not values:
+            return "{}"
+        parts = []
+        for field in self.fields:
+            raw = values.get(field.number, _MISSING)
+            if raw is _MISSING:
+                continue
+            if field.is_map:
+                parts.append(field.json_key + self._map_to_json(field, raw))
+            elif field.repeated:
+                if not raw:
+                    continue
+                fmt = field.format_value
+                parts.append(field.json_key + "[" + ",".join([fmt(v) for v in raw]) + "]")
+            elif field.has_presence or raw:
+                parts.append(field.json_key + field.format_value(raw))
+        return "{" + ",".join(parts) + "}"
+
+    @staticmethod
+    def _map_to_json(field: _FieldPlan, entries: List[bytes]) -> str:
+        key_plan = field.map_key
+        value_plan = field.map_value
+        items = {}
+        for entry in entries:
+            entry_values = _read_map_entry(entry, key_plan, value_plan)
+            raw_key = entry_values.get(1, key_plan.default_raw())
+            raw_value = entry_values.get(2, _MISSING)
+            if key_plan.descriptor.type == _T.TYPE_STRING:
+                json_key = key_plan.format_value(raw_key)
+            elif key_plan.descriptor.type == _T.TYPE_BOOL:
+                json_key = '"true"' if raw_key else '"false"'
+            else:
+                json_key = key_plan.format_value(raw_key)
+                if not json_key.startswith('"'):
+                    json_key = '"' + json_key + '"'
+            if raw_value is _MISSING:
+                formatted = "{}" if value_plan.descriptor.type == _T.TYPE_MESSAGE else \
+                    value_plan.format_value(value_plan.default_raw())
+            else:
+                formatted = value_plan.format_value(raw_value)
+            items[json_key] = formatted
+        return "{" + ",".join([k + ":" + v for k, v in items.items()]) + "}"
+
+    def from_json(self, js: Any) -> bytes:
+        if not isinstance(js, dict):
+            raise json_format.ParseError(
+                f"Message type {self.full_name} expects a JSON object, got {type(js).__name__}"
+            )
+        out = bytearray()
+        by_name = self.by_name
+        oneofs = {} if self.has_oneofs else None
+        for name, value in js.items():
+            field = by_name.get(name)
+            if field is None:
+                raise json_format.ParseError(f'Message type "{self.full_name}" has no field named "{name}"')
+            if value is None:
+                continue
+            if oneofs is not None and field.oneof is not None:
+                if field.oneof in oneofs:
+                    raise json_format.ParseError(
+                        f'Message type "{self.full_name}" should not have multiple "{field.oneof}" oneof fields'
+                    )
+                oneofs[field.oneof] = field.number
+            if field.is_map:
+                self._map_from_json(field, value, out)
+            elif field.repeated:
+                self._repeated_from_json(field, value, out)
+            else:
+                data = field.encode_value(value)
+                if field.has_presence or data not in _DEFAULT_ENCODINGS:
+                    out += field.tag
+                    out += data
+        return bytes(out)
+
+    @staticmethod
+    def _repeated_from_json(field: _FieldPlan, value: Any, out: bytearray):
+        if not isinstance(value, list):
+            raise json_format.ParseError(f"repeated field {field.name} must be in [] which is {value}")
+        if not value:
+            return
+        encode = field.encode_value
+        if None in value:
+            raise json_format.ParseError(
+                f"null is not allowed to be used as an element in repeated field {field.name}"
+            )
+        if field.packed:
+            data = b"".join([encode(v) for v in value])
+            out += field.tag
+            _write_varint(out, len(data))
+            out += data
+        else:
+            tag = field.tag
+            for v in value:
+                out += tag
+                out += encode(v)
+
+    @staticmethod
+    def _map_from_json(field: _FieldPlan, value: Any, out: bytearray):
+        if not isinstance(value, dict):
+            raise json_format.ParseError(f"Map field {field.name} must be in a dict which is {value}")
+        key_plan = field.map_key
+        value_plan = field.map_value
+        for key, item in value.items():
+            if item is None:
+                raise json_format.ParseError(f"Map field {field.name} does not allow null values")
+            entry = (
+                key_plan.tag + key_plan.encode_value(_encode_map_key(key, key_plan.descriptor))
+                + value_plan.tag + value_plan.encode_value(item)
+            )
+            out += field.tag
+            _write_varint(out, len(entry))
+            out += entry
+
+
+def _read_map_entry(entry: bytes, key_plan: _FieldPlan, value_plan: _FieldPlan) -> Dict[int, Any]:
+    values = {}
+    pos = 0
+    end = len(entry)
+    while pos < end:
+        key, pos = _read_varint(entry, pos)
+        number = key >> 3
+        wire_type = key & 7
+        plan = key_plan if number == 1 else value_plan if number == 2 else None
+        if plan is None or wire_type != plan.wire_type:
+            pos = _skip_field(entry, pos, wire_type)
+            continue
+        if wire_type == _WIRE_VARINT:
+            values[number], pos = _read_varint(entry, pos)
+        elif wire_type == _WIRE_LENGTH:
+            length, pos = _read_varint(entry, pos)
+            values[number] = entry[pos:pos + length]
+            pos += length
+        elif wire_type == _WIRE_FIXED32:
+            values[number] = _UINT32.unpack_from(entry, pos)[0]
+            pos += 4
+        else:
+            values[number] = _UINT64.unpack_from(entry, pos)[0]
+            pos += 8
+    return values
+
+
+def _needs_json_format(descriptor: Descriptor, visited: set) -> bool:
+    """
+    Well known types have a special JSON mapping and groups have no length prefix,
+    messages using any of them are transcoded with json_format.
+    """
+    if descriptor.full_name in visited:
+        return False
+    visited.add(descriptor.full_name)
+    if descriptor.full_name.startswith(_WELL_KNOWN_TYPES_PREFIX):
+        return True
+    for field in descriptor.fields:
+        if field.type == _T.TYPE_GROUP:
+            return True
+        if field.type == _T.TYPE_MESSAGE and _needs_json_format(field.message_type, visited):
+            return True
+    return False
+
+
+def _compile_plans(descriptor: Descriptor) -> Dict[str, _MessagePlan]:
+    plans: Dict[str, _MessagePlan] = {}
+    pending = [descriptor]
+    field_plans = []
+    while pending:
+        desc = pending.pop()
+        if desc.full_name in plans:
+            continue
+        plan = _MessagePlan(desc)
+        plans[desc.full_name] = plan
+        for field in desc.fields:
+            field_plan = _FieldPlan(field)
+            plan.add_field(field_plan)
+            field_plans.append(field_plan)
+            if field.type == _T.TYPE_MESSAGE:
+                pending.append(field.message_type)
+    # formatters and encoders refer to the plans of nested messages, so they are resolved last
+    for field_plan in field_plans:
+        field_plan.compile(plans)
+    return plans
+
+
+class ProtoJsonTranscoder:
+    """
+    Converts between protobuf wire format and compact UTF-8 JSON for a single message type.
+
+    The field layout of the message is compiled once, converting a message does not
+    build a protobuf Message object.
+    Calling the transcoder returns a new instance of the generated message class.
+    """
+
+    __slots__ = ("message_class", "descriptor", "_plan")
+
+    def __init__(self, message_class: Any):
+        self.message_class = message_class
+        self.descriptor = message_class.DESCRIPTOR
+        self._plan: Optional[_MessagePlan] = None
+        if not _needs_json_format(self.descriptor, set()):
+            self._plan = _compile_plans(self.descriptor)[self.descriptor.full_name]
+
+    def __call__(self, *args, **kwargs) -> Any:
+        return self.message_class(*args, **kwargs)
+
+    def to_json(self, data: bytes) -> bytes:
+        """
+        Converts a serialized protobuf message into compact UTF-8 JSON.
+        """
+        if self._plan is None:
+            msg = self.message_class()
+            msg.ParseFromString(data)
+            return json.dumps(
+                json_format.MessageToDict(msg), separators=(",", ":"), ensure_ascii=False
+            ).encode("utf-8")
+        data = bytes(data)
+        try:
+            return self._plan.to_json(data, 0, len(data)).encode("utf-8")
+        except (IndexError, struct.error) as e:
+            raise DecodeError(f"Truncated message {self.descriptor.full_name}") from e
+
+    def from_json(self, js: Union[dict, str, bytes]) -> bytes:
+        """
+        Converts JSON, either already parsed or as text, into a serialized protobuf message.
+        """
+        if isinstance(js, (str, bytes, bytearray)):
+            js = json.loads(js)
+        if self._plan is None:
+            msg = self.message_class()
+            json_format.ParseDict(js, msg)
+            return msg.SerializeToString()
+        return self._plan.from_json(js)
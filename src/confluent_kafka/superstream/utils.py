@@ -2,12 +2,14 @@ import asyncio
 import base64
 import json
 import threading
-from typing import Any, Coroutine, Dict, Optional, Union
+from typing import Any, Coroutine, Dict, List, Optional, Tuple, Union
 
-from google.protobuf import descriptor_pb2, descriptor_pool, json_format
+from google.protobuf import descriptor_pb2, descriptor_pool
 from google.protobuf.message_factory import GetMessageClass
 from pydantic import BaseModel
 
+from confluent_kafka.superstream.transcoder import ProtoJsonTranscoder
+
 
 def _name(obj):
     """
@@ -20,41 +22,74 @@ def _name(obj):
     return obj.__class__.__name__
 
 
-def _try_convert_to_json(input) -> Optional[str]:
+_JSON_WHITESPACE_STR = frozenset(" \t\n\r")
+_JSON_WHITESPACE_BYTES = frozenset(b" \t\n\r")
+_JSON_OBJECT_START_BYTE = ord("{")
+
+
+def _is_json_object_candidate(input) -> bool:
     """
-    Tries to convert the input to a JSON string.
+    Cheap check of whether the input may be a JSON object, without parsing it.
+    Only dicts and str/bytes payloads whose first non whitespace character is '{' qualify.
+    :param input: The produced value.
+    :return: False if the input can not be a JSON object.
+    """
+    if isinstance(input, dict):
+        return True
+    if isinstance(input, bytes):
+        for c in input:
+            if c not in _JSON_WHITESPACE_BYTES:
+                return c == _JSON_OBJECT_START_BYTE
+        return False
+    if isinstance(input, str):
+        for c in input:
+            if c not in _JSON_WHITESPACE_STR:
+                return c == "{"
+        return False
+    return False
+
+
+def _try_convert_to_json(input) -> Optional[Tuple[Optional[bytes], Any]]:
+    """
+    Tries to convert the input to JSON, parsing it at most once.
     :param input: The input to convert to JSON.
-    :return: The JSON string or None if the input cannot be converted to JSON.
+    :return: A (JSON bytes, JSON object) tuple or None if the input cannot be converted to JSON.
+             The JSON bytes of a dict are left as None, use _json_bytes to get them when they are needed.
     """
     try:
         if isinstance(input, str):
-            json.loads(input)
-            return input
-        return json.dumps(input)
+            return input.encode("utf-8"), json.loads(input)
+        if isinstance(input, bytes):
+            return input, json.loads(input)
+        if isinstance(input, dict):
+            return None, input
+        return json.dumps(input).encode("utf-8"), input
     except Exception:
         return None
 
 
-def json_to_proto(json_dict: Union[dict, str], desc) -> bytes:
-    msg_desc = desc()
-    if isinstance(json_dict, dict):
-        json_format.ParseDict(json_dict, msg_desc)
-    else:
-        json_format.Parse(json_dict, msg_desc)
-    return msg_desc.SerializeToString()
+def _json_bytes(json_bytes: Optional[bytes], json_obj: Any) -> bytes:
+    """
+    Returns the JSON bytes of a payload converted by _try_convert_to_json, serializing the object if needed.
+    """
+    if json_bytes is not None:
+        return json_bytes
+    return json.dumps(json_obj).encode("utf-8")
+
+
+def json_to_proto(json_dict: Union[dict, str, bytes], desc: ProtoJsonTranscoder) -> bytes:
+    return desc.from_json(json_dict)
 
 
-def proto_to_json(proto: bytes, desc) -> str:
-    msg_desc: Any = desc()
-    msg_desc.ParseFromString(proto)
-    return json_format.MessageToJson(msg_desc)
+def proto_to_json(proto: bytes, desc: ProtoJsonTranscoder) -> bytes:
+    return desc.to_json(proto)
 
 
 def compile_descriptor(
     descriptor: Union[str, bytes],
     msg_struct_name: str,
     file_name: str,
-) -> Any:
+) -> ProtoJsonTranscoder:
     descriptor = base64.b64decode(descriptor)
     desc_set = descriptor_pb2.FileDescriptorSet()
     desc_set.ParseFromString(descriptor)
@@ -67,7 +102,7 @@ def compile_descriptor(
     msg_name = msg_struct_name
     if pkg_name != "":
         msg_name = file_desc.package + "." + msg_struct_name
-    return GetMessageClass(pool.FindMessageTypeByName(msg_name))
+    return ProtoJsonTranscoder(GetMessageClass(pool.FindMessageTypeByName(msg_name)))
 
 
 def convert_escaped_json_string(escaped_json_string):
@@ -82,6 +117,54 @@ def convert_map(topic_partitions):
     return result
 
 
+class PartitionBitset:
+    """
+    Set of partition ids backed by a bitmap that grows with the highest partition id.
+    Membership checks are lock free, add() is expected to be called with a lock held.
+    """
+
+    __slots__ = ("_bits",)
+
+    def __init__(self, size: int = 64):
+        self._bits = bytearray((size + 7) >> 3)
+
+    def __contains__(self, partition: int) -> bool:
+        bits = self._bits
+        index = partition >> 3
+        return 0 <= index < len(bits) and bits[index] & (1 << (partition & 7)) != 0
+
+    def add(self, partition: int) -> bool:
+        """
+        Adds a partition to the set.
+        :return: True if the partition was not in the set yet.
+        """
+        if partition in self:
+            return False
+        index = partition >> 3
+        bits = self._bits
+        if index >= len(bits):
+            # readers keep using the old bitmap until the grown copy is swapped in
+            bits = bits + bytearray(max(index + 1, 2 * len(bits)) - len(bits))
+        bits[index] |= 1 << (partition & 7)
+        self._bits = bits
+        return True
+
+    def to_list(self) -> List[int]:
+        return [
+            (index << 3) + bit
+            for index, byte in enumerate(self._bits)
+            if byte
+            for bit in range(8)
+            if byte & (1 << bit)
+        ]
+
+    def __iter__(self):
+        return iter(self.to_list())
+
+    def __len__(self) -> int:
+        return sum(bin(byte).count("1") for byte in self._bits)
+
+
 def properties_to_map(properties):
     return {str(key): value for key, value in properties.items()}
 
@@ -95,22 +178,16 @@ class SerializationUtil:
     @staticmethod
     def json_to_proto(json_dict: Union[dict, str], desc) -> JsonToProtoResult:
         try:
-            msg_desc = desc()
-            if isinstance(json_dict, dict):
-                json_format.ParseDict(json_dict, msg_desc)
-            else:
-                json_format.Parse(json_dict, msg_desc)
             return JsonToProtoResult(
-                success=True, message_bytes=msg_desc.SerializeToString()
+                success=True, message_bytes=json_to_proto(json_dict, desc)
             )
         except Exception:
             return JsonToProtoResult(success=False, message_bytes=None)
 
     @staticmethod
     def proto_to_json(proto: bytes, desc) -> str:
-        msg_desc: Any = desc()
-        msg_desc.ParseFromString(proto)
-        return json_format.MessageToJson(msg_desc)
+        # proto_to_json returns UTF-8 bytes, this helper keeps returning str
+        return proto_to_json(proto, desc).decode("utf-8")
 
     @staticmethod
     def is_json_object(json_string):
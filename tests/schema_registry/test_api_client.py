@@ -15,12 +15,14 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
+import time
+
 import pytest
 
 from concurrent.futures import ThreadPoolExecutor, wait
 
 from confluent_kafka.schema_registry.error import SchemaRegistryError
-from confluent_kafka.schema_registry.schema_registry_client import Schema
+from confluent_kafka.schema_registry.schema_registry_client import Schema, _LRUCache
 
 """
     Basic SchemaRegistryClient API functionality tests.
@@ -115,9 +117,8 @@ def test_register_schema_cache(mock_schema_registry, load_avsc):
     count_before = sr.counter['POST'].get(
         '/subjects/test-cache/versions', 0)
 
-    # Caching only starts after the first response is handled.
-    # A possible improvement would be to add request caching to the http client
-    # to catch in-flight requests as well.
+    # Caching only starts after the first response is handled,
+    # in-flight requests are covered by the single_flight tests.
     sr.register_schema('test-cache', Schema(schema, 'AVRO'))
 
     fs = []
@@ -160,9 +161,8 @@ def test_get_schema_cache(mock_schema_registry):
     count_before = mock_schema_registry.counter['GET'].get(
         '/schemas/ids/47', 0)
 
-    # Caching only starts after the first response is handled.
-    # A possible improvement would be to add request caching to the http client
-    # to catch in-flight requests as well.
+    # Caching only starts after the first response is handled,
+    # in-flight requests are covered by the single_flight tests.
     sr.get_schema(47)
 
     fs = []
@@ -177,6 +177,78 @@ def test_get_schema_cache(mock_schema_registry):
     assert count_after - count_before == 1
 
 
+def _delay_requests(sr, delay=0.1):
+    """
+    Slows down sr's requests so concurrent calls overlap.
+    """
+    send_request = sr._rest_client.send_request
+
+    def delayed_send_request(*args, **kwargs):
+        time.sleep(delay)
+        return send_request(*args, **kwargs)
+
+    sr._rest_client.send_request = delayed_send_request
+
+
+def test_get_schema_single_flight(mock_schema_registry):
+    conf = {'url': TEST_URL}
+    sr = mock_schema_registry(conf)
+    _delay_requests(sr)
+
+    count_before = mock_schema_registry.counter['GET'].get(
+        '/schemas/ids/48', 0)
+
+    with ThreadPoolExecutor(max_workers=10) as executor:
+        fs = [executor.submit(sr.get_schema, 48) for _ in range(0, 10)]
+    schemas = [f.result() for f in fs]
+
+    count_after = mock_schema_registry.counter['GET'].get(
+        '/schemas/ids/48')
+
+    assert count_after - count_before == 1
+    assert all(schema is schemas[0] for schema in schemas)
+
+
+def test_get_schema_not_found_single_flight(mock_schema_registry):
+    conf = {'url': TEST_URL,
+            'cache.negative.ttl.sec': 0}
+    sr = mock_schema_registry(conf)
+    _delay_requests(sr)
+
+    count_before = mock_schema_registry.counter['GET'].get(
+        '/schemas/ids/404', 0)
+
+    with ThreadPoolExecutor(max_workers=10) as executor:
+        fs = [executor.submit(sr.get_schema, 404) for _ in range(0, 10)]
+    wait(fs)
+
+    count_after = mock_schema_registry.counter['GET'].get(
+        '/schemas/ids/404')
+
+    assert count_after - count_before == 1
+    for f in fs:
+        assert f.exception().http_status_code == 404
+
+
+def test_register_schema_single_flight(mock_schema_registry, load_avsc):
+    conf = {'url': TEST_URL}
+    sr = mock_schema_registry(conf)
+    _delay_requests(sr)
+    schema = Schema(load_avsc('basic_schema.avsc'), 'AVRO')
+
+    count_before = sr.counter['POST'].get(
+        '/subjects/test-single-flight/versions', 0)
+
+    with ThreadPoolExecutor(max_workers=10) as executor:
+        fs = [executor.submit(sr.register_schema, 'test-single-flight', schema) for _ in range(0, 10)]
+
+    count_after = sr.counter['POST'].get(
+        '/subjects/test-single-flight/versions')
+
+    assert count_after - count_before == 1
+    assert all(f.result() == mock_schema_registry.SCHEMA_ID for f in fs)
+
+
 def test_get_registration(mock_schema_registry, load_avsc):
     conf = {'url': TEST_URL}
     sr = mock_schema_registry(conf)
@@ -365,6 +437,186 @@ def test_get_compatibility_subject_not_found(mock_schema_registry):
     assert e.value.error_code == 40401
 
 
+def test_get_latest_version_cache(mock_schema_registry, load_avsc):
+    conf = {'url': TEST_URL}
+    sr = mock_schema_registry(conf)
+
+    subject = 'test-latest-cache'
+    count_before = sr.counter['GET'].get(
+        '/subjects/{}/versions/latest'.format(subject), 0)
+
+    for _ in range(0, 10):
+        sr.get_latest_version(subject)
+        sr.get_version(subject, 'latest')
+
+    count_after = sr.counter['GET'].get(
+        '/subjects/{}/versions/latest'.format(subject))
+
+    assert count_after - count_before == 1
+
+    # Registering a new schema invalidates the latest version.
+    sr.register_schema(subject, Schema(load_avsc('basic_schema.avsc'), 'AVRO'))
+    sr.get_latest_version(subject)
+
+    count_after = sr.counter['GET'].get(
+        '/subjects/{}/versions/latest'.format(subject))
+
+    assert count_after - count_before == 2
+
+
+def test_get_latest_version_cache_expired(mock_schema_registry):
+    conf = {'url': TEST_URL,
+            'cache.latest.ttl.sec': 0}
+    sr = mock_schema_registry(conf)
+
+    subject = 'test-latest-cache-expired'
+    count_before = sr.counter['GET'].get(
+        '/subjects/{}/versions/latest'.format(subject), 0)
+
+    sr.get_latest_version(subject)
+    sr.get_latest_version(subject)
+
+    count_after = sr.counter['GET'].get(
+        '/subjects/{}/versions/latest'.format(subject))
+
+    assert count_after - count_before == 2
+
+
+def test_get_version_cache_invalidated_on_delete(mock_schema_registry):
+    conf = {'url': TEST_URL}
+    sr = mock_schema_registry(conf)
+
+    subject = 'test-version-cache'
+    count_before = sr.counter['GET'].get(
+        '/subjects/{}/versions/1'.format(subject), 0)
+
+    sr.get_version(subject, 1)
+    sr.get_version(subject, 1)
+    sr.delete_version(subject, 1)
+    sr.get_version(subject, 1)
+
+    count_after = sr.counter['GET'].get(
+        '/subjects/{}/versions/1'.format(subject))
+
+    assert count_after - count_before == 2
+
+
+def test_get_schema_not_found_cache(mock_schema_registry):
+    conf = {'url': TEST_URL}
+    sr = mock_schema_registry(conf)
+
+    count_before = sr.counter['GET'].get('/schemas/ids/404', 0)
+
+    for _ in range(0, 3):
+        with pytest.raises(SchemaRegistryError, match="Schema not found") as e:
+            sr.get_schema(404)
+        assert e.value.http_status_code == 404
+        assert e.value.error_code == 40403
+
+    count_after = sr.counter['GET'].get('/schemas/ids/404')
+
+    assert count_after - count_before == 1
+
+
+def test_persistent_cache(mock_schema_registry, tmp_path):
+    conf = {'url': TEST_URL,
+            'cache.persistent.path': str(tmp_path / 'schemas.db')}
+    subject = 'test-persistent-cache'
+
+    with mock_schema_registry(conf) as sr:
+        schema = sr.get_schema(48)
+        registered_schema = sr.get_version(subject, 1)
+
+    count_before = (sr.counter['GET'].get('/schemas/ids/48'),
+                    sr.counter['GET'].get('/subjects/{}/versions/1'.format(subject)))
+
+    # a new client is warmed up from the file
+    with mock_schema_registry(conf) as sr:
+        assert sr.get_schema(48) == schema
+        result = sr.get_version(subject, 1)
+        sr.get_version(subject, 'latest')
+
+    count_after = (sr.counter['GET'].get('/schemas/ids/48'),
+                   sr.counter['GET'].get('/subjects/{}/versions/1'.format(subject)))
+
+    assert count_after == count_before
+    assert result.schema_id == registered_schema.schema_id
+    assert result.schema == registered_schema.schema
+    assert sr.counter['GET'].get('/subjects/{}/versions/latest'.format(subject)) is not None
+
+
+def test_persistent_cache_invalidated_on_delete(mock_schema_registry, tmp_path):
+    conf = {'url': TEST_URL,
+            'cache.persistent.path': str(tmp_path / 'schemas.db')}
+    subject = 'test-persistent-cache-delete'
+
+    with mock_schema_registry(conf) as sr:
+        sr.get_version(subject, 1)
+        sr.delete_version(subject, 1)
+
+    count_before = sr.counter['GET'].get('/subjects/{}/versions/1'.format(subject))
+
+    with mock_schema_registry(conf) as sr:
+        sr.get_version(subject, 1)
+
+    count_after = sr.counter['GET'].get('/subjects/{}/versions/1'.format(subject))
+
+    assert count_after - count_before == 1
+
+
+def test_persistent_cache_unavailable(mock_schema_registry, tmp_path):
+    # the store is disabled, requests still succeed
+    conf = {'url': TEST_URL,
+            'cache.persistent.path': str(tmp_path / 'missing' / 'schemas.db')}
+    sr = mock_schema_registry(conf)
+
+    assert sr.get_schema(47) is not None
+
+
+def test_warm_up(mock_schema_registry):
+    conf = {'url': TEST_URL}
+    sr = mock_schema_registry(conf)
+    subject = 'test-warm-up'
+
+    latest, schemas = sr.warm_up(subjects=[subject], schema_ids=[49, 50])
+
+    assert latest[subject].subject == subject
+    assert latest[subject].schema_id == mock_schema_registry.SCHEMA_ID
+    assert sorted(schemas) == [49, 50]
+
+    count_before = dict(sr.counter['GET'])
+
+    assert sr.get_schema(49) is schemas[49]
+    assert sr.get_latest_version(subject) is latest[subject]
+    # the latest version's schema is cached by id as well
+    assert sr.get_schema(mock_schema_registry.SCHEMA_ID) == latest[subject].schema
+
+    assert dict(sr.counter['GET']) == count_before
+
+
+def test_warm_up_not_found(mock_schema_registry):
+    conf = {'url': TEST_URL}
+    sr = mock_schema_registry(conf)
+
+    with pytest.raises(SchemaRegistryError, match="Schema not found"):
+        sr.warm_up(schema_ids=[51, 404])
+
+
+def test_schema_cache_eviction():
+    cache = _LRUCache(2)
+    cache.set(1, 'a')
+    cache.set(2, 'b')
+    assert cache.get(1) == 'a'
+
+    # 2 is now the least recently used entry
+    cache.set(3, 'c')
+
+    assert len(cache) == 2
+    assert cache.get(2) is None
+    assert cache.get(1) == 'a'
+    assert cache.get(3) == 'c'
+
+
 def test_schema_equivilence(load_avsc):
     schema_str1 = load_avsc('basic_schema.avsc')
     schema_str2 = load_avsc('basic_schema.avsc')
@@ -0,0 +1,303 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2020 Confluent Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import asyncio
+import json
+import re
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from confluent_kafka.schema_registry import Schema
+from confluent_kafka.schema_registry.async_schema_registry_client import AsyncSchemaRegistryClient
+from confluent_kafka.schema_registry.avro import AsyncAvroDeserializer, AsyncAvroSerializer
+from confluent_kafka.schema_registry.error import SchemaRegistryError
+from confluent_kafka.schema_registry.json_schema import AsyncJSONDeserializer, AsyncJSONSerializer
+from confluent_kafka.schema_registry.protobuf import AsyncProtobufSerializer
+from confluent_kafka.serialization import MessageField, SerializationContext, SerializationError
+from tests.integration.schema_registry.data.proto import DependencyTestProto_pb2
+
+"""
+    AsyncSchemaRegistryClient and async serializer tests.
+
+    These tests run against a local stub Schema Registry HTTP server which
+    answers every subject with schema id 1, version 1 of AVRO_SCHEMA.
+"""
+
+AVRO_SCHEMA = json.dumps({"type": "record", "name": "User",
+                          "fields": [{"name": "name", "type": "string"}]})
+JSON_SCHEMA = json.dumps({"title": "User", "type": "object",
+                          "properties": {"name": {"type": "string"}}})
+
+
+class _StubSchemaRegistryHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    schemas = re.compile("/schemas/ids/([0-9]*)$")
+    subject_versions = re.compile("/subjects/([^/]*)/versions/?([^?]*)")
+    subjects = re.compile("/subjects/([^/?]*)")
+
+    def log_message(self, *args):
+        pass
+
+    def _respond(self, status, body):
+        content = json.dumps(body).encode('utf8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def _handle(self, method):
+        server = self.server
+        with server.lock:
+            server.counter[method][self.path] += 1
+        time.sleep(server.delay)
+
+        if method == 'POST':
+            self.rfile.read(int(self.headers['Content-Length']))
+
+        match = self.schemas.match(self.path)
+        if match:
+            if match.group(1) == '404':
+                return self._respond(404, {'error_code': 40403, 'message': "Schema not found"})
+            return self._respond(200, {'schema': AVRO_SCHEMA})
+
+        match = self.subject_versions.match(self.path)
+        if match and method == 'POST':
+            return self._respond(200, {'id': 1})
+        if match:
+            if match.group(1) == 'notfound':
+                return self._respond(404, {'error_code': 40401, 'message': "Subject not found"})
+            if not match.group(2):
+                return self._respond(200, [1])
+            return self._respond(200, {'subject': match.group(1), 'id': 1, 'version': 1,
+                                       'schema': AVRO_SCHEMA})
+
+        match = self.subjects.match(self.path)
+        if match and method == 'POST':
+            return self._respond(200, {'subject': match.group(1), 'id': 1, 'version': 1,
+                                       'schema': AVRO_SCHEMA})
+
+        return self._respond(404, {'error_code': 404, 'message': "Unknown path"})
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+
+@pytest.fixture(scope="module")
+def stub_schema_registry():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _StubSchemaRegistryHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.counter = {'GET': defaultdict(int), 'POST': defaultdict(int)}
+    server.delay = 0.05
+    server.url = 'http://127.0.0.1:{}'.format(server.server_address[1])
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_get_schema(stub_schema_registry):
+    async def run():
+        async with AsyncSchemaRegistryClient({'url': stub_schema_registry.url}) as sr:
+            return await sr.get_schema(1)
+
+    schema = asyncio.run(run())
+
+    assert schema.schema_str == AVRO_SCHEMA
+    assert schema.schema_type == 'AVRO'
+
+
+def test_get_schema_not_found(stub_schema_registry):
+    async def run():
+        async with AsyncSchemaRegistryClient({'url': stub_schema_registry.url}) as sr:
+            await sr.get_schema(404)
+
+    with pytest.raises(SchemaRegistryError, match="Schema not found") as e:
+        asyncio.run(run())
+    assert e.value.http_status_code == 404
+    assert e.value.error_code == 40403
+
+
+def test_get_schema_single_flight(stub_schema_registry):
+    count_before = stub_schema_registry.counter['GET']['/schemas/ids/2']
+
+    async def run():
+        async with AsyncSchemaRegistryClient({'url': stub_schema_registry.url}) as sr:
+            schemas = await asyncio.gather(*[sr.get_schema(2) for _ in range(0, 10)])
+            schemas.append(await sr.get_schema(2))
+            return schemas
+
+    schemas = asyncio.run(run())
+
+    assert stub_schema_registry.counter['GET']['/schemas/ids/2'] - count_before == 1
+    assert all(schema is schemas[0] for schema in schemas)
+
+
+def test_register_and_lookup_schema(stub_schema_registry):
+    schema = Schema(AVRO_SCHEMA, 'AVRO')
+
+    async def run():
+        async with AsyncSchemaRegistryClient({'url': stub_schema_registry.url}) as sr:
+            schema_ids = await asyncio.gather(*[sr.register_schema('async-register', schema) for _ in range(0, 10)])
+            registered_schema = await sr.lookup_schema('async-register', schema)
+            latest = await sr.get_latest_version('async-register')
+            versions = await sr.get_versions('async-register')
+            return schema_ids, registered_schema, latest, versions
+
+    schema_ids, registered_schema, latest, versions = asyncio.run(run())
+
+    assert schema_ids == [1] * 10
+    assert stub_schema_registry.counter['POST']['/subjects/async-register/versions?normalize=False'] == 1
+    assert registered_schema.schema_id == 1
+    assert registered_schema.subject == 'async-register'
+    assert latest.version == 1
+    assert latest.schema == schema
+    assert versions == [1]
+
+
+def test_get_versions_copy(stub_schema_registry):
+    async def run():
+        async with AsyncSchemaRegistryClient({'url': stub_schema_registry.url}) as sr:
+            versions = await sr.get_versions('async-versions-copy')
+            versions.append(2)
+            return await sr.get_versions('async-versions-copy')
+
+    assert asyncio.run(run()) == [1]
+
+
+def test_get_version_subject_not_found(stub_schema_registry):
+    async def run():
+        async with AsyncSchemaRegistryClient({'url': stub_schema_registry.url}) as sr:
+            await sr.get_version('notfound', 1)
+
+    with pytest.raises(SchemaRegistryError, match="Subject not found") as e:
+        asyncio.run(run())
+    assert e.value.http_status_code == 404
+    assert e.value.error_code == 40401
+
+
+def test_warm_up(stub_schema_registry):
+    ctx = SerializationContext('async-warm-up', MessageField.VALUE)
+
+    async def run():
+        async with AsyncSchemaRegistryClient({'url': stub_schema_registry.url}) as sr:
+            serializer = AsyncAvroSerializer(sr, AVRO_SCHEMA)
+            deserializer = AsyncAvroDeserializer(sr)
+            await asyncio.gather(serializer.warm_up(['async-warm-up-value']),
+                                 deserializer.warm_up(subjects=['async-warm-up-value'], schema_ids=[3]))
+
+            count_before = sum(stub_schema_registry.counter['GET'].values(),
+                               sum(stub_schema_registry.counter['POST'].values()))
+            obj = await deserializer(await serializer({'name': 'alice'}, ctx), ctx)
+            count_after = sum(stub_schema_registry.counter['GET'].values(),
+                              sum(stub_schema_registry.counter['POST'].values()))
+            return obj, sorted(deserializer._writer_schemas), count_after - count_before
+
+    obj, schema_ids, requests = asyncio.run(run())
+
+    assert obj == {'name': 'alice'}
+    assert schema_ids == [1, 3]
+    assert requests == 0
+
+
+def test_avro_serialize_many(stub_schema_registry):
+    ctx = SerializationContext('async-avro-many', MessageField.VALUE)
+    objs = [{'name': 'alice'}, None, {'name': 'bob'}]
+
+    async def run():
+        async with AsyncSchemaRegistryClient({'url': stub_schema_registry.url}) as sr:
+            serializer = AsyncAvroSerializer(sr, AVRO_SCHEMA)
+            deserializer = AsyncAvroDeserializer(sr)
+            values = await serializer.serialize_many(objs, ctx)
+            return values, await deserializer.deserialize_many(values, ctx)
+
+    values, result = asyncio.run(run())
+
+    assert values == [b'\x00\x00\x00\x00\x01\x0aalice', None, b'\x00\x00\x00\x00\x01\x06bob']
+    assert result == objs
+
+
+def test_config_pool_invalid_type():
+    with pytest.raises(TypeError, match="pool.max.connections must be an instance of int,"
+                                        " not <(.*)>$"):
+        AsyncSchemaRegistryClient({'url': 'http://SchemaRegistry:65534',
+                                   'pool.max.connections': '10'})
+
+
+def test_avro_serializer_round_trip(stub_schema_registry):
+    ctx = SerializationContext('async-avro', MessageField.VALUE)
+
+    async def run():
+        async with AsyncSchemaRegistryClient({'url': stub_schema_registry.url}) as sr:
+            serializer = AsyncAvroSerializer(sr, AVRO_SCHEMA)
+            deserializer = AsyncAvroDeserializer(sr)
+            value = await serializer({'name': 'alice'}, ctx)
+            return value, await deserializer(value, ctx)
+
+    value, obj = asyncio.run(run())
+
+    assert value == b'\x00\x00\x00\x00\x01\x0aalice'
+    assert obj == {'name': 'alice'}
+
+
+def test_json_serializer_round_trip(stub_schema_registry):
+    ctx = SerializationContext('async-json', MessageField.VALUE)
+
+    async def run():
+        async with AsyncSchemaRegistryClient({'url': stub_schema_registry.url}) as sr:
+            serializer = AsyncJSONSerializer(JSON_SCHEMA, sr)
+            deserializer = AsyncJSONDeserializer(JSON_SCHEMA, schema_registry_client=sr)
+            value = await serializer({'name': 'alice'}, ctx)
+            obj = await deserializer(value, ctx)
+            with pytest.raises(SerializationError, match="1 is not of type 'string'"):
+                await serializer({'name': 1}, ctx)
+            return value, obj
+
+    value, obj = asyncio.run(run())
+
+    assert value == b'\x00\x00\x00\x00\x01{"name": "alice"}'
+    assert obj == {'name': 'alice'}
+
+
+def test_protobuf_serializer_round_trip(stub_schema_registry):
+    ctx = SerializationContext('async-protobuf', MessageField.VALUE)
+    conf = {'use.deprecated.format': False}
+    message = DependencyTestProto_pb2.DependencyMessage(is_active=True)
+
+    async def run():
+        async with AsyncSchemaRegistryClient({'url': stub_schema_registry.url}) as sr:
+            serializer = AsyncProtobufSerializer(DependencyTestProto_pb2.DependencyMessage, sr, conf)
+            return await serializer(message, ctx)
+
+    value = asyncio.run(run())
+
+    assert value[:6] == b'\x00\x00\x00\x00\x01\x00'
+    assert DependencyTestProto_pb2.DependencyMessage.FromString(value[6:]) == message
+    # the dependency was registered before the message schema
+    assert any(path.endswith('NestedTestProto.proto/versions?normalize=False')
+               for path in stub_schema_registry.counter['POST'])
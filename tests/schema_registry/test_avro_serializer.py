@@ -15,14 +15,22 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
+import json
+from unittest import mock
+
 import pytest
 
 from confluent_kafka.schema_registry import (record_subject_name_strategy,
+                                             RegisteredSchema,
+                                             Schema,
+                                             SchemaReference,
                                              SchemaRegistryClient,
                                              topic_record_subject_name_strategy)
+from confluent_kafka.schema_registry import avro
 from confluent_kafka.schema_registry.avro import AvroSerializer, AvroDeserializer
 from confluent_kafka.serialization import (MessageField,
-                                           SerializationContext)
+                                           SerializationContext,
+                                           SerializationError)
 
 # MockSchemaRegistryClient, see ./conftest.py for additional details.
 TEST_URL = 'http://SchemaRegistry:65534'
@@ -241,3 +249,131 @@ def test_avro_deserializer_invalid_schema_type():
     test_client = SchemaRegistryClient(conf)
     with pytest.raises(TypeError, match="You must pass either schema string or schema object"):
         AvroDeserializer(test_client, 1)
+
+
+def test_avro_serializer_warm_up(mock_schema_registry):
+    """
+    Ensures warm_up registers the schema ahead of the first message
+    """
+    conf = {'url': TEST_URL}
+    test_client = mock_schema_registry(conf)
+    topic = "test-warm-up-serializer"
+    subject = topic + '-key'
+
+    test_serializer = AvroSerializer(test_client, '"string"')
+    test_serializer.warm_up([subject])
+
+    register_path = '/subjects/{}/versions'.format(subject)
+    assert test_client.counter['POST'].get(register_path) == 1
+
+    test_serializer("test", SerializationContext(topic, MessageField.KEY))
+
+    assert test_client.counter['POST'].get(register_path) == 1
+
+
+def test_avro_deserializer_warm_up(mock_schema_registry):
+    """
+    Ensures warm_up parses writer schemas ahead of the first message
+    """
+    conf = {'url': TEST_URL}
+    test_client = mock_schema_registry(conf)
+
+    test_deserializer = AvroDeserializer(test_client)
+    test_deserializer.warm_up(subjects=['test-warm-up-deserializer-value'], schema_ids=[52])
+
+    assert sorted(test_deserializer._writer_schemas) == sorted([52, mock_schema_registry.SCHEMA_ID])
+
+
+def _referencing_registry(references):
+    """
+    Returns a Schema Registry client mock serving version 1 of the schemas
+    in references, a dict of subject -> Schema.
+    """
+    registry = mock.Mock()
+    registry.get_version.side_effect = lambda subject, version: RegisteredSchema(
+        schema_id=hash(subject), schema=references[subject], subject=subject, version=version)
+    return registry
+
+
+AWARD_PROPERTIES_SCHEMA = Schema(json.dumps({
+    "type": "record", "name": "AwardProperties", "namespace": "test",
+    "fields": [{"name": "year", "type": "int"}]}), 'AVRO')
+
+
+def test_avro_deserializer_reference_cache():
+    """
+    Ensures referenced schemas are parsed once per Schema Registry client
+    """
+    award_schema = Schema(json.dumps({
+        "type": "record", "name": "Award", "namespace": "test",
+        "fields": [{"name": "properties", "type": "test.AwardProperties"}]}), 'AVRO',
+        [SchemaReference("test.AwardProperties", "award-properties", 1)])
+    user_schema = Schema(json.dumps({
+        "type": "record", "name": "User", "namespace": "test",
+        "fields": [{"name": "award", "type": "test.Award"}]}), 'AVRO',
+        [SchemaReference("test.Award", "award", 1)])
+    test_client = _referencing_registry({'award-properties': AWARD_PROPERTIES_SCHEMA,
+                                         'award': award_schema})
+
+    with mock.patch.object(avro, 'parse_schema', wraps=avro.parse_schema) as parse_schema:
+        AvroDeserializer(test_client, user_schema)
+        # the referenced schemas and the reader schema
+        assert parse_schema.call_count == 3
+
+        test_deserializer = AvroDeserializer(test_client, user_schema)
+        assert parse_schema.call_count == 4
+
+    assert set(test_deserializer._named_schemas) == {'test.AwardProperties', 'test.Award', 'test.User'}
+
+
+def test_avro_deserializer_reference_to_preceding_reference():
+    """
+    Ensures a referenced schema may use names defined by a preceding reference
+    """
+    award_schema = Schema(json.dumps({
+        "type": "record", "name": "Award", "namespace": "test",
+        "fields": [{"name": "properties", "type": "test.AwardProperties"}]}), 'AVRO')
+    user_schema = Schema(json.dumps({
+        "type": "record", "name": "User", "namespace": "test",
+        "fields": [{"name": "award", "type": "test.Award"}]}), 'AVRO',
+        [SchemaReference("test.AwardProperties", "award-properties", 1),
+         SchemaReference("test.Award", "award", 1)])
+    test_client = _referencing_registry({'award-properties': AWARD_PROPERTIES_SCHEMA,
+                                         'award': award_schema})
+
+    test_deserializer = AvroDeserializer(test_client, user_schema)
+
+    assert set(test_deserializer._named_schemas) == {'test.AwardProperties', 'test.Award', 'test.User'}
+
+
+def test_avro_serialize_many(mock_schema_registry, load_avsc):
+    """
+    Ensures batches are serialized and deserialized like single records
+    """
+    conf = {'url': TEST_URL}
+    test_client = mock_schema_registry(conf)
+    topic = "test-serialize-many"
+    ctx = SerializationContext(topic, MessageField.VALUE)
+
+    test_serializer = AvroSerializer(test_client, load_avsc(mock_schema_registry.SCHEMA))
+    test_deserializer = AvroDeserializer(test_client)
+    objs = [{'number': 1, 'name': 'a'}, None, {'number': None, 'name': 'b'}]
+
+    values = test_serializer.serialize_many(objs, ctx)
+
+    assert values == [test_serializer(obj, ctx) for obj in objs]
+    assert test_client.counter['POST'].get('/subjects/{}-value/versions'.format(topic)) == 1
+    assert test_deserializer.deserialize_many(values, ctx) == objs
+    assert test_deserializer.deserialize_many([], ctx) == []
+
+
+def test_avro_deserialize_many_invalid_framing(mock_schema_registry):
+    """
+    Ensures unframed data is rejected
+    """
+    conf = {'url': TEST_URL}
+    test_deserializer = AvroDeserializer(mock_schema_registry(conf))
+    ctx = SerializationContext("test-deserialize-many", MessageField.VALUE)
+
+    with pytest.raises(SerializationError, match="Unexpected magic byte 1"):
+        test_deserializer.deserialize_many([b'\x01\x00\x00\x00\x2f\x02'], ctx)
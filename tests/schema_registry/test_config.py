@@ -134,3 +134,38 @@ def test_config_unknown_prop():
 
     with pytest.raises(ValueError, match=r"Unrecognized properties: (.*)"):
         SchemaRegistryClient(conf)
+
+
+def test_config_cache():
+    conf = {'url': TEST_URL,
+            'cache.capacity': 10,
+            'cache.latest.ttl.sec': None,
+            'cache.negative.ttl.sec': 0.5}
+    test_client = SchemaRegistryClient(conf)
+    assert test_client._cache.schema_id_index.capacity == 10
+    assert test_client._cache.latest_index.ttl is None
+    assert test_client._cache.negative_ttl == 0.5
+
+
+def test_config_cache_capacity_invalid_type():
+    conf = {'url': TEST_URL,
+            'cache.capacity': '10'}
+    with pytest.raises(TypeError, match="cache.capacity must be an instance of int,"
+                                        " not <(.*)>$"):
+        SchemaRegistryClient(conf)
+
+
+def test_config_cache_ttl_invalid_type():
+    conf = {'url': TEST_URL,
+            'cache.negative.ttl.sec': None}
+    with pytest.raises(TypeError, match="cache.negative.ttl.sec must be a number,"
+                                        " not <(.*)>$"):
+        SchemaRegistryClient(conf)
+
+
+def test_config_cache_persistent_path_invalid_type():
+    conf = {'url': TEST_URL,
+            'cache.persistent.path': 1}
+    with pytest.raises(TypeError, match="cache.persistent.path must be a str,"
+                                        " not <(.*)>$"):
+        SchemaRegistryClient(conf)
@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2024 Confluent Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import binascii
+from io import BytesIO
+
+import pytest
+
+from confluent_kafka.schema_registry import _framing
+from confluent_kafka.schema_registry.protobuf import ProtobufSerializer
+from confluent_kafka.serialization import SerializationError
+
+
+@pytest.mark.parametrize("msg_idx", [[0], [1], [127, 8, 9], [128], [9223372036854775807]])
+@pytest.mark.parametrize("zigzag", [True, False])
+def test_header_msg_index(msg_idx, zigzag):
+    buf = BytesIO()
+    ProtobufSerializer._encode_varints(buf, msg_idx, zigzag=zigzag)
+
+    header = _framing.header(47, msg_idx, zigzag=zigzag)
+
+    assert header == b'\x00\x00\x00\x00\x2f' + buf.getvalue()
+    for data in (header + b'payload', bytearray(header + b'payload'), memoryview(header + b'payload')):
+        assert _framing.read_schema_id(data) == 47
+        decoded_msg_idx, offset = _framing.read_msg_index(data, zigzag=zigzag)
+        assert decoded_msg_idx == msg_idx
+        assert bytes(_framing.payload(data, offset)) == b'payload'
+
+
+def test_payload_is_not_copied():
+    data = bytearray(_framing.header(1) + b'payload')
+
+    payload = _framing.payload(data)
+    data[-1:] = b'!'
+
+    assert binascii.b2a_hex(_framing.header(1)) == b'0000000001'
+    assert bytes(payload) == b'payloa!'
+
+
+@pytest.mark.parametrize("data, error", [
+    (b'\x00\x00\x00\x00\x01', "Expecting data framing of length 6 bytes or more"),
+    (b'\x01\x00\x00\x00\x01\x00', "Unexpected magic byte 1"),
+])
+def test_read_schema_id_invalid(data, error):
+    with pytest.raises(SerializationError, match=error):
+        _framing.read_schema_id(data)
+
+
+def test_read_msg_index_invalid():
+    with pytest.raises(EOFError, match="Unexpected EOF while reading index"):
+        _framing.read_msg_index(b'\x00\x00\x00\x00\x01\x80')
+    with pytest.raises(SerializationError, match="Invalid Protobuf msgidx array length"):
+        _framing.read_msg_index(b'\x00\x00\x00\x00\x01\x01', zigzag=True)
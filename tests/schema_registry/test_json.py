@@ -16,10 +16,13 @@
 # limitations under the License.
 #
 
+from unittest.mock import Mock
+
 import pytest
 
-from confluent_kafka.schema_registry import SchemaReference, Schema
+from confluent_kafka.schema_registry import RegisteredSchema, SchemaReference, Schema
 from confluent_kafka.schema_registry.json_schema import JSONDeserializer, JSONSerializer
+from confluent_kafka.serialization import MessageField, SerializationContext, SerializationError
 
 
 def test_json_deserializer_referenced_schema_no_schema_registry_client(load_avsc):
@@ -49,3 +52,67 @@ def test_json_serializer_invalid_schema_type():
     """
     with pytest.raises(TypeError, match="You must pass either str or Schema"):
         JSONSerializer(1, schema_registry_client=None)
+
+
+def test_json_serializer_validates_with_compiled_validator():
+    """
+    Ensures that the serializer compiles its validator once and keeps rejecting invalid records.
+    """
+    registry = Mock()
+    registry.register_schema.return_value = 1
+    schema_str = '{"title": "Record", "type": "object", "properties": {"id": {"type": "integer"}}}'
+    serializer = JSONSerializer(schema_str, registry)
+    ctx = SerializationContext("topic", MessageField.VALUE)
+
+    assert serializer({"id": 1}, ctx) == b'\x00\x00\x00\x00\x01{"id": 1}'
+    validator = serializer._validator
+    assert serializer({"id": 2}, ctx) == b'\x00\x00\x00\x00\x01{"id": 2}'
+    assert serializer._validator is validator
+
+    with pytest.raises(SerializationError, match="'a' is not of type 'integer'"):
+        serializer({"id": "a"}, ctx)
+
+
+def test_json_deserializer_resolves_references_once():
+    """
+    Ensures that the deserializer fetches referenced schemas once, not for every record.
+    """
+    referenced = '{"type": "object", "properties": {"name": {"type": "string"}}, "required": ["name"]}'
+    registry = Mock()
+    registry.get_version.return_value = RegisteredSchema(2, Schema(referenced, 'JSON'), "customer", 1)
+    schema = Schema('{"type": "object", "properties": {"customer": {"$ref": "customer.json"}}}', 'JSON',
+                    [SchemaReference("customer.json", "customer", 1)])
+    deserializer = JSONDeserializer(schema, schema_registry_client=registry)
+    ctx = SerializationContext("topic", MessageField.VALUE)
+
+    for name in ("a", "b", "c"):
+        data = b'\x00\x00\x00\x00\x01' + '{{"customer": {{"name": "{}"}}}}'.format(name).encode()
+        assert deserializer(data, ctx) == {"customer": {"name": name}}
+
+    with pytest.raises(SerializationError, match="'name' is a required property"):
+        deserializer(b'\x00\x00\x00\x00\x01{"customer": {}}', ctx)
+
+    registry.get_version.assert_called_once_with("customer", 1)
+
+
+def test_json_serialize_many():
+    """
+    Ensures batches are serialized and deserialized like single records, the subject being resolved once.
+    """
+    registry = Mock()
+    registry.register_schema.return_value = 1
+    schema_str = '{"title": "Record", "type": "object", "properties": {"id": {"type": "integer"}}}'
+    serializer = JSONSerializer(schema_str, registry)
+    deserializer = JSONDeserializer(schema_str)
+    ctx = SerializationContext("topic", MessageField.VALUE)
+
+    values = serializer.serialize_many([{"id": 1}, None, {"id": 2}], ctx)
+
+    assert values == [b'\x00\x00\x00\x00\x01{"id": 1}', None, b'\x00\x00\x00\x00\x01{"id": 2}']
+    registry.register_schema.assert_called_once()
+    assert deserializer.deserialize_many(values, ctx) == [{"id": 1}, None, {"id": 2}]
+
+    with pytest.raises(SerializationError, match="'a' is not of type 'integer'"):
+        serializer.serialize_many([{"id": 3}, {"id": "a"}], ctx)
+    with pytest.raises(SerializationError, match="Expecting data framing of length 6 bytes or more"):
+        deserializer.deserialize_many([values[0], b'{}'], ctx)
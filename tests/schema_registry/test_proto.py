@@ -15,16 +15,22 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
+import asyncio
 import binascii
 from io import BytesIO
+from unittest.mock import AsyncMock, Mock
 
 import pytest
 
-from confluent_kafka.schema_registry.protobuf import (ProtobufSerializer,
+from confluent_kafka.schema_registry import Schema, _framing
+from confluent_kafka.schema_registry.protobuf import (AsyncProtobufDeserializer,
+                                                      ProtobufSerializer,
                                                       ProtobufDeserializer,
-                                                      _create_index_array)
+                                                      _create_index_array,
+                                                      _schema_to_str)
 from tests.integration.schema_registry.data.proto import (DependencyTestProto_pb2,
                                                           metadata_proto_pb2)
+from confluent_kafka.serialization import MessageField, SerializationContext, SerializationError
 
 
 @pytest.mark.parametrize("pb2, coordinates", [
@@ -83,3 +89,114 @@ def test_index_encoder(msg_idx, zigzag, expected_hex):
     buf.seek(0)
     decoded_msg_idx = ProtobufDeserializer._read_index_array(buf, zigzag=zigzag)
     assert decoded_msg_idx == msg_idx
+
+
+def test_serializer_header_per_subject():
+    registry = Mock()
+    registry.get_latest_version.side_effect = \
+        lambda subject: Mock(schema_id={'topic1-value': 1, 'topic2-value': 2}[subject])
+    conf = {'auto.register.schemas': False, 'use.latest.version': True, 'use.deprecated.format': False}
+    serializer = ProtobufSerializer(metadata_proto_pb2.ControlMessage.Watermark, registry, conf)
+    message = metadata_proto_pb2.ControlMessage.Watermark(hostname='host')
+    ctx1 = SerializationContext('topic1', MessageField.VALUE)
+    ctx2 = SerializationContext('topic2', MessageField.VALUE)
+
+    values = [serializer(message, ctx1), serializer(message, ctx2), serializer(message, ctx1)]
+    values.extend(serializer.serialize_many([message, None], ctx2))
+
+    payload = message.SerializeToString()
+    # [15, 1] zigzag encoded with its length prefix
+    assert values == [b'\x00\x00\x00\x00\x01\x04\x1e\x02' + payload,
+                      b'\x00\x00\x00\x00\x02\x04\x1e\x02' + payload,
+                      b'\x00\x00\x00\x00\x01\x04\x1e\x02' + payload,
+                      b'\x00\x00\x00\x00\x02\x04\x1e\x02' + payload,
+                      None]
+    # the header is resolved once per subject
+    assert registry.get_latest_version.call_count == 2
+
+
+def _framed(schema_id, message):
+    return _framing.header(schema_id, _create_index_array(message.DESCRIPTOR)) + message.SerializeToString()
+
+
+def test_deserializer_message_types():
+    watermark = metadata_proto_pb2.ControlMessage.Watermark(hostname='host')
+    options = metadata_proto_pb2.HDFSOptions()
+    deserializer = ProtobufDeserializer([metadata_proto_pb2.ControlMessage.Watermark,
+                                         metadata_proto_pb2.HDFSOptions],
+                                        {'use.deprecated.format': False})
+
+    result = deserializer.deserialize_many([_framed(1, watermark), _framed(1, options),
+                                            _framed(1, metadata_proto_pb2.ControlMessage())], None)
+
+    assert result == [watermark, options, None]
+    assert type(result[1]) is metadata_proto_pb2.HDFSOptions
+
+
+def test_deserializer_message_types_ambiguous():
+    # both are the first message of their file
+    with pytest.raises(ValueError, match="schema_registry_client is required"):
+        ProtobufDeserializer([DependencyTestProto_pb2.DependencyMessage,
+                              metadata_proto_pb2.KafkaMessageOptions],
+                             {'use.deprecated.format': False})
+
+
+def test_deserializer_message_types_registry():
+    files = {1: DependencyTestProto_pb2.DESCRIPTOR, 2: metadata_proto_pb2.DESCRIPTOR}
+    registry = Mock()
+    registry.get_schema.side_effect = \
+        lambda schema_id, fmt: Schema(_schema_to_str(files[schema_id]), 'PROTOBUF')
+    deserializer = ProtobufDeserializer([DependencyTestProto_pb2.DependencyMessage],
+                                        {'use.deprecated.format': False}, registry)
+    dependency = DependencyTestProto_pb2.DependencyMessage(is_active=True)
+    options = metadata_proto_pb2.KafkaMessageOptions()
+
+    result = deserializer.deserialize_many([_framed(1, dependency), _framed(2, options),
+                                            _framed(1, dependency)], None)
+
+    assert result == [dependency, None, dependency]
+    assert registry.get_schema.call_count == 2
+    assert type(result[2]) is DependencyTestProto_pb2.DependencyMessage
+    registry.get_schema.assert_called_with(2, fmt='serialized')
+
+    with pytest.raises(SerializationError, match=r"Message index array \[3\] not found in schema 1"):
+        deserializer(_framing.header(1, [3]), None)
+
+
+def test_async_deserializer_message_types_registry():
+    files = {1: DependencyTestProto_pb2.DESCRIPTOR, 2: metadata_proto_pb2.DESCRIPTOR}
+    registry = Mock()
+    registry.get_schema = AsyncMock(
+        side_effect=lambda schema_id, fmt: Schema(_schema_to_str(files[schema_id]), 'PROTOBUF'))
+    deserializer = AsyncProtobufDeserializer([DependencyTestProto_pb2.DependencyMessage],
+                                             {'use.deprecated.format': False}, registry)
+    dependency = DependencyTestProto_pb2.DependencyMessage(is_active=True)
+    options = metadata_proto_pb2.KafkaMessageOptions()
+
+    async def run():
+        return (await deserializer.deserialize_many([_framed(1, dependency), None, _framed(2, options)], None),
+                await deserializer(_framed(1, dependency), None))
+
+    many, single = asyncio.run(run())
+
+    assert many == [dependency, None, None]
+    assert single == dependency
+    assert registry.get_schema.await_count == 2
+
+
+def test_deserializer_deserialize_many_framing():
+    watermark = metadata_proto_pb2.ControlMessage.Watermark(hostname='host')
+    options = metadata_proto_pb2.HDFSOptions()
+    deserializer = ProtobufDeserializer([metadata_proto_pb2.ControlMessage.Watermark,
+                                         metadata_proto_pb2.HDFSOptions],
+                                        {'use.deprecated.format': False})
+    datas = [_framed(1, watermark), _framed(1, watermark), None, _framed(1, options),
+             memoryview(_framed(2, watermark)), _framed(1, options)]
+
+    result = deserializer.deserialize_many(datas, None)
+
+    assert result == [watermark, watermark, None, options, watermark, options]
+    assert [type(msg) for msg in result] == [type(deserializer(data, None)) for data in datas]
+
+    with pytest.raises(SerializationError):
+        deserializer.deserialize_many([_framed(1, options), _framing.header(1, [15, 1]) + b'\xff'], None)
@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import asyncio
+import threading
+from unittest.mock import AsyncMock, Mock
+
+from confluent_kafka.superstream.constants import SuperstreamKeys, SuperstreamValues
+from confluent_kafka.superstream.consumer_interceptor import SuperstreamConsumerInterceptor
+from confluent_kafka.superstream.core import Superstream
+from confluent_kafka.superstream.transcoder import ProtoJsonTranscoder
+from confluent_kafka.superstream.types import SuperstreamClientType
+from tests.integration.schema_registry.data.proto import NestedTestProto_pb2
+
+
+def _superstream():
+    return Superstream("token", "localhost", 1, {}, True, SuperstreamClientType.CONSUMER)
+
+
+def _interceptor(superstream):
+    interceptor = SuperstreamConsumerInterceptor.__new__(SuperstreamConsumerInterceptor)
+    interceptor._superstream_config_ = {SuperstreamKeys.CONNECTION: superstream}
+    return interceptor
+
+
+def test_update_topic_partitions():
+    superstream = _superstream()
+
+    superstream.update_topic_partitions("topic", 3)
+    superstream.update_topic_partitions("topic", 3)
+    superstream.update_topic_partitions("topic", 70)
+    superstream.update_topic_partitions("topic", -1)
+
+    assert list(superstream.topic_partitions["topic"]) == [3, 70]
+    assert superstream.topic_partitions_generation == 2
+
+
+def test_initial_topic_partitions_update_retried():
+    """ the initial update is sent once the background loop runs, and again if publishing failed """
+    superstream = _superstream()
+    superstream.kafka_connection_id = 1
+    superstream._publish = AsyncMock(side_effect=[Exception("not connected"), None])
+
+    # no background loop yet
+    superstream.update_topic_partitions("topic", 3)
+    assert not superstream._initial_topic_partition_update_scheduled
+
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever)
+    thread.start()
+    superstream.event_loop = loop
+    try:
+        for _ in range(2):
+            # the partition is known already, the update is still retried
+            superstream.update_topic_partitions("topic", 3)
+            asyncio.run_coroutine_threadsafe(asyncio.sleep(0), loop).result(1)
+        assert superstream._publish.await_count == 2
+        assert superstream._initial_topic_partition_update_sent
+
+        superstream.update_topic_partitions("topic", 3)
+        assert superstream._publish.await_count == 2
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+
+def test_poll_partitionless_message():
+    """ topic level errors and events have no partition, poll() must pass them through """
+    superstream = _superstream()
+    superstream.update_topic_partitions("topic", 3)
+    interceptor = _interceptor(superstream)
+
+    message = Mock()
+    message.topic.return_value = "topic"
+    message.partition.return_value = None
+    message.value.return_value = None
+
+    assert interceptor.poll(message) is message
+    assert interceptor.consume([message]) == [message]
+    assert list(superstream.topic_partitions["topic"]) == [3]
+
+
+def test_enqueue_learning_message_bounded():
+    """ learning messages are queued without blocking, dropped once the queue is full """
+    superstream = _superstream()
+    superstream.learning_factor = 1000
+    superstream.learning_sample_rate = 1
+
+    queued = [superstream.enqueue_learning_message(b'{}')
+              for _ in range(SuperstreamValues.LEARNING_QUEUE_SIZE + 5)]
+
+    assert queued.count(True) == SuperstreamValues.LEARNING_QUEUE_SIZE
+    assert superstream.learning_messages_dropped == 5
+
+
+def _reduced_message(transcoder, value, schema_id=b'1'):
+    message = Mock()
+    message.topic.return_value = "topic"
+    message.partition.return_value = 0
+    message.value.return_value = transcoder.from_json(value)
+    message.headers.return_value = [("superstream_schema", schema_id)]
+    return message
+
+
+def test_poll_restores_reduced_value():
+    transcoder = ProtoJsonTranscoder(NestedTestProto_pb2.MessageId)
+    superstream = Mock(superstream_ready=True, consumer_proto_desc_map={'1': transcoder})
+    interceptor = _interceptor(superstream)
+    message = _reduced_message(transcoder, {'id': 'a'})
+
+    assert interceptor.poll(message) is message
+    message.set_value.assert_called_once_with(b'{"id":"a"}')
+
+
+def test_consume_restores_reduced_values():
+    """ the descriptors of a batch are fetched with a single request """
+    transcoder = ProtoJsonTranscoder(NestedTestProto_pb2.MessageId)
+    superstream = Mock(superstream_ready=True, consumer_proto_desc_map={'1': transcoder})
+
+    def fetch_schemas(missing):
+        superstream.consumer_proto_desc_map.update({schema_id: transcoder for schema_id in missing})
+
+    superstream.send_get_schema_requests.side_effect = fetch_schemas
+    interceptor = _interceptor(superstream)
+    plain = Mock(headers=Mock(return_value=None), value=Mock(return_value=b'plain'))
+    messages = [_reduced_message(transcoder, {'id': 'a'}), plain,
+                _reduced_message(transcoder, {'id': 'b'}, schema_id=b'2')]
+
+    assert interceptor.consume(messages) == messages
+    superstream.send_get_schema_requests.assert_called_once_with({'2'})
+    messages[0].set_value.assert_called_once_with(b'{"id":"a"}')
+    messages[2].set_value.assert_called_once_with(b'{"id":"b"}')
+    plain.set_value.assert_not_called()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from unittest.mock import Mock
+
+from confluent_kafka.superstream.constants import SuperstreamKeys, SuperstreamValues
+from confluent_kafka.superstream.producer_interceptor import SuperstreamProducerInterceptor
+
+
+def _interceptor(superstream=None):
+    interceptor = SuperstreamProducerInterceptor.__new__(SuperstreamProducerInterceptor)
+    interceptor._superstream_config_ = {SuperstreamKeys.CONNECTION: superstream}
+    interceptor._non_json_counts = {}
+    interceptor._delivery_report_adaptors = {}
+    return interceptor
+
+
+def test_try_convert_to_json_parses_once():
+    interceptor = _interceptor()
+
+    assert interceptor._try_convert_to_json('topic', b' {"a": 1}') == (b' {"a": 1}', {'a': 1})
+    assert interceptor._try_convert_to_json('topic', {'a': 1}) == (None, {'a': 1})
+    # not JSON objects
+    assert interceptor._try_convert_to_json('topic', b'[1]') is None
+    assert interceptor._try_convert_to_json('topic', b'{"a": ') is None
+    assert interceptor._try_convert_to_json('topic', None) is None
+
+
+def test_delivery_report_adaptor_cache():
+    superstream = Mock()
+    interceptor = _interceptor(superstream)
+    delivered = []
+
+    def on_delivery(err, msg):
+        delivered.append(msg)
+
+    adaptor = interceptor._get_delivery_report_adaptor(on_delivery)
+    assert interceptor._get_delivery_report_adaptor(on_delivery) is adaptor
+    assert interceptor._get_delivery_report_adaptor(lambda err, msg: None) is not adaptor
+
+    msg = Mock(topic=Mock(return_value='topic'), partition=Mock(return_value=2))
+    adaptor(None, msg)
+    superstream.update_topic_partitions.assert_called_once_with('topic', 2)
+    assert delivered == [msg]
+
+
+def test_non_json_topic_reprobe():
+    """ a burst of non JSON payloads does not turn off reduction for good """
+    interceptor = _interceptor()
+    json_value = b'{"a": 1}'
+
+    for _ in range(SuperstreamValues.NON_JSON_TOPIC_THRESHOLD):
+        assert interceptor._try_convert_to_json('topic', b'not json') is None
+
+    # the topic is skipped, JSON payloads included
+    for _ in range(SuperstreamValues.NON_JSON_TOPIC_REPROBE_INTERVAL - 1):
+        assert interceptor._try_convert_to_json('topic', json_value) is None
+
+    # until it is probed again
+    assert interceptor._try_convert_to_json('topic', json_value)[1] == {'a': 1}
+    assert interceptor._try_convert_to_json('topic', json_value)[1] == {'a': 1}
+    assert interceptor._try_convert_to_json('other', json_value)[1] == {'a': 1}
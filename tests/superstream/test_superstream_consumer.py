@@ -0,0 +1,20 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from unittest.mock import Mock
+
+from confluent_kafka import ColumnBatch, Consumer
+from confluent_kafka.superstream.constants import SuperstreamKeys
+
+
+def test_consume_columns_superstream():
+    """ with superstream connected consume_columns() is built from consume() so reduced values are restored """
+    c = Consumer({'group.id': 'test', 'socket.timeout.ms': 100, 'session.timeout.ms': 1000})
+    c._interceptor._superstream_config_[SuperstreamKeys.CONNECTION] = Mock(superstream_ready=True)
+    c.consume = Mock(return_value=[])
+
+    batch = c.consume_columns(num_messages=10, timeout=0.001)
+
+    c.consume.assert_called_once_with(num_messages=10, timeout=0.001)
+    assert isinstance(batch, ColumnBatch)
+    assert len(batch) == 0
+    c.close()
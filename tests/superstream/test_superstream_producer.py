@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import threading
+import time
+from collections import deque
+from unittest.mock import Mock
+
+import pytest
+
+from confluent_kafka import KafkaError
+from confluent_kafka.superstream.constants import SuperstreamKeys, SuperstreamValues
+from confluent_kafka.superstream.core import Superstream
+from confluent_kafka.superstream.superstream_producer import SuperstreamProducer, _InFlight
+
+# no broker is configured, messages stay queued until they time out
+CONFIG = {'bootstrap.servers': 'localhost:1', 'message.timeout.ms': 1000}
+
+
+@pytest.fixture
+def superstream(monkeypatch):
+    """ a superstream connection, the producer counts its messages so it can be replaced """
+    superstream = Mock(superstream_ready=False)
+    superstream.wait_for_superstream_configs_sync.side_effect = lambda config: config
+    monkeypatch.setattr(Superstream, "init_superstream_props",
+                        staticmethod(lambda config, client_type: {SuperstreamKeys.CONNECTION: superstream}))
+    return superstream
+
+
+def _start_swap(p):
+    swap = threading.Thread(target=p._swap_producer, args=(dict(CONFIG),))
+    swap.start()
+    while p._draining is None:
+        time.sleep(0.01)
+    return swap
+
+
+def test_swap_keeps_topic_order(superstream):
+    p = SuperstreamProducer(dict(CONFIG))
+    old_p = p._p
+    delivered = []
+
+    def on_delivery(err, msg):
+        delivered.append(msg.value())
+
+    p.produce('test', b'before', on_delivery=on_delivery)
+    swap = _start_swap(p)
+    assert p._draining is old_p and p._p is not old_p
+
+    # the topic's earlier message is still in the replaced producer, the new one is held back
+    p.produce('test', b'during', on_delivery=on_delivery)
+    # topics without undelivered messages move over straight away
+    p.produce('other', b'other', on_delivery=on_delivery)
+    assert len(p._held_back['test']) == 1
+    assert 'other' in p._in_flight and 'test' not in p._in_flight
+
+    # the held back message is produced once the replaced producer reported the earlier one
+    old_p.purge()
+    swap.join()
+    assert p._draining is None and not p._held_back
+    assert 'test' in p._in_flight
+
+    p.purge()
+    p.flush()
+    assert delivered[0] == b'before'
+    assert sorted(delivered[1:]) == [b'during', b'other']
+    assert delivered.index(b'before') < delivered.index(b'during')
+
+
+def test_swap_held_back_bound(superstream, monkeypatch):
+    monkeypatch.setattr(SuperstreamValues, "SWAP_HELD_BACK_MESSAGES", 2)
+    p = SuperstreamProducer(dict(CONFIG))
+    p.produce('test', b'before')
+    swap = _start_swap(p)
+
+    p.produce('test', b'during')
+    p.produce('test', b'during')
+    with pytest.raises(BufferError):
+        p.produce('test', b'during')
+    p.produce('other', b'other')
+
+    p.purge()
+    swap.join()
+    p.flush()
+    assert len(p) == 0
+
+
+def test_purge_during_swap(superstream):
+    p = SuperstreamProducer(dict(CONFIG))
+    errors = []
+
+    def on_delivery(err, msg):
+        errors.append((msg.value(), err.code()))
+
+    p.produce('test', b'before', on_delivery=on_delivery)
+    swap = _start_swap(p)
+    p.produce('test', b'during', on_delivery=on_delivery)
+
+    # the replaced producer and the held back messages are purged too
+    p.purge()
+    swap.join()
+    p.poll(0)
+    assert errors == [(b'before', KafkaError._PURGE_QUEUE), (b'during', KafkaError._PURGE_QUEUE)]
+    assert len(p) == 0
+
+
+def test_drain_time_limit(superstream):
+    """ a replaced producer that never reports its messages does not hold the swap forever """
+    p = SuperstreamProducer(dict(CONFIG))
+    in_flight = _InFlight({})
+    in_flight.add('test')
+    old_p = Mock()
+    old_p.__len__ = Mock(return_value=1)
+    p._held_back['test'] = deque([{'topic': 'test', 'value': b'during'}])
+    p._draining_in_flight = in_flight
+
+    start = time.monotonic()
+    p._drain(old_p, in_flight, 0.2)
+    assert time.monotonic() - start < 2
+    assert old_p.poll.called
+    # still pending, the held back message is released by the swap once the drain gave up
+    assert 'test' in p._held_back
+    p._draining_in_flight = None
+
+
+def test_in_flight_delivery_only_error():
+    """ every report counts the messages down, only errors reach the application with delivery.report.only.error """
+    on_delivery = Mock()
+    on_delivery_batch = Mock()
+    in_flight = _InFlight({'delivery.report.only.error': True})
+    config = in_flight.producer_config({'delivery.report.only.error': True, 'on_delivery': on_delivery})
+    assert 'delivery.report.only.error' not in config
+
+    msg = Mock(topic=Mock(return_value='test'))
+    in_flight.add('test', 2)
+    config['on_delivery'](None, msg)
+    on_delivery.assert_not_called()
+    config['on_delivery']('error', msg)
+    on_delivery.assert_called_once_with('error', msg)
+    assert not in_flight
+
+    config = in_flight.producer_config({'delivery.report.only.error': 'true', 'on_delivery_batch': on_delivery_batch})
+    in_flight.add('test', 2)
+    config['on_delivery_batch']([None, 'error'], ['test', 'test'], [0, 1], [10, -1], [None, None])
+    on_delivery_batch.assert_called_once_with(['error'], ['test'], [1], [-1], [None])
+    assert not in_flight
+
+
+def test_flush_timeout_during_swap(superstream):
+    p = SuperstreamProducer(dict(CONFIG))
+    p.produce('test', b'before')
+    swap = _start_swap(p)
+    p.produce('test', b'during')
+
+    start = time.monotonic()
+    p.flush(0.3)
+    # the draining and the current producer share the timeout
+    assert time.monotonic() - start < 0.6
+
+    p.purge()
+    swap.join()
+    p.flush()
+
+
+@pytest.mark.parametrize("message, error", [
+    ((1234,), r"messages\[1\]: expected value to be str, bytes or None, not int"),
+    ((b'v', b'k', b'v', 1, 2), r"messages\[1\]: expected a \(value, key, headers, timestamp\) tuple, not 5 elements"),
+    ([b'v'], r"messages\[1\]: expected tuple or dict, not list"),
+    ({'value': b'v', 'headers': [('key', 1)]}, r"messages\[1\]: expected header value to be str, bytes or None"),
+    ({'value': b'v', 'timestamp': 'now'}, r"messages\[1\]: expected timestamp to be int"),
+])
+def test_produce_batch_malformed_message(message, error):
+    """ with superstream ready the batch is produced message by message, a malformed message still fails it all """
+    p = SuperstreamProducer(dict(CONFIG))
+    p._interceptor._superstream_config_[SuperstreamKeys.CONNECTION] = Mock(superstream_ready=True)
+    p._interceptor.produce = Mock()
+
+    with pytest.raises((TypeError, ValueError), match=error):
+        p.produce_batch('test', [(b'v1',), message])
+    p._interceptor.produce.assert_not_called()
+
+    assert p.produce_batch('test', [(b'v1',), {'value': 'v2', 'key': b'k2', 'headers': {'h': b'v'}}]) == [None, None]
+    assert p._interceptor.produce.call_count == 2
@@ -0,0 +1,204 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import json
+import random
+import struct
+
+import pytest
+from google.protobuf import descriptor_pb2, descriptor_pool, json_format
+from google.protobuf.message_factory import GetMessageClass
+
+from confluent_kafka.superstream.transcoder import ProtoJsonTranscoder
+from confluent_kafka.superstream.utils import SerializationUtil, proto_to_json
+from tests.integration.schema_registry.data.proto import NestedTestProto_pb2, TestProto_pb2
+
+"""
+    ProtoJsonTranscoder must produce the same JSON as, and parse the JSON of,
+    google.protobuf.json_format.
+"""
+
+_F = descriptor_pb2.FieldDescriptorProto
+
+SCALARS = {
+    'double': _F.TYPE_DOUBLE, 'float': _F.TYPE_FLOAT,
+    'int32': _F.TYPE_INT32, 'int64': _F.TYPE_INT64,
+    'uint32': _F.TYPE_UINT32, 'uint64': _F.TYPE_UINT64,
+    'sint32': _F.TYPE_SINT32, 'sint64': _F.TYPE_SINT64,
+    'fixed32': _F.TYPE_FIXED32, 'fixed64': _F.TYPE_FIXED64,
+    'sfixed32': _F.TYPE_SFIXED32, 'sfixed64': _F.TYPE_SFIXED64,
+    'bool': _F.TYPE_BOOL, 'string': _F.TYPE_STRING, 'bytes': _F.TYPE_BYTES,
+}
+
+RANGES = {
+    'int32': (-(1 << 31), (1 << 31) - 1), 'sint32': (-(1 << 31), (1 << 31) - 1),
+    'sfixed32': (-(1 << 31), (1 << 31) - 1), 'uint32': (0, (1 << 32) - 1), 'fixed32': (0, (1 << 32) - 1),
+    'int64': (-(1 << 63), (1 << 63) - 1), 'sint64': (-(1 << 63), (1 << 63) - 1),
+    'sfixed64': (-(1 << 63), (1 << 63) - 1), 'uint64': (0, (1 << 64) - 1), 'fixed64': (0, (1 << 64) - 1),
+}
+
+PACKAGE = 'superstream.transcoder.test'
+
+
+def _add_field(msg, name, number, field_type, repeated=False, type_name=None):
+    field = msg.field.add(name=name, number=number, type=field_type,
+                          label=_F.LABEL_REPEATED if repeated else _F.LABEL_OPTIONAL)
+    if type_name:
+        field.type_name = '.{}.{}'.format(PACKAGE, type_name)
+
+
+def _add_map(msg, name, number, key_type, value_type, value_type_name=None):
+    entry_name = ''.join(part.title() for part in name.split('_')) + 'Entry'
+    entry = msg.nested_type.add(name=entry_name)
+    entry.options.map_entry = True
+    _add_field(entry, 'key', 1, key_type)
+    _add_field(entry, 'value', 2, value_type, type_name=value_type_name)
+    _add_field(msg, name, number, _F.TYPE_MESSAGE, repeated=True, type_name='AllTypes.' + entry_name)
+
+
+def _all_types_class():
+    file_proto = descriptor_pb2.FileDescriptorProto(name='superstream_transcoder_test.proto',
+                                                    package=PACKAGE, syntax='proto3')
+    color = file_proto.enum_type.add(name='Color')
+    for number, name in enumerate(['RED', 'GREEN', 'BLUE']):
+        color.value.add(name=name, number=number)
+
+    nested = file_proto.message_type.add(name='Nested')
+    _add_field(nested, 'name', 1, _F.TYPE_STRING)
+    _add_field(nested, 'count', 2, _F.TYPE_INT64)
+    _add_field(nested, 'color', 3, _F.TYPE_ENUM, type_name='Color')
+
+    msg = file_proto.message_type.add(name='AllTypes')
+    for number, (kind, field_type) in enumerate(SCALARS.items(), 1):
+        _add_field(msg, kind + '_value', number, field_type)
+        _add_field(msg, 'repeated_' + kind, number + 100, field_type, repeated=True)
+    _add_field(msg, 'nested', 50, _F.TYPE_MESSAGE, type_name='Nested')
+    _add_field(msg, 'repeated_nested', 51, _F.TYPE_MESSAGE, repeated=True, type_name='Nested')
+    _add_field(msg, 'color', 52, _F.TYPE_ENUM, type_name='Color')
+    _add_field(msg, 'repeated_color', 53, _F.TYPE_ENUM, repeated=True, type_name='Color')
+    _add_map(msg, 'string_map', 60, _F.TYPE_STRING, _F.TYPE_STRING)
+    _add_map(msg, 'int_map', 61, _F.TYPE_INT64, _F.TYPE_MESSAGE, 'Nested')
+    _add_map(msg, 'bool_map', 62, _F.TYPE_BOOL, _F.TYPE_ENUM, 'Color')
+    _add_map(msg, 'uint32_map', 63, _F.TYPE_UINT32, _F.TYPE_BYTES)
+
+    pool = descriptor_pool.DescriptorPool()
+    pool.Add(file_proto)
+    return GetMessageClass(pool.FindMessageTypeByName(PACKAGE + '.AllTypes'))
+
+
+AllTypes = _all_types_class()
+
+
+def _random_scalar(rnd, kind):
+    if kind in RANGES:
+        low, high = RANGES[kind]
+        small = rnd.randint(-300, 300) if low else rnd.randint(0, 300)
+        return rnd.choice([0, low, high, rnd.randint(low, high), small])
+    if kind == 'double':
+        return rnd.choice([0.0, -1.5, 1e300, rnd.uniform(-1e6, 1e6)])
+    if kind == 'float':
+        # representable as float32
+        return struct.unpack('<f', struct.pack('<f', rnd.uniform(-1e6, 1e6)))[0]
+    if kind == 'bool':
+        return rnd.choice([True, False])
+    if kind == 'string':
+        return rnd.choice(['', 'plain', 'quote " backslash \\ newline \n', 'unicode é中\U0001f600', '\x01'])
+    return bytes(rnd.randint(0, 255) for _ in range(rnd.randint(0, 12)))
+
+
+def _random_nested(rnd, nested):
+    if rnd.random() < 0.5:
+        nested.name = _random_scalar(rnd, 'string')
+    if rnd.random() < 0.5:
+        nested.count = _random_scalar(rnd, 'int64')
+    nested.color = rnd.randint(0, 2)
+
+
+def _random_message(rnd):
+    msg = AllTypes()
+    for kind in SCALARS:
+        if rnd.random() < 0.7:
+            setattr(msg, kind + '_value', _random_scalar(rnd, kind))
+        getattr(msg, 'repeated_' + kind).extend(_random_scalar(rnd, kind) for _ in range(rnd.randint(0, 3)))
+    if rnd.random() < 0.5:
+        _random_nested(rnd, msg.nested)
+    for _ in range(rnd.randint(0, 2)):
+        _random_nested(rnd, msg.repeated_nested.add())
+    msg.color = rnd.randint(0, 2)
+    msg.repeated_color.extend(rnd.randint(0, 2) for _ in range(rnd.randint(0, 3)))
+    for _ in range(rnd.randint(0, 3)):
+        msg.string_map[_random_scalar(rnd, 'string')] = _random_scalar(rnd, 'string')
+        _random_nested(rnd, msg.int_map[_random_scalar(rnd, 'int64')])
+        msg.bool_map[rnd.choice([True, False])] = rnd.randint(0, 2)
+        msg.uint32_map[_random_scalar(rnd, 'uint32')] = _random_scalar(rnd, 'bytes')
+    return msg
+
+
+def _assert_round_trip(transcoder, msg):
+    data = msg.SerializeToString()
+
+    js = transcoder.to_json(data)
+    assert json.loads(js) == json.loads(json_format.MessageToJson(msg))
+
+    assert transcoder.message_class.FromString(transcoder.from_json(js)) == msg
+    assert transcoder.message_class.FromString(transcoder.from_json(json_format.MessageToDict(msg))) == msg
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test_round_trip_random(seed):
+    _assert_round_trip(ProtoJsonTranscoder(AllTypes), _random_message(random.Random(seed)))
+
+
+def test_round_trip_test_messages():
+    _assert_round_trip(ProtoJsonTranscoder(TestProto_pb2.TestMessage),
+                       TestProto_pb2.TestMessage(test_string='s', test_bool=True, test_bytes=b'\x00\xff',
+                                                 test_double=1.25, test_float=0.5, test_fixed32=1,
+                                                 test_fixed64=2, test_int32=-3, test_int64=-4,
+                                                 test_sfixed32=-5, test_sfixed64=-6, test_sint32=-7,
+                                                 test_sint64=-8, test_uint32=9, test_uint64=10))
+
+    nested = NestedTestProto_pb2.NestedMessage(is_active=True, experiments_active=['a', 'b'],
+                                               status=NestedTestProto_pb2.INACTIVE,
+                                               map_type={'k': 'v'})
+    nested.user_id.another_id.id = 'id'
+    nested.complex_type.other_id = 0
+    nested.inner.ids.extend([1, -2, 3])
+    _assert_round_trip(ProtoJsonTranscoder(NestedTestProto_pb2.NestedMessage), nested)
+
+
+def test_default_omission():
+    transcoder = ProtoJsonTranscoder(AllTypes)
+    msg = AllTypes(int64_value=0, string_value='', bool_value=False, color=0)
+
+    assert transcoder.to_json(msg.SerializeToString()) == b'{}'
+    assert transcoder.from_json(b'{}') == b''
+    assert transcoder.from_json({'int64Value': '0', 'stringValue': '', 'color': 'RED'}) == b''
+
+
+def test_json_mapping():
+    transcoder = ProtoJsonTranscoder(AllTypes)
+    msg = AllTypes(int64_value=-(1 << 63), uint64_value=(1 << 64) - 1, int32_value=-1,
+                   bytes_value=b'\xfb\xff', color=2, float_value=float('inf'), double_value=float('-inf'))
+
+    js = json.loads(transcoder.to_json(msg.SerializeToString()))
+
+    # 64 bit integers are strings, 32 bit integers numbers
+    assert js['int64Value'] == str(-(1 << 63))
+    assert js['uint64Value'] == str((1 << 64) - 1)
+    assert js['int32Value'] == -1
+    assert js['bytesValue'] == '+/8='
+    assert js['color'] == 'BLUE'
+    assert js['floatValue'] == 'Infinity' and js['doubleValue'] == '-Infinity'
+    assert js == json.loads(json_format.MessageToJson(msg))
+
+    # parsing accepts the alternatives json_format accepts
+    assert AllTypes.FromString(transcoder.from_json({'int64_value': 5, 'color': 1, 'uint32Value': '7'})) == \
+        AllTypes(int64_value=5, color=1, uint32_value=7)
+
+
+def test_proto_to_json_types():
+    transcoder = ProtoJsonTranscoder(AllTypes)
+    data = AllTypes(string_value='é').SerializeToString()
+
+    assert proto_to_json(data, transcoder) == '{"stringValue":"é"}'.encode('utf-8')
+    # the public helper keeps returning str
+    assert SerializationUtil.proto_to_json(data, transcoder) == '{"stringValue":"é"}'
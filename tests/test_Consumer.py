@@ -1,8 +1,12 @@
 #!/usr/bin/env python
 
-from confluent_kafka import (Consumer, TopicPartition, KafkaError,
-                             KafkaException, TIMESTAMP_NOT_AVAILABLE,
-                             OFFSET_INVALID, libversion)
+import time
+from array import array
+from unittest.mock import Mock
+
+from confluent_kafka import (ColumnBatch, Consumer, Producer, TopicPartition, KafkaError,
+                             KafkaException, TIMESTAMP_CREATE_TIME, TIMESTAMP_NOT_AVAILABLE,
+                             OFFSET_BEGINNING, OFFSET_INVALID, libversion)
 import pytest
 
 
@@ -114,6 +118,98 @@ def test_basic_api():
     kc.close()
 
 
+def test_consume_columns():
+    """ consume_columns() tests, no broker is configured """
+
+    kc = Consumer({'group.id': 'test', 'socket.timeout.ms': '100',
+                   'session.timeout.ms': 1000})
+
+    kc.subscribe(["test"])
+
+    batch = kc.consume_columns(num_messages=10, timeout=0.001)
+    assert isinstance(batch, ColumnBatch)
+    assert len(batch) == 0
+    assert batch.partitions.typecode == 'q' and len(batch.partitions) == 0
+    assert batch.offsets.typecode == 'q' and len(batch.offsets) == 0
+    assert list(batch.key_offsets) == [0] and list(batch.value_offsets) == [0]
+    assert batch.keys == b'' and batch.values == b''
+
+    with pytest.raises(ValueError) as ex:
+        kc.consume_columns(1000001)
+    assert 'num_messages must be between 0 and 1000000 (1M)' == str(ex.value)
+
+    kc.close()
+
+    with pytest.raises(RuntimeError) as ex:
+        kc.consume_columns()
+    assert ex.match('Consumer closed')
+
+
+def test_consume_columns_mock_cluster():
+    """ consume_columns() of records produced to a mock cluster """
+
+    p = Producer({'test.mock.num.brokers': 1})
+    brokers = p.list_topics(timeout=10).brokers.values()
+    records = [(0, b'k0', b'v0'), (0, None, b'v1'), (0, b'k2', None), (1, b'k3', b'')]
+    for partition, key, value in records:
+        p.produce('columns', value, key, partition=partition)
+    assert p.flush(10) == 0
+
+    kc = Consumer({'bootstrap.servers': ','.join('{}:{}'.format(b.host, b.port) for b in brokers),
+                   'group.id': 'test', 'enable.partition.eof': True})
+    kc.assign([TopicPartition('columns', 0, OFFSET_BEGINNING),
+               TopicPartition('columns', 1, OFFSET_BEGINNING)])
+
+    consumed = []
+    errors = []
+    deadline = time.time() + 10
+    while len(errors) < 2 and time.time() < deadline:
+        batch = kc.consume_columns(num_messages=10, timeout=0.5)
+        assert len(batch.key_offsets) == len(batch.value_offsets) == len(batch) + 1
+        assert len(batch.key_validity) == len(batch.value_validity) == len(batch)
+        assert batch.key_offsets[-1] == len(batch.keys)
+        assert batch.value_offsets[-1] == len(batch.values)
+        # consecutive messages of a topic share the topic str
+        assert all(topic is batch.topics[0] for topic in batch.topics)
+        for i in range(len(batch)):
+            assert batch.topics[i] == 'columns'
+            assert batch.timestamp_types[i] == TIMESTAMP_CREATE_TIME
+            assert batch.timestamps[i] > 0
+            key, value = batch.key(i), batch.value(i)
+            consumed.append((batch.partitions[i], batch.offsets[i],
+                             None if key is None else bytes(key),
+                             None if value is None else bytes(value)))
+        errors += batch.errors
+
+    kc.close()
+
+    assert sorted(consumed) == [(0, 0, b'k0', b'v0'), (0, 1, None, b'v1'),
+                                (0, 2, b'k2', None), (1, 0, b'k3', b'')]
+    assert sorted((e.partition(), e.error().code()) for e in errors) == \
+        [(0, KafkaError._PARTITION_EOF), (1, KafkaError._PARTITION_EOF)]
+
+
+def test_column_batch():
+    """ ColumnBatch key() and value() slice the Arrow style buffers """
+
+    batch = ColumnBatch(topics=['test'] * 3,
+                        partitions=array('q', [0, 1, 0]),
+                        offsets=array('q', [5, 7, 6]),
+                        timestamps=array('q', [1, 2, 3]),
+                        timestamp_types=array('b', [TIMESTAMP_CREATE_TIME] * 3),
+                        keys=b'k1k3',
+                        key_offsets=array('q', [0, 2, 2, 4]),
+                        key_validity=b'\x01\x00\x01',
+                        values=b'value',
+                        value_offsets=array('q', [0, 0, 3, 5]),
+                        value_validity=b'\x01\x01\x00')
+
+    assert len(batch) == 3
+    assert [batch.key(i) for i in range(3)] == [b'k1', None, b'k3']
+    assert [batch.value(i) for i in range(3)] == [b'', b'val', None]
+    assert batch.errors == []
+
+
 @pytest.mark.skipif(libversion()[1] < 0x000b0000,
                     reason="requires librdkafka >=0.11.0")
 def test_store_offsets():
@@ -321,3 +417,32 @@ def test_consumer_without_groupid():
     with pytest.raises(ValueError) as ex:
         Consumer({'bootstrap.servers': "mybroker:9092"})
     assert ex.match('group.id must be set')
+
+
+def test_column_batch_from_messages():
+    """ ColumnBatch.from_messages() lays out Message objects as columns """
+
+    def message(partition, offset, key, value, error=None):
+        msg = Mock()
+        msg.error.return_value = error
+        msg.topic.return_value = 'test'
+        msg.partition.return_value = partition
+        msg.offset.return_value = offset
+        msg.timestamp.return_value = (TIMESTAMP_CREATE_TIME, offset * 10)
+        msg.key.return_value = key
+        msg.value.return_value = value
+        return msg
+
+    eof = message(0, 2, None, None, error=KafkaError(KafkaError._PARTITION_EOF))
+    batch = ColumnBatch.from_messages([message(0, 1, b'k1', b'v1'), eof,
+                                       message(1, 5, None, '{"a": 1}')])
+
+    assert len(batch) == 2
+    assert batch.topics == ['test', 'test']
+    assert list(batch.partitions) == [0, 1]
+    assert list(batch.offsets) == [1, 5]
+    assert list(batch.timestamps) == [10, 50]
+    assert list(batch.timestamp_types) == [TIMESTAMP_CREATE_TIME] * 2
+    assert [batch.key(i) for i in range(2)] == [b'k1', None]
+    assert [batch.value(i) for i in range(2)] == [b'v1', b'{"a": 1}']
+    assert batch.errors == [eof]
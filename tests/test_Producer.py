@@ -1,5 +1,7 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
+import sys
+
 import pytest
 
 from confluent_kafka import Producer, Consumer, KafkaError, KafkaException, \
@@ -46,6 +48,144 @@ def test_basic_api():
         assert e.args[0].code() in (KafkaError._TIMED_OUT, KafkaError._TRANSPORT)
 
 
+def test_produce_batch():
+    """ Test produce_batch(), the messages time out since there is no broker. """
+    p = Producer({'socket.timeout.ms': 10,
+                  'error_cb': error_cb,
+                  'message.timeout.ms': 10})
+
+    delivered = []
+
+    def on_delivery(err, msg):
+        assert err.code() == KafkaError._MSG_TIMED_OUT
+        delivered.append(msg.value())
+
+    errors = p.produce_batch('mytopic', [(b'v1',),
+                                         ('v2', 'k2'),
+                                         (b'v3', None, [('headerkey', b'headervalue')]),
+                                         {'value': b'v4', 'timestamp': 1234567},
+                                         {'key': b'k5'}],
+                             on_delivery=on_delivery)
+    assert errors == [None] * 5
+
+    p.flush()
+    assert sorted(delivered, key=lambda value: value or b'') == [None, b'v1', b'v2', b'v3', b'v4']
+
+    assert p.produce_batch('mytopic', []) == []
+
+    # a malformed message fails the whole batch
+    with pytest.raises(TypeError, match=r"messages\[1\]: expected value to be str, bytes or None"):
+        p.produce_batch('mytopic', [(b'v1',), (1234,)])
+    assert len(p) == 0
+
+
+def test_produce_zero_copy():
+    """ Test produce() with produce.zero.copy, the messages time out since there is no broker. """
+    p = Producer({'socket.timeout.ms': 10,
+                  'error_cb': error_cb,
+                  'message.timeout.ms': 10,
+                  'produce.zero.copy': True})
+
+    delivered = []
+
+    def on_delivery(err, msg):
+        assert err.code() == KafkaError._MSG_TIMED_OUT
+        delivered.append(msg.value())
+
+    value = bytearray(b'bytearray value')
+    refcount = sys.getrefcount(value)
+
+    for v in [b'bytes value', value, memoryview(b'memoryview value'), 'str value', None]:
+        p.produce('mytopic', v, key='a key', on_delivery=on_delivery)
+
+    # the buffer is held until the delivery report
+    assert sys.getrefcount(value) > refcount
+
+    p.flush()
+    assert sorted(delivered, key=lambda v: v or b'') == \
+        [None, b'bytearray value', b'bytes value', b'memoryview value', b'str value']
+    assert sys.getrefcount(value) == refcount
+
+    with pytest.raises(TypeError):
+        p.produce('mytopic', 1234)
+    assert len(p) == 0
+
+
+def test_produce_default_on_delivery():
+    """ Test that the default and per-message delivery callbacks are served. """
+    default_delivered = []
+    delivered = []
+
+    def default_on_delivery(err, msg):
+        assert err.code() == KafkaError._MSG_TIMED_OUT
+        default_delivered.append(msg.value())
+
+    def on_delivery(err, msg):
+        assert err.code() == KafkaError._MSG_TIMED_OUT
+        delivered.append(msg.value())
+
+    p = Producer({'socket.timeout.ms': 10,
+                  'error_cb': error_cb,
+                  'message.timeout.ms': 10,
+                  'on_delivery': default_on_delivery})
+
+    refcount = sys.getrefcount(default_on_delivery)
+
+    p.produce('mytopic', b'default')
+    p.produce('mytopic', b'per-message', on_delivery=on_delivery)
+    p.produce('mytopic', b'default again', on_delivery=default_on_delivery)
+
+    # messages for the default callback don't reference it
+    assert sys.getrefcount(default_on_delivery) == refcount
+
+    p.flush()
+    assert sorted(default_delivered) == [b'default', b'default again']
+    assert delivered == [b'per-message']
+
+
+def test_produce_on_delivery_batch():
+    """ Test that delivery reports are served to on_delivery_batch once per poll() or flush(). """
+    batches = []
+    delivered = []
+
+    def on_delivery_batch(errors, topics, partitions, offsets, opaques):
+        batches.append((errors, topics, partitions, offsets, opaques))
+
+    def on_delivery(err, msg):
+        delivered.append(msg.value())
+
+    p = Producer({'socket.timeout.ms': 10,
+                  'error_cb': error_cb,
+                  'message.timeout.ms': 10,
+                  'on_delivery_batch': on_delivery_batch})
+
+    p.produce('mytopic', b'first', opaque=1)
+    p.produce('mytopic', b'second', partition=2)
+    p.produce('mytopic', b'per-message', on_delivery=on_delivery)
+    p.produce_batch('othertopic', [(b'third',)])
+
+    p.flush()
+
+    assert len(batches) == 1
+    errors, topics, partitions, offsets, opaques = batches[0]
+    assert [err.code() for err in errors] == [KafkaError._MSG_TIMED_OUT] * 3
+    assert sorted(zip(topics, opaques), key=str) == [('mytopic', 1), ('mytopic', None), ('othertopic', None)]
+    assert 2 in partitions
+    assert offsets == [-1001] * 3
+    assert delivered == [b'per-message']
+
+    # nothing was delivered since
+    p.poll(0)
+    assert len(batches) == 1
+
+    with pytest.raises(KafkaException, match="on_delivery_batch requires a callable object"):
+        Producer({'on_delivery_batch': 'not callable'})
+
+    with pytest.raises(KafkaException, match="on_delivery and on_delivery_batch are mutually exclusive") as ex:
+        Producer({'on_delivery': on_delivery, 'on_delivery_batch': on_delivery_batch})
+    assert ex.value.args[0].code() == KafkaError._INVALID_ARG
+
+
 def test_produce_timestamp():
     """ Test produce() with timestamp arg """
     p = Producer({'socket.timeout.ms': 10,